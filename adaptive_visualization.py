@@ -0,0 +1,211 @@
+from manim import (
+    MovingCameraScene, VGroup, UP, DOWN, RIGHT, Circle, Line, WHITE, BLUE, RED, YELLOW,
+    Create, FadeIn, FadeOut, Write, Transform, ReplacementTransform
+)
+
+from coding_core import AdaptiveHuffman, tidy_layout
+from coding_core.adaptive import ROOT, Spawn, Swap
+from rendering.camera import framing
+from rendering.labels import labels, symbol_label
+from rendering.profiling import ALGORITHM, MOBJECTS
+from rendering.timeline import TimelineMixin
+
+
+class AdaptiveHuffmanTree(TimelineMixin, MovingCameraScene):
+    """Class to animate adaptive Huffman coding of a stream, one symbol at a time, using Manim.
+
+    Each symbol first shows the code it is sent with, then the update of the
+    tree: the NYT node splitting for a new symbol, every swap that keeps the
+    sibling property and every weight going up on the way to the root. The
+    whole stream is animated, so long streams are best cut to a prefix.
+    """
+
+    def __init__(self, stream):
+        super().__init__()
+        self.stream = list(stream)
+        self.vertical_spacing = 1.2
+        self.horizontal_gap = 0.4
+        self.radius = 0.3
+        self.caption_gap = 0.3
+
+    def construct(self):
+        """Constructs the Manim scene by replaying the updates of the adaptive Huffman tree."""
+        with self.profile("updates", ALGORITHM):
+            updates = self.updates()
+        with self.profile("framing", MOBJECTS):
+            width, center, top = self._framing(updates)
+        self.camera.frame.scale_to_fit_width(width).move_to(center)
+        self.header_position = UP * top
+        self.header = None
+
+        self._reset_tree()
+        position = self._positions()[ROOT]
+        self.nodes = {ROOT: self._create_node(0, position)}
+        self.captions = {ROOT: self._create_caption("NYT", position)}
+        self.edges = {}
+        self.play(Create(self.nodes[ROOT]), Write(self.captions[ROOT]))
+
+        for index, (symbol, code, new, events) in enumerate(updates):
+            with self.profile("symbol", index=index, symbol=str(symbol)):
+                self._animate_update(symbol, code, new, events)
+        self.wait(1)
+
+    def updates(self):
+        """Returns (symbol, code sent, whether it is new, tree events) for every symbol of the stream."""
+        tree = AdaptiveHuffman()
+        updates = []
+        for symbol in self.stream:
+            new = symbol not in tree
+            code = tree.code(symbol)
+            events = []
+            tree.update(symbol, events)
+            updates.append((symbol, code, new, events))
+        return updates
+
+    def timeline_steps(self):
+        """Counts the play calls construct makes for the NYT root, every symbol and the final wait."""
+        steps = [1]
+        for _, _, _, events in self.updates():
+            # The code sent, then one play per event and two per swap
+            steps.append(1 + sum(2 if isinstance(event, Swap) else 1 for event in events))
+        steps.append(1)
+        return steps
+
+    def timeline_signatures(self):
+        """Describes what every step draws, so unchanged steps can be found between renders."""
+        updates = self.updates()
+
+        # The camera fits every tree of the stream, so it is part of every step
+        width, center, top = self._framing(updates)
+        frame = [width, center, top]
+        signatures = [["NYT", frame]]
+        for symbol, code, new, events in updates:
+            signatures.append([str(symbol), code, new, events, frame])
+        signatures.append(["end", frame])
+        return signatures
+
+    def _reset_tree(self):
+        """Starts the drawn tree over from a lone NYT node."""
+        self.children = [[]]
+        self.parents = [-1]
+        self.weights = [0]
+        self.symbols = {}
+
+    def _apply(self, event):
+        """Applies one event of the engine to the tree the scene draws."""
+        if isinstance(event, Spawn):
+            self.children += [[], []]
+            self.parents += [event.internal, event.internal]
+            self.weights += [0, 0]
+            self.children[event.internal] = [event.nyt, event.leaf]
+            self.symbols[event.leaf] = event.symbol
+        elif isinstance(event, Swap):
+            first, second = event
+            first_parent, second_parent = self.parents[first], self.parents[second]
+            first_slot = self.children[first_parent].index(first)
+            second_slot = self.children[second_parent].index(second)
+            self.children[first_parent][first_slot] = second
+            self.children[second_parent][second_slot] = first
+            self.parents[first], self.parents[second] = second_parent, first_parent
+        else:
+            self.weights[event.node] = event.weight
+
+    def _positions(self):
+        """Returns the position of every node of the drawn tree with the tidy tree layout."""
+        xs, depths = tidy_layout(self.children, None, self.horizontal_gap)
+        return [UP * (3 - self.vertical_spacing * depth) + RIGHT * x for x, depth in zip(xs, depths)]
+
+    def _framing(self, updates):
+        """Returns the camera (width, center) that shows every tree of the stream, and the header's height."""
+        self._reset_tree()
+        left, right = -0.5, 0.5
+        top = 3.0
+        bottom = top - self.radius - 2 * self.caption_gap
+        for _, _, _, events in updates:
+            for event in events:
+                self._apply(event)
+                if isinstance(event, (Spawn, Swap)):
+                    for position in self._positions():
+                        left, right = min(left, position[0] - 0.5), max(right, position[0] + 0.5)
+                        bottom = min(bottom, position[1] - self.radius - 2 * self.caption_gap)
+
+        # The code sent goes above the root
+        top += self.radius + 1.0
+        width, center = framing((left, bottom, right, top + 0.3))
+        return width, [float(value) for value in center], top
+
+    def _create_node(self, weight, position):
+        """Creates a circle with the weight of a node inside."""
+        circle = Circle(radius=self.radius, color=WHITE)
+        weight_text = labels.text(str(weight), font_size=24)
+        return VGroup(circle, weight_text).move_to(position)
+
+    def _create_caption(self, text, position):
+        """Creates the text under a leaf: its symbol, or NYT."""
+        return labels.text(text, font_size=20).move_to(position + DOWN * (self.radius + self.caption_gap))
+
+    def _edge_points(self, child, positions):
+        """Returns the start, end and colour of the edge above child, blue for 0 and red for 1."""
+        parent = self.parents[child]
+        color = BLUE if self.children[parent][0] == child else RED
+        return positions[parent] + DOWN * self.radius, positions[child] + UP * self.radius, color
+
+    def _moves(self, positions):
+        """Returns the animations that take every drawn node and edge to positions."""
+        animations = []
+        for node, mobject in self.nodes.items():
+            animations.append(mobject.animate.move_to(positions[node]).set_color(WHITE))
+            if node in self.captions:
+                animations.append(
+                    self.captions[node].animate.move_to(positions[node] + DOWN * (self.radius + self.caption_gap))
+                )
+        for child, edge in self.edges.items():
+            start, end, color = self._edge_points(child, positions)
+            animations.append(edge.animate.put_start_and_end_on(start, end).set_color(color))
+        return animations
+
+    def _animate_update(self, symbol, code, new, events):
+        """Animates the code sent for one symbol and every change it makes to the tree."""
+        label = symbol_label(symbol)
+        text = f"{label}: NYT {code} + {label}" if new else f"{label}: {code}"
+        header = labels.text(" ".join(text.split()), font_size=32).move_to(self.header_position)
+        if self.header is None:
+            self.play(Write(header), run_time=0.6)
+        else:
+            self.play(ReplacementTransform(self.header, header), run_time=0.6)
+        self.header = header
+
+        for event in events:
+            if isinstance(event, Spawn):
+                self._animate_spawn(event)
+            elif isinstance(event, Swap):
+                self._animate_swap(event)
+            else:
+                self._animate_increment(event)
+
+    def _animate_spawn(self, spawn):
+        """Animates the NYT node splitting into a new NYT node and the new symbol's leaf."""
+        self._apply(spawn)
+        positions = self._positions()
+        animations = self._moves(positions)
+        animations.append(FadeOut(self.captions.pop(spawn.internal)))
+        for node, caption in ((spawn.nyt, "NYT"), (spawn.leaf, symbol_label(spawn.symbol))):
+            self.nodes[node] = self._create_node(0, positions[node])
+            self.captions[node] = self._create_caption(caption, positions[node])
+            start, end, color = self._edge_points(node, positions)
+            self.edges[node] = Line(start, end, color=color)
+            animations += [Create(self.edges[node]), FadeIn(self.nodes[node]), FadeIn(self.captions[node])]
+        self.play(*animations, run_time=1)
+
+    def _animate_swap(self, swap):
+        """Marks the two subtrees that trade places, then moves them."""
+        self.play(*(self.nodes[node].animate.set_color(YELLOW) for node in swap), run_time=0.4)
+        self._apply(swap)
+        self.play(*self._moves(self._positions()), run_time=1)
+
+    def _animate_increment(self, increment):
+        """Shows a node's weight going up by one."""
+        node = self.nodes[increment.node]
+        weight_text = labels.text(str(increment.weight), font_size=24).move_to(node[0])
+        self._apply(increment)
+        self.play(Transform(node[1], weight_text), run_time=0.4)
@@ -0,0 +1 @@
+"""Reproducible benchmarks of the coding trees and their animations, see benchmarks.run."""
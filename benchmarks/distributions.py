@@ -0,0 +1,68 @@
+"""Synthetic symbol distributions, most probable first."""
+import numpy as np
+
+# Smallest over largest probability of the geometric distribution
+GEOMETRIC_RANGE = 1e-9
+
+# Symbols of the dyadic distribution with a probability of their own
+DYADIC_HEAD = 30
+
+
+def uniform(count):
+    return np.full(count, 1 / count)
+
+
+def geometric(count):
+    """p_i proportional to r^i, with r chosen so the last symbol is GEOMETRIC_RANGE times the first."""
+    ratio = GEOMETRIC_RANGE ** (1 / max(count - 1, 1))
+    return _normalized(ratio ** np.arange(count, dtype=np.float64))
+
+
+def zipf(count, exponent=1.0):
+    """p_i proportional to 1 / i^exponent."""
+    return _normalized(1 / np.arange(1, count + 1, dtype=np.float64) ** exponent)
+
+
+def dyadic(count):
+    """Powers of two summing to exactly one, so a binary Huffman code is optimal to the bit.
+
+    The first symbols take 1/2, 1/4, ... down to 2^-DYADIC_HEAD and the
+    others share what is left as evenly as powers of two allow, which
+    keeps every probability far from underflow however many there are.
+    """
+    head = min(count - 1, DYADIC_HEAD)
+    probabilities = [2.0 ** -(index + 1) for index in range(head)]
+
+    # 2^k symbols at the same depth, split in two where more are needed
+    rest = count - head
+    depth = rest.bit_length() - 1
+    deeper = rest - (1 << depth)
+    share = 2.0 ** -head
+    probabilities += [share * 2.0 ** -depth] * ((1 << depth) - deeper)
+    probabilities += [share * 2.0 ** -(depth + 1)] * (2 * deeper)
+    return np.array(probabilities)
+
+
+def _normalized(weights):
+    return weights / weights.sum()
+
+
+DISTRIBUTIONS = {
+    "uniform": uniform,
+    "geometric": geometric,
+    "zipf": zipf,
+    "dyadic": dyadic,
+}
+
+
+def byte_stream(name, length, seed=0):
+    """Returns length bytes drawn independently from the named distribution over the 256 byte values."""
+    generator = np.random.default_rng(seed)
+    return generator.choice(256, size=length, p=DISTRIBUTIONS[name](256)).astype(np.uint8).tobytes()
+
+
+def distribution(name, count):
+    """Returns (symbols, probabilities) of count symbols drawn from the named distribution."""
+    probabilities = DISTRIBUTIONS[name](count)
+    symbols = [f"s{index}" for index in range(count)]
+    return symbols, probabilities.tolist()
@@ -0,0 +1,364 @@
+"""Runs the benchmarks and compares them with a baseline.
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --output new.json --baseline results.json
+
+Every case builds a code for one synthetic distribution and records the
+time of each of a few runs in seconds, the best of them and, from one
+more run under tracemalloc, the peak of the memory allocated in Python
+and NumPy. Stream cases code bytes drawn from each distribution and
+record the throughput too. Render cases play a whole scene at preview
+quality in this process, with manim already loaded, and record the play
+calls next to the wall time. With a baseline, cases that got slower by
+more than the tolerance are listed and the exit status is 1. Runs are
+compared by their medians, and a slowdown only counts when it is also
+well past the spread of the runs on both sides.
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from coding_core import (
+    Codebook, HuffMergeEngine, HuffTree, LengthLimitedMergeEngine, adaptive_decode, adaptive_encode,
+    shannon_fano_codes, shannon_fano_steps, split_tree, tidy_layout
+)
+
+from .distributions import DISTRIBUTIONS, byte_stream, distribution
+
+SIZES = (8, 64, 512, 4096, 32768, 262144, 1000000)
+OUTPUT_SYMBOLS = (2, 3, 4)
+RENDER_SIZES = (8,)
+STREAM_BYTES = (1 << 16,)
+
+# Runs of every case, down to MIN_REPEATS for slow ones so they still have a spread
+REPEATS = 5
+MIN_REPEATS = 3
+SLOW_SECONDS = 1.0
+
+# A slowdown is noise unless the medians differ by this many standard
+# deviations of the runs, estimated from their median absolute deviation
+NOISE_DEVIATIONS = 3
+MAD_TO_DEVIATION = 1.4826
+
+# Slowdowns under this many seconds are timer noise, whatever the spread
+MIN_SLOWDOWN_SECONDS = 0.001
+
+
+def _huffman_codes(symbols, probabilities, outputs):
+    engine = HuffMergeEngine(symbols, probabilities, len(outputs))
+    for _ in engine:
+        pass
+    return Codebook(symbols, outputs, engine)
+
+
+def _length_limited_codes(symbols, probabilities, outputs):
+    # Two digits more than a balanced tree, which binds for the skewed distributions
+    max_length = math.ceil(math.log(len(symbols), len(outputs))) + 2
+    engine = LengthLimitedMergeEngine(symbols, probabilities, len(outputs), max_length)
+    return Codebook(symbols, outputs, engine)
+
+
+def _huffman_tree(symbols, probabilities, outputs):
+    tree = HuffTree(symbols, outputs, probabilities)
+    tree.build()
+    return tree
+
+
+def _shannon_fano_codes(symbols, probabilities, outputs):
+    return shannon_fano_codes(symbols, probabilities)
+
+
+def _shannon_fano_steps(symbols, probabilities, outputs):
+    return list(shannon_fano_steps(symbols, probabilities))
+
+
+def _shannon_fano_layout(symbols, probabilities, outputs):
+    codes, children = split_tree(shannon_fano_steps(symbols, probabilities))
+    return tidy_layout(children)
+
+
+# name: (function, largest size, whether it takes D output symbols)
+# HuffTree and the Shannon-Fano steps keep what the scenes draw, so they
+# stop at sizes that can still be looked at
+BENCHMARKS = {
+    "huffman-codes": (_huffman_codes, 1000000, True),
+    "length-limited-codes": (_length_limited_codes, 262144, True),
+    "huffman-tree": (_huffman_tree, 32768, True),
+    "shannon-fano-codes": (_shannon_fano_codes, 1000000, False),
+    "shannon-fano-steps": (_shannon_fano_steps, 262144, False),
+    "shannon-fano-layout": (_shannon_fano_layout, 262144, False),
+}
+
+
+def _adaptive_encoded(data):
+    return b"".join(adaptive_encode([data]))
+
+
+def _encoding(data):
+    return (data,)
+
+
+def _decoding(data):
+    return _adaptive_encoded(data), len(data)
+
+
+# name: (function, what it is called with for a stream of bytes)
+STREAM_BENCHMARKS = {
+    "adaptive-encode": (_adaptive_encoded, _encoding),
+    "adaptive-decode": (adaptive_decode, _decoding),
+}
+
+
+def _cases(sizes, output_symbols):
+    """Yields (name, benchmark, distribution, size, D) of every algorithm case."""
+    for benchmark, (function, largest, takes_outputs) in BENCHMARKS.items():
+        for name in DISTRIBUTIONS:
+            for size in sizes:
+                if size > largest:
+                    continue
+                for outputs in output_symbols if takes_outputs else (2,):
+                    case = f"{benchmark}/{name}/{size}"
+                    if takes_outputs:
+                        case += f"/D={outputs}"
+                    yield case, benchmark, name, size, outputs
+
+
+def measure(function, *args):
+    """Returns (seconds of every run, peak bytes) of function(*args)."""
+    times = []
+    while len(times) < REPEATS:
+        gc.collect()
+        start = time.perf_counter()
+        function(*args)
+        times.append(time.perf_counter() - start)
+        if len(times) >= MIN_REPEATS and sum(times) > SLOW_SECONDS:
+            break
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return times, peak
+
+
+def run_algorithms(sizes=SIZES, output_symbols=OUTPUT_SYMBOLS, log=None):
+    """Returns the results of the algorithm cases."""
+    results = []
+    for case, benchmark, name, size, outputs in _cases(sizes, output_symbols):
+        symbols, probabilities = distribution(name, size)
+        times, peak = measure(
+            BENCHMARKS[benchmark][0], symbols, probabilities, [str(digit) for digit in range(outputs)]
+        )
+        seconds = min(times)
+        results.append({
+            "case": case,
+            "kind": "algorithm",
+            "benchmark": benchmark,
+            "distribution": name,
+            "symbols": size,
+            "output_symbols": outputs,
+            "seconds": seconds,
+            "times": times,
+            "runs": len(times),
+            "peak_bytes": peak,
+        })
+        if log:
+            log(f"{case}: {seconds * 1000:.2f} ms, {peak / 1024:.0f} KiB")
+    return results
+
+
+def run_streams(sizes=STREAM_BYTES, log=None):
+    """Returns the results of coding byte streams, with their throughput."""
+    results = []
+    for benchmark, (function, arguments) in STREAM_BENCHMARKS.items():
+        for name in DISTRIBUTIONS:
+            for size in sizes:
+                case = f"{benchmark}/{name}/{size}"
+                times, peak = measure(function, *arguments(byte_stream(name, size)))
+                seconds = min(times)
+                results.append({
+                    "case": case,
+                    "kind": "stream",
+                    "benchmark": benchmark,
+                    "distribution": name,
+                    "bytes": size,
+                    "seconds": seconds,
+                    "bytes_per_second": size / seconds,
+                    "times": times,
+                    "runs": len(times),
+                    "peak_bytes": peak,
+                })
+                if log:
+                    log(f"{case}: {seconds * 1000:.2f} ms, {size / seconds / 1e6:.2f} MB/s")
+    return results
+
+
+def run_renders(sizes=RENDER_SIZES, output_symbols=OUTPUT_SYMBOLS, log=None):
+    """Returns the results of rendering both scenes at preview quality."""
+    from manim import config, tempconfig
+
+    from rendering import HUFFMAN, PREVIEW, SHANNON_FANO, RenderJob
+    from rendering.labels import labels
+
+    # manim, the scenes and the fonts are loaded before the clock starts
+    config.progress_bar = "none"
+    config.verbosity = "WARNING"
+    labels.text("0")
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="huffman-benchmarks-") as directory:
+        config.media_dir = directory
+        for name in DISTRIBUTIONS:
+            for size in sizes:
+                symbols, probabilities = distribution(name, size)
+                jobs = [(f"render/{SHANNON_FANO}/{name}/{size}", RenderJob(
+                    SHANNON_FANO, symbols, probabilities, None, preset=PREVIEW
+                ), 2)]
+                for outputs in output_symbols:
+                    digits = [str(digit) for digit in range(outputs)]
+                    jobs.append((f"render/{HUFFMAN}/{name}/{size}/D={outputs}", RenderJob(
+                        HUFFMAN, symbols, probabilities, digits, True, PREVIEW
+                    ), outputs))
+
+                for case, job, outputs in jobs:
+                    output_file = os.path.join(directory, f"{len(results)}.mp4")
+                    start = time.perf_counter()
+                    with tempconfig(job.manim_config(output_file=output_file)):
+                        scene = job.create_scene()
+                        scene.render()
+                    seconds = time.perf_counter() - start
+                    results.append({
+                        "case": case,
+                        "kind": "render",
+                        "benchmark": f"render-{job.algorithm}",
+                        "distribution": name,
+                        "symbols": size,
+                        "output_symbols": outputs,
+                        "seconds": seconds,
+                        "times": [seconds],
+                        "runs": 1,
+                        "plays": scene.plays_done,
+                        "expected_plays": scene.expected_plays(),
+                    })
+                    if log:
+                        log(f"{case}: {seconds:.2f} s, {scene.plays_done} plays")
+    return results
+
+
+def environment():
+    """Returns what the timings depend on besides the code."""
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def _deviation(times):
+    """Standard deviation of run times, estimated robustly from their median absolute deviation."""
+    middle = statistics.median(times)
+    return MAD_TO_DEVIATION * statistics.median(abs(seconds - middle) for seconds in times)
+
+
+def is_slower(times, old_times, tolerance=0.25):
+    """Whether the runs in times are slower than old_times by more than tolerance and the noise.
+
+    The medians must differ by more than tolerance times the old one and
+    by more than NOISE_DEVIATIONS deviations of the runs of both sides.
+    """
+    seconds, old_seconds = statistics.median(times), statistics.median(old_times)
+    noise = NOISE_DEVIATIONS * math.hypot(_deviation(times), _deviation(old_times))
+    return seconds - old_seconds > max(old_seconds * tolerance, noise, MIN_SLOWDOWN_SECONDS)
+
+
+def compare(results, baseline, tolerance=0.25):
+    """Returns the cases of results slower than in baseline by more than tolerance.
+
+    Each entry is (case, baseline median seconds, median seconds), judged
+    by is_slower. Results without the time of every run count as one run
+    of their best time. Play counts that changed are reported too, with
+    the counts in place of the seconds. Cases missing on either side are
+    ignored.
+    """
+    before = {result["case"]: result for result in baseline["results"]}
+    slower = []
+    for result in results["results"]:
+        old = before.get(result["case"])
+        if old is None:
+            continue
+        times, old_times = result.get("times", [result["seconds"]]), old.get("times", [old["seconds"]])
+        if is_slower(times, old_times, tolerance):
+            slower.append((result["case"], statistics.median(old_times), statistics.median(times)))
+        if "plays" in result and result["plays"] != old.get("plays", result["plays"]):
+            slower.append((result["case"] + " plays", old["plays"], result["plays"]))
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the coding trees and their animations.")
+    parser.add_argument("--output", default="benchmarks.json", help="where the results are written")
+    parser.add_argument("--baseline", help="earlier results to compare with")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="slowdown ratio over the baseline that is flagged"
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="symbols per distribution")
+    parser.add_argument(
+        "--output-symbols", type=int, nargs="+", default=OUTPUT_SYMBOLS, help="D of the Huffman codes"
+    )
+    parser.add_argument(
+        "--stream-bytes", type=int, nargs="*", default=STREAM_BYTES,
+        help="length of the coded byte streams, none to skip them"
+    )
+    parser.add_argument(
+        "--render-sizes", type=int, nargs="*", default=RENDER_SIZES,
+        help="symbols of the rendered scenes, none to skip rendering"
+    )
+    args = parser.parse_args(argv)
+
+    def log(message):
+        print(message, file=sys.stderr)
+
+    results = {
+        "environment": environment(),
+        "results": run_algorithms(args.sizes, args.output_symbols, log),
+    }
+    if args.stream_bytes:
+        results["results"] += run_streams(args.stream_bytes, log)
+    if args.render_sizes:
+        results["results"] += run_renders(args.render_sizes, args.output_symbols, log)
+
+    with open(args.output, "w") as output:
+        json.dump(results, output, indent=2)
+    log(f"{len(results['results'])} cases written to {args.output}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    if baseline.get("environment") != results["environment"]:
+        log("The baseline was measured in another environment, timings may not compare")
+
+    slower = compare(results, baseline, args.tolerance)
+    for case, before, after in slower:
+        log(f"SLOWER {case}: {before:.4g} -> {after:.4g}")
+    log(f"{len(slower)} regressions against {args.baseline}")
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
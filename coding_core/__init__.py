@@ -0,0 +1,13 @@
+"""Huffman and Shannon-Fano coding without the animation stack.
+
+Nothing in this package imports manim or Qt, so codebooks can be built in
+batch jobs and short-lived processes; the scenes replay its steps.
+"""
+from .huffman import Codebook, HuffMergeEngine, HuffTree, LengthLimitedMergeEngine
+from .package_merge import package_merge_lengths
+from .shannon_fano import Leaf, Split, find_split_point, shannon_fano_codes, shannon_fano_steps, split_points
+from .layout import split_tree, tidy_layout
+from .codec import BitWriter, Packed, PrefixCodec, canonical_codes
+from .frequencies import count_bytes, count_tokens, normalize
+from .tables import check_rows, import_symbols, normalized, parse_weight, symbol_text
+from .adaptive import AdaptiveEncoder, AdaptiveHuffman, adaptive_decode, adaptive_encode
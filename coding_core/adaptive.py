@@ -0,0 +1,263 @@
+"""One-pass adaptive Huffman coding (FGK).
+
+Codes are cached between the swaps that change them and packed a chunk
+at a time, but every update still walks from a leaf to the root in plain
+Python, so coding runs at a few hundred kilobytes a second. That suits
+the animation and streams that must be coded as they arrive; bulk data
+codes far faster in two passes with PrefixCodec.from_data. The
+benchmarks (python -m benchmarks.run) track its throughput.
+"""
+from collections import namedtuple
+
+from .codec import BitWriter
+
+# What an update did to the tree, in order: the NYT node split into a new
+# NYT and a leaf for a new symbol, two subtrees swapped places to keep the
+# sibling property, a node's weight went up by one
+Spawn = namedtuple("Spawn", "internal nyt leaf symbol")
+Swap = namedtuple("Swap", "first second")
+Increment = namedtuple("Increment", "node weight")
+
+# Node 0 is the root, and the NYT node until the first symbol arrives
+ROOT = 0
+
+
+class AdaptiveHuffman:
+    """Binary Huffman tree of the symbols seen so far, kept up to date one symbol at a time.
+
+    This is Faller, Gallager and Knuth's algorithm: nodes are ranked from
+    the root down so that weights never increase along the ranks and
+    siblings are next to each other. A symbol's weight goes up by one by
+    walking from its leaf to the root, first swapping every node on the
+    way with the first node of the same weight, so an update costs O(depth).
+    Symbols seen for the first time are sent as the code of the NYT ("not
+    yet transmitted") node followed by the symbol itself.
+    """
+
+    def __init__(self):
+        self.weights = [0]
+        self.parents = [-1]
+        self.children = [None]
+        self.symbols = [None]
+        self.leaves = {}
+        self.nyt = ROOT
+        # Nodes by rank and rank of every node, and the first rank of every weight
+        self.ranked = [ROOT]
+        self.ranks = [0]
+        self.first = {0: 0}
+        # Codes found by path(), dropped for every node under a swap
+        self.codes = {}
+
+    def __len__(self):
+        return len(self.leaves)
+
+    def __contains__(self, symbol):
+        return symbol in self.leaves
+
+    def path(self, node):
+        """Returns the code of node as (bits, length), bits packed most significant first."""
+        code = self.codes.get(node)
+        if code is None:
+            code = self.codes[node] = self._walk(node)
+        return code
+
+    def _walk(self, node):
+        bits = length = 0
+        parents, children = self.parents, self.children
+        parent = parents[node]
+        while parent >= 0:
+            if children[parent][1] == node:
+                bits |= 1 << length
+            length += 1
+            node = parent
+            parent = parents[node]
+        return bits, length
+
+    def code(self, symbol):
+        """Returns the current code of symbol as a string, that of NYT for a new symbol."""
+        bits, length = self.path(self.leaves.get(symbol, self.nyt))
+        return format(bits, "b").zfill(length) if length else ""
+
+    def update(self, symbol, events=None):
+        """Counts one more symbol; events, a list, gets what changed in the tree."""
+        leaf = self.leaves.get(symbol)
+        if leaf is None:
+            leaf = self._spawn(symbol, events)
+
+        weights, parents, ranked, ranks, first = self.weights, self.parents, self.ranked, self.ranks, self.first
+        node = leaf
+        while node >= 0:
+            weight = weights[node]
+            rank = first[weight]
+            leader = ranked[rank]
+            if leader == parents[node]:
+                # The node is NYT's sibling and its parent, as heavy, opens the block
+                if ranks[node] == rank + 1:
+                    # Both head the block, and both go up together
+                    weights[node] = weights[leader] = weight + 1
+                    if rank + 2 < len(ranked) and weights[ranked[rank + 2]] == weight:
+                        first[weight] = rank + 2
+                    else:
+                        del first[weight]
+                    first.setdefault(weight + 1, rank)
+                    if events is not None:
+                        events += [Increment(node, weight + 1), Increment(leader, weight + 1)]
+                    node = parents[leader]
+                    continue
+
+                # Otherwise the node leaves for the place after its parent, then takes the lead
+                self._swap(node, ranked[rank + 1], events)
+                self._swap(node, leader, events)
+            elif leader != node:
+                self._swap(node, leader, events)
+
+            # The node now opens its block, which leaves it for the next weight up
+            if rank + 1 < len(ranked) and weights[ranked[rank + 1]] == weight:
+                first[weight] = rank + 1
+            else:
+                del first[weight]
+            weights[node] = weight + 1
+            first.setdefault(weight + 1, rank)
+            if events is not None:
+                events.append(Increment(node, weight + 1))
+            node = parents[node]
+
+    def _spawn(self, symbol, events):
+        """Splits the NYT node into a new NYT node and a leaf for symbol; returns the leaf."""
+        internal = self.nyt
+        nyt, leaf = len(self.weights), len(self.weights) + 1
+        self.weights += [0, 0]
+        self.parents += [internal, internal]
+        self.children += [None, None]
+        self.symbols += [None, symbol]
+        self.children[internal] = (nyt, leaf)
+        self.leaves[symbol] = leaf
+        self.nyt = nyt
+
+        # Both ranks go at the end, the leaf first, which keeps the weight 0 block last
+        self.ranks += [len(self.ranked) + 1, len(self.ranked)]
+        self.ranked += [leaf, nyt]
+        if events is not None:
+            events.append(Spawn(internal, nyt, leaf, symbol))
+        return leaf
+
+    def _swap(self, first, second, events):
+        """Swaps two subtrees, neither inside the other, with their ranks."""
+        if events is not None:
+            events.append(Swap(first, second))
+        parents, children, ranks, ranked = self.parents, self.children, self.ranks, self.ranked
+
+        # Every node under either one gets a new code
+        codes = self.codes
+        if codes:
+            stack = [first, second]
+            while stack:
+                node = stack.pop()
+                codes.pop(node, None)
+                pair = children[node]
+                if pair is not None:
+                    stack += pair
+
+        first_parent, second_parent = parents[first], parents[second]
+        first_pair, second_pair = children[first_parent], children[second_parent]
+        first_slot, second_slot = first_pair.index(first), second_pair.index(second)
+
+        if first_parent == second_parent:
+            children[first_parent] = first_pair[::-1]
+        else:
+            children[first_parent] = _replaced(first_pair, first_slot, second)
+            children[second_parent] = _replaced(second_pair, second_slot, first)
+        parents[first], parents[second] = second_parent, first_parent
+
+        ranks[first], ranks[second] = ranks[second], ranks[first]
+        ranked[ranks[first]], ranked[ranks[second]] = first, second
+
+
+def _replaced(pair, slot, node):
+    return (node, pair[1]) if slot == 0 else (pair[0], node)
+
+
+class AdaptiveEncoder:
+    """Encodes a byte stream chunk by chunk in one pass, the code adapting as it goes.
+
+    New bytes are sent as the NYT code and the byte's 8 bits. The codes of
+    a chunk are collected and packed together by a BitWriter. Nothing is
+    kept between chunks but the tree and the bits of an unfinished 64-bit
+    word, so streams of any length go through in constant memory.
+    """
+
+    def __init__(self):
+        self.tree = AdaptiveHuffman()
+        self.count = 0
+        self.writer = BitWriter()
+
+    def write(self, data):
+        """Encodes data and returns the bytes completed so far, whole 64-bit words."""
+        tree = self.tree
+        leaves, path, update = tree.leaves, tree.path, tree.update
+        lengths, lefts = [], []
+        for byte in data:
+            leaf = leaves.get(byte)
+            if leaf is None:
+                code, size = path(tree.nyt)
+                code, size = code << 8 | byte, size + 8
+            else:
+                code, size = path(leaf)
+            update(byte)
+            if size > 64:
+                # Only very lopsided trees get this deep; the head goes in pieces
+                for shift in range(size - 64, 0, -64):
+                    lengths.append(64)
+                    lefts.append(code >> shift & 0xFFFFFFFFFFFFFFFF)
+                size = (size - 1) % 64 + 1
+                code &= (1 << size) - 1
+            lengths.append(size)
+            lefts.append(code << 64 - size)
+        self.count += len(data)
+        return self.writer.write(lengths, lefts)
+
+    def flush(self):
+        """Returns the last bits, padded with zeros to a byte."""
+        return self.writer.flush()
+
+
+def adaptive_encode(chunks):
+    """Yields the adaptive Huffman code of a stream of byte chunks as it is read."""
+    encoder = AdaptiveEncoder()
+    for chunk in chunks:
+        encoded = encoder.write(chunk)
+        if encoded:
+            yield encoded
+    last = encoder.flush()
+    if last:
+        yield last
+
+
+def adaptive_decode(data, count):
+    """Returns the count bytes encoded in data by AdaptiveEncoder."""
+    tree = AdaptiveHuffman()
+    children, symbols, update = tree.children, tree.symbols, tree.update
+    output = bytearray()
+    bits = _bits(data)
+    try:
+        while len(output) < count:
+            node = ROOT
+            while children[node] is not None:
+                node = children[node][next(bits)]
+            if node == tree.nyt:
+                symbol = 0
+                for _ in range(8):
+                    symbol = symbol << 1 | next(bits)
+            else:
+                symbol = symbols[node]
+            update(symbol)
+            output.append(symbol)
+    except StopIteration:
+        raise ValueError(f"The data ends after {len(output)} of {count} bytes") from None
+    return bytes(output)
+
+
+def _bits(data):
+    for byte in data:
+        for shift in range(7, -1, -1):
+            yield byte >> shift & 1
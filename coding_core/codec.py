@@ -0,0 +1,417 @@
+"""Packing symbol streams into bits with a binary prefix code, and back."""
+from collections import namedtuple
+
+import numpy as np
+
+from .huffman import Codebook, HuffMergeEngine
+from .package_merge import package_merge_lengths
+
+# Any 57 bits starting inside a byte can be read as one 64-bit word
+MAX_CODE_LENGTH = 57
+
+# Codes up to this long decode with a single lookup
+TABLE_BITS = 12
+
+# Symbols encoded per pass and blocks decoded side by side, small enough
+# for the working arrays to stay in cache
+CHUNK_SYMBOLS = 1 << 16
+DECODE_LANES = 1 << 13
+
+# Most codes joined into one 64-bit element while encoding, or read from
+# one 64-bit window while decoding
+MAX_GROUP = 8
+
+# Encoded symbols: data holds count codes in bits most significant first,
+# offsets the bit offset of every block_size-th symbol, where decoding can
+# start independently
+Packed = namedtuple("Packed", "data bits count block_size offsets")
+
+_ONE = np.uint64(1)
+_SIX = np.uint64(6)
+_LENGTH_MASK = np.uint64(63)
+
+
+def canonical_codes(lengths):
+    """Returns the canonical code of each length, as integers.
+
+    Codes are handed out by length and then by position, so they follow
+    from the lengths alone.
+    """
+    lengths = [int(length) for length in lengths]
+    codes = [0] * len(lengths)
+    code = previous = 0
+    for symbol in sorted(range(len(lengths)), key=lengths.__getitem__):
+        code <<= lengths[symbol] - previous
+        codes[symbol] = code
+        code += 1
+        previous = lengths[symbol]
+    return codes
+
+
+def _byte_value(symbol):
+    """Returns the byte a symbol stands for in bytes data, or None."""
+    if isinstance(symbol, (int, np.integer)) and 0 <= symbol < 256:
+        return int(symbol)
+    if isinstance(symbol, str) and len(symbol) == 1 and ord(symbol) < 256:
+        return ord(symbol)
+    if isinstance(symbol, bytes) and len(symbol) == 1:
+        return symbol[0]
+    return None
+
+
+def _index_type(count):
+    """Returns the smallest unsigned integer type that holds count different indices."""
+    return np.uint8 if count <= 1 << 8 else np.uint16 if count <= 1 << 16 else np.intp
+
+
+def _joined(first_lengths, first_left, second_lengths, second_left):
+    """Returns the lengths and left aligned codes of codes each followed by another."""
+    return first_lengths + second_lengths, first_left | second_left >> first_lengths
+
+
+def _place(lengths, left, carry, used):
+    """Lays codes out in 64-bit words after used bits, the first word starting with carry.
+
+    lengths and left hold the length and the left aligned value of every
+    code, up to 64 bits each; left is overwritten. Returns the words, the
+    bit position of every code and the total bits.
+    """
+    ends = np.cumsum(lengths)
+    ends += np.uint64(used)
+    positions = ends - lengths
+
+    # Each code lands in the word of its first bit and spills over into the
+    # next one; codes in a word never overlap, so adding them is OR
+    words_index = (positions >> _SIX).astype(np.intp)
+    shifts = positions & _LENGTH_MASK
+    heads = left >> shifts
+    left <<= _ONE
+    shifts ^= _LENGTH_MASK
+    left <<= shifts
+    words = np.zeros(int(words_index[-1]) + 2, dtype=np.uint64)
+    np.add.at(words, words_index, heads)
+    words_index += 1
+    np.add.at(words, words_index, left)
+    words[0] |= carry
+    return words, positions, int(ends[-1])
+
+
+class BitWriter:
+    """Codes appended in batches and handed out as whole bytes, most significant bit first."""
+
+    def __init__(self):
+        # The unfinished word and how many of its bits are used
+        self.carry = np.uint64(0)
+        self.used = 0
+
+    def write(self, lengths, left):
+        """Appends codes given by their lengths and left aligned 64-bit values; returns the words completed."""
+        if not len(lengths):
+            return b""
+        words, _, total = _place(
+            np.asarray(lengths, dtype=np.uint64), np.array(left, dtype=np.uint64), self.carry, self.used
+        )
+        full = total >> 6
+        self.carry = words[full]
+        self.used = total & 63
+        return words[:full].astype(">u8").tobytes()
+
+    def flush(self):
+        """Returns the last bits, padded with zeros to a byte."""
+        last = np.array([self.carry], dtype=">u8").tobytes()[:(self.used + 7) // 8]
+        self.carry = np.uint64(0)
+        self.used = 0
+        return last
+
+
+class PrefixCodec:
+    """Encodes symbol streams into packed bits with a binary prefix code, and decodes them.
+
+    Only the code lengths are kept: the codewords are the canonical ones of
+    the same lengths, which compress exactly as well as the code they come
+    from and let codes of up to TABLE_BITS bits decode with one table
+    lookup, longer ones with a search over the lengths. Both directions
+    run as NumPy operations over whole chunks of symbols; decoding steps
+    through every block of block_size symbols at once, starting from the
+    offsets recorded while encoding.
+    """
+
+    def __init__(self, symbols, lengths, block_size=1024):
+        self.symbols = list(symbols)
+        lengths = [int(length) for length in lengths]
+        if not self.symbols or len(self.symbols) != len(lengths):
+            raise ValueError("Every symbol needs exactly one code length")
+        if len(set(self.symbols)) != len(self.symbols):
+            raise ValueError("Symbols must be distinct")
+
+        self.max_length = max(lengths)
+        if self.max_length > MAX_CODE_LENGTH:
+            raise ValueError(
+                f"Codes longer than {MAX_CODE_LENGTH} bits cannot be packed, use a length-limited code"
+            )
+        if len(lengths) > 1 and min(lengths) < 1:
+            raise ValueError("Only a single symbol can have an empty code")
+        kraft = sum(1 << (self.max_length - length) for length in lengths)
+        if kraft > 1 << self.max_length:
+            raise ValueError("The code lengths do not form a prefix code")
+
+        self.block_size = block_size
+        self.index = {symbol: index for index, symbol in enumerate(self.symbols)}
+        codes = canonical_codes(lengths)
+        self.lengths = np.array(lengths, dtype=np.uint64)
+        self.left = np.array(
+            [code << (64 - length) if length else 0 for code, length in zip(codes, lengths)],
+            dtype=np.uint64,
+        )
+
+        byte_values = [_byte_value(symbol) for symbol in self.symbols]
+        self.byte_indices = np.full(256, -1, dtype=np.int64)
+        for index, value in enumerate(byte_values):
+            if value is not None:
+                self.byte_indices[value] = index
+        self.byte_values = None
+        if None not in byte_values:
+            self.byte_values = np.array(byte_values, dtype=np.uint8)
+
+        # Bytes data is packed straight from its byte values, two at a time
+        # when two codes always fit in an element
+        known = self.byte_indices >= 0
+        self.byte_lengths = np.where(known, self.lengths[self.byte_indices], 0).astype(np.uint64)
+        self.byte_left = np.where(known, self.left[self.byte_indices], 0).astype(np.uint64)
+        self.pair_lengths = self.pair_left = None
+        if 2 * self.max_length <= 64:
+            firsts, seconds = np.divmod(np.arange(1 << 16), 256)
+            self.pair_lengths, self.pair_left = _joined(
+                self.byte_lengths[firsts], self.byte_left[firsts],
+                self.byte_lengths[seconds], self.byte_left[seconds],
+            )
+
+        self._build_tables(codes, lengths, kraft)
+
+    def _build_tables(self, codes, lengths, kraft):
+        # One entry per table_bits window, symbol << 6 | length; 0 sends the
+        # window on to the search over the lengths
+        self.table_bits = min(self.max_length, TABLE_BITS)
+        self.table = np.zeros(1 << self.table_bits, dtype=np.uint64)
+        for symbol, (code, length) in enumerate(zip(codes, lengths)):
+            if 0 < length <= self.table_bits:
+                start = code << (self.table_bits - length)
+                self.table[start:start + (1 << (self.table_bits - length))] = symbol << 6 | length
+
+        # Canonical codes of one length are consecutive, so the first code
+        # of every length and where it ends decide the length of a window
+        self.search = self.max_length > self.table_bits or kraft < 1 << self.max_length
+        self.sorted_symbols = np.array(sorted(range(len(lengths)), key=lengths.__getitem__), dtype=np.uint64)
+        counts = np.bincount(lengths, minlength=self.max_length + 1).tolist()
+        self.first_codes = np.zeros(self.max_length + 1, dtype=np.uint64)
+        self.first_ranks = np.zeros(self.max_length + 1, dtype=np.uint64)
+        self.limits = np.zeros(self.max_length, dtype=np.uint64)
+        first = rank = 0
+        for length in range(1, self.max_length + 1):
+            self.first_codes[length] = first
+            self.first_ranks[length] = rank
+            self.limits[length - 1] = (first + counts[length]) << (self.max_length - length)
+            rank += counts[length]
+            first = (first + counts[length]) << 1
+
+    @classmethod
+    def from_codebook(cls, codebook, block_size=1024):
+        """Returns the codec of a Huffman Codebook or a {symbol: code} dict like shannon_fano_codes'."""
+        if isinstance(codebook, Codebook):
+            if len(codebook.outputSymbols) != 2:
+                raise ValueError("Only codes with two output symbols pack into bits")
+            lengths = [codebook.lengths[codebook.leaves[symbol]] for symbol in codebook]
+            return cls(list(codebook), lengths, block_size)
+        return cls(list(codebook), [len(code) for code in codebook.values()], block_size)
+
+    @classmethod
+    def from_data(cls, data, block_size=1024, max_length=None):
+        """Returns the codec of the binary Huffman code of the byte frequencies in data.
+
+        With a max_length, the code is the cheapest one with no longer
+        codewords; up to TABLE_BITS, every codeword decodes with one lookup.
+        """
+        counts = np.bincount(np.frombuffer(data, dtype=np.uint8), minlength=256)
+        symbols = np.flatnonzero(counts).tolist()
+        probabilities = (counts[symbols] / counts.sum()).tolist()
+        if max_length is not None:
+            return cls(symbols, package_merge_lengths(probabilities, max_length), block_size)
+        engine = HuffMergeEngine(symbols, probabilities, 2)
+        for _ in engine:
+            pass
+        return cls.from_codebook(Codebook(symbols, ["0", "1"], engine), block_size)
+
+    def indices(self, data):
+        """Returns the symbol indices of a sequence of symbols."""
+        try:
+            return np.fromiter((self.index[symbol] for symbol in data), dtype=np.intp)
+        except KeyError as error:
+            raise ValueError(f"Symbol {error.args[0]!r} has no code") from None
+
+    def encode(self, data):
+        """Encodes bytes-like data or a sequence of symbols."""
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            values = np.frombuffer(data, dtype=np.uint8)
+            counts = np.bincount(values, minlength=256)
+            missing = np.flatnonzero(counts * (self.byte_indices < 0))
+            if len(missing):
+                raise ValueError(f"Byte {missing[0]} has no code")
+            return self._pack(values, self.byte_lengths, self.byte_left, self.pair_lengths, self.pair_left)
+        return self.encode_indices(self.indices(data))
+
+    def encode_indices(self, indices):
+        """Encodes a sequence of symbol indices."""
+        return self._pack(np.asarray(indices, dtype=np.intp), self.lengths, self.left)
+
+    def _group(self):
+        # Codes joined into one element: as many as always fit in 64 bits,
+        # and a divisor of block_size so blocks start on an element
+        group = 1
+        while 2 * group <= MAX_GROUP and 2 * group * self.max_length <= 64 and self.block_size % (2 * group) == 0:
+            group *= 2
+        return group
+
+    def _elements(self, keys, code_lengths, code_left, pair_lengths, pair_left, group):
+        # Lengths and left aligned codes of keys, group codes joined into
+        # each element and the few keys after the last whole group into one more
+        whole = len(keys) - len(keys) % group
+        joined = 1
+        if group > 1 and pair_lengths is not None:
+            pairs = keys[:whole].view(">u2")
+            lengths, left = np.take(pair_lengths, pairs), np.take(pair_left, pairs)
+            joined = 2
+        else:
+            lengths, left = np.take(code_lengths, keys[:whole]), np.take(code_left, keys[:whole])
+        while joined < group:
+            lengths, left = _joined(lengths[0::2], left[0::2], lengths[1::2], left[1::2])
+            joined *= 2
+
+        if whole < len(keys):
+            last_length, last_left = np.uint64(0), np.uint64(0)
+            for key in keys[whole:].tolist():
+                last_length, last_left = _joined(last_length, last_left, code_lengths[key], code_left[key])
+            lengths = np.append(lengths, last_length)
+            left = np.append(left, last_left)
+        return lengths, left
+
+    def _pack(self, keys, code_lengths, code_left, pair_lengths=None, pair_left=None):
+        # code_lengths and code_left hold the length and the left aligned
+        # code of every key, pair_lengths and pair_left those of every pair
+        # of byte keys
+        count = len(keys)
+        group = self._group()
+        chunk_symbols = max(1, CHUNK_SYMBOLS // self.block_size) * self.block_size
+
+        data = bytearray()
+        offsets = []
+        carry = np.uint64(0)
+        used = 0
+        for start in range(0, count, chunk_symbols):
+            lengths, left = self._elements(
+                keys[start:start + chunk_symbols], code_lengths, code_left, pair_lengths, pair_left, group
+            )
+            words, positions, total = _place(lengths, left, carry, used)
+            offsets.append(positions[::self.block_size // group] + np.uint64(8 * len(data)))
+
+            full = total >> 6
+            data += words[:full].astype(">u8").tobytes()
+            carry = words[full]
+            used = total & 63
+
+        data += np.array([carry], dtype=">u8").tobytes()[:(used + 7) // 8]
+        bits = 8 * len(data) - (-used % 8)
+        offsets = np.concatenate(offsets) if offsets else np.zeros(0, dtype=np.uint64)
+        return Packed(bytes(data), bits, count, self.block_size, offsets)
+
+    def decode_indices(self, packed):
+        """Decodes a Packed stream into symbol indices."""
+        return self._decode(packed).astype(np.intp)
+
+    def _decode(self, packed):
+        # Symbol indices in the smallest integer type that holds them
+        count, block_size, offsets = packed.count, packed.block_size, packed.offsets
+        if count == 0:
+            return np.zeros(0, dtype=np.intp)
+        if self.max_length == 0:
+            return np.zeros(count, dtype=np.intp)
+
+        # The stream as 64-bit words, padded so the last codes can be read
+        data = bytes(packed.data)
+        words = np.frombuffer(data + bytes(16 - len(data) % 8), dtype=">u8").astype(np.uint64)
+        table_shift = np.uint64(64 - self.table_bits)
+        last_length = count - (len(offsets) - 1) * block_size
+        # Codes taken from every window
+        reads = max(1, min(MAX_GROUP, 64 // self.max_length))
+
+        output = np.empty(count, dtype=_index_type(len(self.symbols)))
+        for first in range(0, len(offsets), DECODE_LANES):
+            positions = offsets[first:first + DECODE_LANES].astype(np.uint64)
+            columns = np.empty((block_size, len(positions)), dtype=output.dtype)
+            finishing = first + len(positions) == len(offsets)
+            for window_step in range(0, block_size, reads):
+                # The 64 bits from every position, from the word it falls in and the next
+                index = positions >> _SIX
+                shifts = positions & _LENGTH_MASK
+                window = np.take(words, index)
+                window <<= shifts
+                index += _ONE
+                tail = np.take(words, index)
+                tail >>= _ONE
+                shifts ^= _LENGTH_MASK
+                tail >>= shifts
+                window |= tail
+
+                for step in range(window_step, min(window_step + reads, block_size)):
+                    # The last block may be shorter than the others
+                    if finishing and step == last_length:
+                        end, positions, window = positions[-1], positions[:-1], window[:-1]
+                        finishing = False
+                    if not len(positions):
+                        break
+
+                    entries = np.take(self.table, window >> table_shift)
+                    if self.search and not entries.all():
+                        entries = self._search(window, entries)
+                    lengths = entries & _LENGTH_MASK
+                    positions += lengths
+                    window <<= lengths
+                    columns[step, :len(positions)] = entries >> _SIX
+                if not len(positions):
+                    break
+
+            start = first * block_size
+            stop = min(count, start + columns.shape[1] * block_size)
+            output[start:stop] = columns.T.ravel()[:stop - start]
+
+        if finishing:
+            end = positions[-1]
+        if int(end) != packed.bits:
+            raise ValueError("The codes do not end where the stream does")
+        return output
+
+    def _search(self, window, entries):
+        # Finds the codes the table does not hold from the ranges of each length
+        missing = np.flatnonzero(entries == 0)
+        if not len(missing):
+            return entries
+
+        values = window[missing] >> np.uint64(64 - self.max_length)
+        lengths = np.searchsorted(self.limits, values, side="right")
+        if (lengths >= self.max_length).any():
+            raise ValueError("The stream holds a bit pattern that is not a code")
+        lengths = lengths.astype(np.uint64) + _ONE
+        ranks = self.first_ranks[lengths] + (values >> (np.uint64(self.max_length) - lengths)) - self.first_codes[lengths]
+        entries[missing] = self.sorted_symbols[ranks] << _SIX | lengths
+        return entries
+
+    def decode(self, packed):
+        """Decodes a Packed stream into its list of symbols."""
+        symbols = np.empty(len(self.symbols), dtype=object)
+        symbols[:] = self.symbols
+        return symbols[self.decode_indices(packed)].tolist()
+
+    def decode_bytes(self, packed):
+        """Decodes a Packed stream whose symbols all stand for bytes."""
+        if self.byte_values is None:
+            raise ValueError("Not every symbol stands for a byte")
+        return np.take(self.byte_values, self._decode(packed)).tobytes()
@@ -0,0 +1,184 @@
+"""Symbol frequencies counted straight from files, however large.
+
+Files are memory-mapped and counted a chunk at a time, so memory use does
+not grow with the file; big files are cut into ranges counted in parallel
+processes. Symbols come out as strings: a byte or a group of bytes as the
+latin-1 characters of its values, which PrefixCodec packs straight from
+the bytes, and a token as its UTF-8 text.
+"""
+import mmap
+import multiprocessing
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Bytes counted per pass
+CHUNK_BYTES = 1 << 24
+
+# Smaller files are counted in the calling process
+PARALLEL_BYTES = 1 << 28
+
+# Groups of up to this many bytes are counted into a dense table
+DENSE_WIDTH = 2
+
+
+def _ranges(size, parts, align):
+    """Cuts [0, size) into at most parts ranges that start at multiples of align."""
+    step = -(-size // parts // align) * align or align
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+
+def _workers(size, workers):
+    if workers is None:
+        workers = (os.cpu_count() or 1) if size >= PARALLEL_BYTES else 1
+    return max(1, workers)
+
+
+def _map_ranges(function, path, ranges, *args):
+    """Returns function(path, start, end, *args) for every range, in parallel if there are several."""
+    if len(ranges) == 1:
+        return [function(path, *ranges[0], *args)]
+    # Spawned, since the GUIs count files too
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(len(ranges), mp_context=context) as pool:
+        futures = [pool.submit(function, path, start, end, *args) for start, end in ranges]
+        return [future.result() for future in futures]
+
+
+def _count_range(path, start, end, width):
+    """Counts the groups of width bytes in path[start:end], which holds whole groups but maybe the last."""
+    dense = width <= DENSE_WIDTH
+    counts = np.zeros(1 << 8 * width, dtype=np.int64) if dense else Counter()
+    chunk_bytes = CHUNK_BYTES // width * width
+
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for offset in range(start, end, chunk_bytes):
+            size = min(chunk_bytes, end - offset)
+            whole = size // width * width
+            if width == 1:
+                # Bytes are counted in pairs, half as many numbers to count
+                view = np.frombuffer(mapped, dtype=">u2", count=size // 2, offset=offset)
+                pairs = np.bincount(view, minlength=1 << 16).reshape(256, 256)
+                counts += pairs.sum(axis=0) + pairs.sum(axis=1)
+                if size % 2:
+                    counts[mapped[offset + size - 1]] += 1
+            elif dense:
+                # A group of two bytes reads as one big-endian number
+                view = np.frombuffer(mapped, dtype=">u2", count=whole // 2, offset=offset)
+                counts += np.bincount(view, minlength=len(counts))
+            else:
+                view = np.frombuffer(mapped, dtype=np.uint8, count=whole, offset=offset)
+                groups, group_counts = np.unique(view.reshape(-1, width), axis=0, return_counts=True)
+                counts.update(dict(zip(map(bytes, groups), group_counts.tolist())))
+            # The map cannot close while a view of it is alive
+            del view
+
+            # A file that does not divide into groups ends with a shorter one
+            if whole < size:
+                key = mapped[offset + whole:offset + size]
+                if dense:
+                    counts = Counter(_dense_counts(counts, width))
+                    dense = False
+                counts[key] += 1
+
+    return _dense_counts(counts, width) if dense else counts
+
+
+def _dense_counts(counts, width):
+    """Turns a dense table of counts into {group of bytes: count}."""
+    keys = np.flatnonzero(counts)
+    return {int(key).to_bytes(width, "big"): int(counts[key]) for key in keys}
+
+
+def _count_tokens_range(path, start, end, pattern):
+    """Counts the tokens of path[start:end], which starts and ends on a line boundary."""
+    regex = re.compile(pattern)
+    counts = Counter()
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        offset = start
+        while offset < end:
+            # Chunks end on a line boundary, so no token is cut in two
+            stop = min(offset + CHUNK_BYTES, end)
+            if stop < end:
+                newline = mapped.rfind(b"\n", offset, stop)
+                stop = newline + 1 if newline >= 0 else _line_end(mapped, stop, end)
+            counts.update(regex.findall(mapped[offset:stop]))
+            offset = stop
+    return counts
+
+
+def _line_end(mapped, offset, end):
+    """Returns the position after the first line break at or past offset, or end."""
+    newline = mapped.find(b"\n", offset, end)
+    return newline + 1 if newline >= 0 else end
+
+
+def count_bytes(path, width=1, workers=None):
+    """Returns {symbol: count} of the bytes of a file, or of its consecutive groups of width bytes.
+
+    A file whose size is not a multiple of width ends with one shorter
+    group. workers processes count ranges of the file side by side; by
+    default one per CPU for files of PARALLEL_BYTES or more.
+    """
+    if width < 1:
+        raise ValueError("Bytes are counted in groups of at least one")
+    size = os.path.getsize(path)
+    if not size:
+        return {}
+
+    ranges = _ranges(size, _workers(size, workers), width)
+    totals = Counter()
+    for counts in _map_ranges(_count_range, path, ranges, width):
+        totals.update(counts)
+    return {key.decode("latin-1"): count for key, count in totals.items()}
+
+
+def count_tokens(path, pattern=rb"\S+", workers=None):
+    """Returns {token: count} of the matches of pattern, a bytes regular expression, in a text file.
+
+    Tokens cannot span lines. Files are read as UTF-8, with undecodable
+    bytes replaced.
+    """
+    size = os.path.getsize(path)
+    if not size:
+        return {}
+
+    # Ranges are moved to line boundaries
+    ranges = _ranges(size, _workers(size, workers), 1)
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        bounds = sorted({0, size} | {_line_end(mapped, start, size) for start, end in ranges[1:]})
+    ranges = list(zip(bounds, bounds[1:]))
+
+    totals = Counter()
+    for counts in _map_ranges(_count_tokens_range, path, ranges, pattern):
+        for token, count in counts.items():
+            totals[token.decode("utf-8", "replace")] += count
+    return dict(totals)
+
+
+def normalize(counts, limit=None, rest="<other>"):
+    """Returns (symbols, probabilities) of counts, the most frequent first.
+
+    With a limit, only the limit - 1 most frequent symbols are kept and the
+    others are counted together as rest, so the list stays short enough to
+    draw. Ties go in the order of the symbols.
+    """
+    total = sum(counts.values())
+    if not total:
+        raise ValueError("Nothing was counted")
+
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    if limit is not None and len(ranked) > limit:
+        if limit < 2:
+            raise ValueError("At least two symbols have to be kept")
+        if rest in counts:
+            raise ValueError(f"{rest!r} is already a symbol")
+        others = sum(count for symbol, count in ranked[limit - 1:])
+        ranked = sorted(ranked[:limit - 1] + [(rest, others)], key=lambda item: -item[1])
+
+    symbols = [symbol for symbol, count in ranked]
+    probabilities = [count / total for symbol, count in ranked]
+    return symbols, probabilities
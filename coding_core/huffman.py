@@ -0,0 +1,610 @@
+"""Huffman tree construction, layout and codewords."""
+import heapq
+from bisect import bisect_left
+
+import numpy as np
+
+from .package_merge import package_merge_lengths
+
+class NodeStore():
+    """Nodes kept in parallel arrays.
+
+    Positions are indexed by slot and every subtree owns a contiguous range
+    of slots with its leader first, so moving a subtree is one slice add and
+    merging neighbours is a range union. Leaves take the last slots; each new
+    leader takes the free slot right before the subtrees it groups.
+    """
+    def __init__(self, leavesNum, nodesNum):
+        # By slot
+        self.x = np.zeros(nodesNum, dtype=np.int64)
+        self.y = np.zeros(nodesNum, dtype=np.int64)
+        self.nodes = np.zeros(nodesNum, dtype=np.int64)
+
+        # By node
+        self.slots = np.zeros(nodesNum, dtype=np.int64)
+        self.sizes = np.ones(nodesNum, dtype=np.int64)
+        self.probabilities = np.zeros(nodesNum, dtype=np.float64)
+        self.names = []
+        self.ids = {}
+
+        self.leavesNum = leavesNum
+        self.free = nodesNum - leavesNum
+
+    def add(self, name, position, probability):
+        node = len(self.names)
+        if node < self.leavesNum:
+            slot = self.free + node
+        else:
+            self.free -= 1
+            slot = self.free
+
+        self.names.append(name)
+        self.ids[name] = node
+        self.nodes[slot] = node
+        self.slots[node] = slot
+        self.x[slot] = position[0]
+        self.y[slot] = position[1]
+        self.probabilities[node] = probability
+        return node
+
+    def position(self, name):
+        slot = self.slots[self.ids[name]]
+        return [int(self.x[slot]), int(self.y[slot]), 0]
+
+    def positions(self, start, end):
+        names = [self.names[node] for node in self.nodes[start:end].tolist()]
+        xs = self.x[start:end].tolist()
+        ys = self.y[start:end].tolist()
+        return {name: [x, y, 0] for name, x, y in zip(names, xs, ys)}
+
+    def rotate(self, start, middle, end):
+        # Swap the slot ranges [start, middle) and [middle, end)
+        split = end - (middle - start)
+        for array in (self.x, self.y, self.nodes):
+            moved = array[start:middle].copy()
+            array[start:split] = array[middle:end]
+            array[split:end] = moved
+        self.slots[self.nodes[start:end]] = np.arange(start, end)
+
+class SubTree():
+    """View of the subtree led by one node of a NodeStore."""
+    __slots__ = ('store', 'node')
+
+    def __init__(self, store, node):
+        self.store = store
+        self.node = node
+
+    def __repr__(self):
+        return f'(Leader: {self.leader}, Probability: {self.probability}, Positions: {self.positions})'
+
+    @property
+    def leader(self):
+        return self.store.names[self.node]
+
+    @property
+    def probability(self):
+        return float(self.store.probabilities[self.node])
+
+    @property
+    def start(self):
+        return int(self.store.slots[self.node])
+
+    @property
+    def end(self):
+        return self.start + int(self.store.sizes[self.node])
+
+    @property
+    def leftMostPosition(self):
+        return int(self.store.x[self.start:self.end].min())
+
+    @property
+    def rightMostPosition(self):
+        return int(self.store.x[self.start:self.end].max())
+
+    @property
+    def positions(self):
+        return self.store.positions(self.start, self.end)
+
+    @property
+    def children(self):
+        # Child subtrees follow the leader's slot one after another
+        store = self.store
+        slot, end = self.start + 1, self.end
+        children = []
+        while slot < end:
+            child = int(store.nodes[slot])
+            children.append(store.names[child])
+            slot += int(store.sizes[child])
+        return children
+
+    @property
+    def descendants(self):
+        return [self.store.names[node] for node in self.store.nodes[self.start + 1:self.end].tolist()]
+
+    def span(self):
+        # Left, right and bottom of the leaves, which sit left to right in slot order
+        store = self.store
+        first, last = self.start, self.end - 1
+        while store.sizes[store.nodes[first]] > 1:
+            first += 1
+        return int(store.x[first]), int(store.x[last]), int(store.y[last])
+
+    def position(self):
+        slot = self.start
+        return [int(self.store.x[slot]), int(self.store.y[slot]), 0]
+
+    def move(self, movement):
+        self.store.x[self.start:self.end] += movement
+
+class Forest():
+    """Subtree leaders in layout order, leftmost first.
+
+    Merges take subtrees from the left and sorting only reinserts the new
+    subtree after the ones it jumps over, so the order is a window of an
+    array with room on the left for every leader still to be created.
+    """
+    def __init__(self, store, capacity):
+        self.store = store
+        self.roots = np.zeros(capacity, dtype=np.int64)
+        self.head = capacity - store.leavesNum
+        self.tail = self.head
+
+    def __repr__(self):
+        return repr([self[leader] for leader in self])
+
+    def __len__(self):
+        return self.tail - self.head
+
+    def __iter__(self):
+        names = self.store.names
+        return iter([names[node] for node in self.roots[self.head:self.tail].tolist()])
+
+    def __contains__(self, leader):
+        node = self.store.ids.get(leader)
+        return node is not None and node in self.roots[self.head:self.tail]
+
+    def __getitem__(self, leader):
+        return SubTree(self.store, self.store.ids[leader])
+
+    def items(self):
+        return ((leader, self[leader]) for leader in self)
+
+    def front(self, count):
+        return self.roots[self.head:self.head + count]
+
+    def append(self, node):
+        self.roots[self.tail] = node
+        self.tail += 1
+
+    def popLeft(self, count):
+        nodes = self.roots[self.head:self.head + count].copy()
+        self.head += count
+        return nodes
+
+    def pushLeft(self, node):
+        self.head -= 1
+        self.roots[self.head] = node
+
+    def jump(self, count):
+        # Moves the leftmost leader after the next count ones
+        node = self.roots[self.head]
+        self.roots[self.head:self.head + count] = self.roots[self.head + 1:self.head + count + 1]
+        self.roots[self.head + count] = node
+
+class HuffMergeEngine():
+    """Priority-queue Huffman merger.
+
+    Emits the same merge events as re-sorting the whole forest after every
+    step, in O(n log n): each event is (newLeader, children, newIndex), where
+    newIndex is the place of the new subtree in the probability order.
+    """
+    def __init__(self, inputSymbols, probabilities, outputSymbolsNum):
+        # Sort the nodes
+        nodes = {}
+        for i in range(0, len(inputSymbols)):
+            nodes[inputSymbols[i]] = probabilities[i]
+
+        self.leaves = sorted(nodes.items(), key=lambda item: item[1])
+        self.symbolsNum = len(inputSymbols)
+        self.D = outputSymbolsNum
+        self.nodeCount = 1
+        self.firstStep = True
+
+        # Tree shape by node, leaves first and then leaders as they merge
+        self.parents = [-1] * len(self.leaves)
+        self.digits = [0] * len(self.leaves)
+
+        # Leaves keep their sorted order on ties, newer subtrees go first
+        self.leafKeys = [(prob, order) for order, (symbol, prob) in enumerate(self.leaves)]
+        self.heap = [(prob, order, symbol) for order, (symbol, prob) in enumerate(self.leaves)]
+        self.leavesTaken = 0
+
+        # Merged probabilities never decrease, so only the newest run of
+        # equal probabilities can sit after a new subtree
+        self.subTreesNum = 0
+        self.tailProbability = None
+        self.tailCount = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __iter__(self):
+        while True:
+            yield self.step()
+            if len(self.heap) == 1: break
+
+    def step(self):
+        # Calculates the number of subTrees to group
+        D = self.D
+
+        if self.firstStep:
+            self.firstStep = False
+            r = (self.symbolsNum - 1) % (D - 1)
+            D = D - r
+
+        # Pop the lightest subtrees
+        children = []
+        probability = 0
+        newNode = len(self.parents)
+        for count in range(min(D, len(self.heap))):
+            prob, order, leader = heapq.heappop(self.heap)
+            if order >= 0:
+                self.leavesTaken += 1
+                node = order
+            else:
+                self.subTreesNum -= 1
+                if prob == self.tailProbability:
+                    self.tailCount -= 1
+                node = len(self.leaves) - order - 1
+            self.parents[node] = newNode
+            self.digits[node] = count
+            children.append(leader)
+            probability += prob
+
+        self.parents.append(-1)
+        self.digits.append(0)
+        newLeader = str(self.nodeCount)
+        newKey = (probability, -self.nodeCount)
+        self.nodeCount += 1
+
+        # Position of the new subtree among the remaining ones
+        newIndex = bisect_left(self.leafKeys, newKey, self.leavesTaken) - self.leavesTaken
+        newIndex += self.subTreesNum
+        if probability == self.tailProbability:
+            newIndex -= self.tailCount
+            self.tailCount += 1
+        else:
+            self.tailProbability = probability
+            self.tailCount = 1
+        self.subTreesNum += 1
+
+        heapq.heappush(self.heap, (*newKey, newLeader))
+
+        return newLeader, children, newIndex
+
+    def mergesNum(self):
+        # Number of steps needed to reduce the leaves to a single tree
+        count = len(self.leaves)
+        D = self.D - (self.symbolsNum - 1) % (self.D - 1)
+        merges = 0
+        while True:
+            count -= min(D, count) - 1
+            merges += 1
+            D = self.D
+            if count == 1: break
+
+        return merges
+
+    def codewords(self):
+        # Codes of the leaves packed as integers in base D, plus their lengths
+        codes = [0] * len(self.parents)
+        lengths = [0] * len(self.parents)
+        for node in range(len(self.parents) - 1, -1, -1):
+            parent = self.parents[node]
+            if parent >= 0:
+                codes[node] = codes[parent] * self.D + self.digits[node]
+                lengths[node] = lengths[parent] + 1
+
+        leavesNum = len(self.leaves)
+        return codes[:leavesNum], lengths[:leavesNum]
+
+class LengthLimitedMergeEngine():
+    """Merges of the cheapest code whose codewords are at most maxLength digits long.
+
+    Lengths come from package-merge and the tree is grouped level by level
+    from the deepest one up, the lightest nodes of a level first. Subtrees
+    are ordered by the step that merges them instead of by probability, so
+    every step still takes the front of the forest and the events are the
+    same as HuffMergeEngine's.
+    """
+    def __init__(self, inputSymbols, probabilities, outputSymbolsNum, maxLength):
+        nodes = {}
+        for i in range(0, len(inputSymbols)):
+            nodes[inputSymbols[i]] = probabilities[i]
+        symbols = list(nodes)
+        probs = list(nodes.values())
+        lengths = package_merge_lengths(probs, maxLength, outputSymbolsNum)
+
+        self.symbolsNum = len(inputSymbols)
+        self.D = outputSymbolsNum
+        self.maxLength = maxLength
+        self.nodeCount = 1
+
+        # Group every level, nodes are leaf indices then subtree numbers after them
+        symbolsNum = len(symbols)
+        groups = []
+        groupProbabilities = []
+        carried = []
+        for depth in range(max(lengths), 0, -1):
+            level = [(probs[i], 0, i) for i in range(symbolsNum) if lengths[i] == depth] + carried
+            level.sort()
+            carried = []
+
+            # A single node left over moves up a level rather than get a parent of its own
+            short = len(level) % self.D
+            if short == 1 and depth > 1:
+                carried.append(level.pop())
+                short = 0
+            start = 0
+            for size in ([short] if short else []) + [self.D] * ((len(level) - short) // self.D):
+                group = level[start:start + size]
+                start += size
+                # Children in forest order, leaves before subtrees
+                groups.append(sorted(node for prob, kind, node in group))
+                groupProbabilities.append(sum(prob for prob, kind, node in group))
+                carried.append((groupProbabilities[-1], 1, symbolsNum + len(groups) - 1))
+
+        # Forest order is the step that merges each node, the root last
+        mergedAt = [len(groups)] * (symbolsNum + len(groups))
+        for step, group in enumerate(groups):
+            for node in group:
+                mergedAt[node] = step
+        leafOrder = sorted(range(symbolsNum), key=lambda i: mergedAt[i])
+        slot = {leaf: order for order, leaf in enumerate(leafOrder)}
+        self.leaves = [(symbols[i], probs[i]) for i in leafOrder]
+
+        # Steps with the slots of their children and where the new subtree lands,
+        # counted with a Fenwick tree over the merge steps of the forest
+        counts = [0] * (len(groups) + 2)
+
+        def add(step, value):
+            step += 1
+            while step < len(counts):
+                counts[step] += value
+                step += step & -step
+
+        def before(step):
+            total = 0
+            while step > 0:
+                total += counts[step]
+                step -= step & -step
+            return total
+
+        for leaf in leafOrder:
+            add(mergedAt[leaf], 1)
+        self.parents = [-1] * symbolsNum
+        self.digits = [0] * symbolsNum
+        self.steps = []
+        for step, group in enumerate(groups):
+            newNode = len(self.parents)
+            children = []
+            for digit, node in enumerate(group):
+                node = slot[node] if node < symbolsNum else node
+                self.parents[node] = newNode
+                self.digits[node] = digit
+                children.append(node)
+                add(step, -1)
+            self.parents.append(-1)
+            self.digits.append(0)
+
+            # The new subtree goes after the others merged in the same step
+            merged = mergedAt[symbolsNum + step]
+            self.steps.append((children, before(merged + 1)))
+            add(merged, 1)
+
+        self.stepsDone = 0
+        self.forestSize = symbolsNum
+
+    def __len__(self):
+        return self.forestSize
+
+    def __iter__(self):
+        while True:
+            yield self.step()
+            if self.forestSize == 1: break
+
+    def step(self):
+        children, newIndex = self.steps[self.stepsDone]
+        self.stepsDone += 1
+        self.forestSize -= len(children) - 1
+
+        leavesNum = len(self.leaves)
+        names = [
+            self.leaves[node][0] if node < leavesNum else str(node - leavesNum + 1)
+            for node in children
+        ]
+        newLeader = str(self.nodeCount)
+        self.nodeCount += 1
+        return newLeader, names, newIndex
+
+    def mergesNum(self):
+        return len(self.steps)
+
+    codewords = HuffMergeEngine.codewords
+
+class Codebook():
+    """Symbol to codeword mapping, the strings are only built when read."""
+    def __init__(self, inputSymbols, outputSymbols, engine):
+        self.outputSymbols = outputSymbols
+        self.symbols = list(dict.fromkeys(inputSymbols))
+        self.leaves = {symbol: node for node, (symbol, prob) in enumerate(engine.leaves)}
+        self.codes, self.lengths = engine.codewords()
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __iter__(self):
+        return iter(self.symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self.leaves
+
+    def __getitem__(self, symbol):
+        node = self.leaves[symbol]
+        return self.word(self.codes[node], self.lengths[node])
+
+    def __eq__(self, other):
+        return dict(self.items()) == dict(other.items())
+
+    def keys(self):
+        return iter(self.symbols)
+
+    def values(self):
+        return (self[symbol] for symbol in self.symbols)
+
+    def items(self):
+        return ((symbol, self[symbol]) for symbol in self.symbols)
+
+    def word(self, code, length):
+        D = len(self.outputSymbols)
+        if length == 0:
+            return ""
+
+        if D == 2:
+            bits = format(code, 'b').zfill(length)
+            return bits.translate({ord('0'): self.outputSymbols[0], ord('1'): self.outputSymbols[1]})
+
+        digits = []
+        for _ in range(length):
+            code, digit = divmod(code, D)
+            digits.append(self.outputSymbols[digit])
+        return "".join(reversed(digits))
+
+class HuffTree():
+    def __init__(self, inputSymbols, outputSymbols, probabilities, maxLength=None):
+        self.inputSymbols = inputSymbols  # <-- Store inputSymbols here
+        self.outputSymbols = outputSymbols
+
+        # Merge order comes from the priority queue, or from package-merge for codes
+        # no longer than maxLength
+        if maxLength is None:
+            self.engine = HuffMergeEngine(inputSymbols, probabilities, len(outputSymbols))
+        else:
+            self.engine = LengthLimitedMergeEngine(inputSymbols, probabilities, len(outputSymbols), maxLength)
+        self.newIndex = 0
+        nodes = self.engine.leaves
+
+        nodesNum = len(nodes) + self.engine.mergesNum()
+        self.nodes = NodeStore(len(nodes), nodesNum)
+        self.tree = Forest(self.nodes, nodesNum)
+
+        symbolsNum = len(inputSymbols)
+        if symbolsNum % 2 == 0:
+            pos = -1 - 2 * ((symbolsNum - 1) // 2)
+        else:
+            pos = -2 * (symbolsNum // 2)
+
+        # Place the nodes
+        for symbol, prob in nodes:
+            self.tree.append(self.nodes.add(symbol, [pos, -5, 0], prob))
+            pos += 2
+
+    @property
+    def codification(self):
+        return Codebook(self.inputSymbols, self.outputSymbols, self.engine)
+
+    @property
+    def symbolPositions(self):
+        return {symbol: self.nodes.position(symbol) for symbol, prob in self.engine.leaves}
+
+    def position(self, node):
+        return self.nodes.position(node)
+
+    def codificateStep(self):
+        newEdges = []
+        store = self.nodes
+
+        # Groups the subtrees, the engine records their branch digits
+        newLeader, leaders, self.newIndex = self.engine.step()
+        subTrees = self.tree.popLeft(len(leaders))
+
+        # Create new subtree
+        slots = store.slots[subTrees]
+        level = self.calculateLevel(slots)
+        firstPosX = int(store.x[slots[0]])
+        lastPosX = int(store.x[slots[-1]])
+
+        newNodePos = [(firstPosX + lastPosX) // 2, level + 2, 0]
+
+        # Merge subtrees, the children already follow the new leader's slot
+        probability = 0
+        for node in subTrees.tolist():
+            probability += store.probabilities[node]
+            newEdges.append((newLeader, store.names[node]))
+
+        newNode = store.add(newLeader, newNodePos, probability)
+        store.sizes[newNode] += store.sizes[subTrees].sum()
+
+        # Update tree
+        self.tree.pushLeft(newNode)
+
+        return newEdges, newLeader
+
+    def bounds(self):
+        # Left, bottom, right and top of the nodes placed so far
+        store = self.nodes
+        xs, ys = store.x[store.free:], store.y[store.free:]
+        return int(xs.min()), int(ys.min()), int(xs.max()), int(ys.max())
+
+    def calculateLevel(self, slots):
+        return int(self.nodes.y[slots].max())
+
+    def jumpSubTrees(self):
+        # Moves the new subtree after the lighter ones and returns the slot
+        # ranges of the jumped subtrees and of the new one
+        store = self.nodes
+        movedSubTrees = self.tree.front(self.newIndex + 1)
+        newNode = movedSubTrees[0]
+
+        start = int(store.slots[newNode])
+        middle = start + int(store.sizes[newNode])
+        end = start + int(store.sizes[movedSubTrees].sum())
+
+        if end == middle:
+            return start, start, middle
+
+        # Compute movements
+        lastStart = end - int(store.sizes[movedSubTrees[-1]])
+        newLeft = int(store.x[start:middle].min())
+        newRight = int(store.x[start:middle].max())
+        treeMovement = int(store.x[lastStart:end].max()) - newRight
+        otherMovement = newLeft - newRight - 2
+
+        # Move
+        store.x[start:middle] += treeMovement
+        store.x[middle:end] += otherMovement
+
+        # Sort tree, swapping the slots of the new subtree and the jumped ones
+        store.rotate(start, middle, end)
+        self.tree.jump(self.newIndex)
+
+        return start, end - (middle - start), end
+
+    def sortTree(self, newLeader):
+        start, newStart, end = self.jumpSubTrees()
+
+        # New subtree first, then the ones it jumped over
+        newPositions = self.nodes.positions(newStart, end)
+        newPositions.update(self.nodes.positions(start, newStart))
+
+        return newPositions
+
+    def build(self):
+        # Runs every step without collecting what the animation needs
+        while True:
+            self.codificateStep()
+            if len(self.tree) == 1: break
+            self.jumpSubTrees()
@@ -0,0 +1,155 @@
+"""Tidy tree layout in linear time."""
+from .shannon_fano import Leaf
+
+
+def tidy_layout(children, widths=None, gap=1.0):
+    """Places the tree rooted at node 0 and returns (xs, depths).
+
+    children[v] lists the children of node v from left to right. Nodes on
+    the same level stay at least gap apart edge to edge, given their
+    widths (1 by default), parents are centred over their children and
+    subtrees are packed as close as their contours allow. This is Walker's
+    algorithm with Buchheim, Juenger and Leipert's linear time fixes, run
+    with explicit stacks so deep trees do not hit the recursion limit. The
+    root ends up at x = 0.
+    """
+    count = len(children)
+    widths = widths or [1.0] * count
+
+    parents = [-1] * count
+    numbers = [0] * count
+    for node in range(count):
+        for number, child in enumerate(children[node]):
+            parents[child] = node
+            numbers[child] = number
+
+    prelim = [0.0] * count
+    mod = [0.0] * count
+    shift = [0.0] * count
+    change = [0.0] * count
+    thread = [-1] * count
+    ancestor = list(range(count))
+    default_ancestor = [-1] * count
+
+    def distance(left, right):
+        return (widths[left] + widths[right]) / 2 + gap
+
+    def next_left(node):
+        return children[node][0] if children[node] else thread[node]
+
+    def next_right(node):
+        return children[node][-1] if children[node] else thread[node]
+
+    def apportion(node):
+        # Pushes node's subtree right until it clears every subtree to its left
+        parent = parents[node]
+        if numbers[node] == 0:
+            default_ancestor[parent] = node
+            return
+
+        inner_right = outer_right = node
+        inner_left = children[parent][numbers[node] - 1]
+        outer_left = children[parent][0]
+        sum_inner_right, sum_outer_right = mod[inner_right], mod[outer_right]
+        sum_inner_left, sum_outer_left = mod[inner_left], mod[outer_left]
+
+        while next_right(inner_left) != -1 and next_left(inner_right) != -1:
+            inner_left = next_right(inner_left)
+            inner_right = next_left(inner_right)
+            outer_left = next_left(outer_left)
+            outer_right = next_right(outer_right)
+            ancestor[outer_right] = node
+
+            move = (
+                prelim[inner_left] + sum_inner_left - prelim[inner_right] - sum_inner_right +
+                distance(inner_left, inner_right)
+            )
+            if move > 0:
+                left = ancestor[inner_left]
+                if parents[left] != parent:
+                    left = default_ancestor[parent]
+                subtrees = numbers[node] - numbers[left]
+                change[node] -= move / subtrees
+                shift[node] += move
+                change[left] += move / subtrees
+                prelim[node] += move
+                mod[node] += move
+                sum_inner_right += move
+                sum_outer_right += move
+
+            sum_inner_left += mod[inner_left]
+            sum_inner_right += mod[inner_right]
+            sum_outer_left += mod[outer_left]
+            sum_outer_right += mod[outer_right]
+
+        if next_right(inner_left) != -1 and next_right(outer_right) == -1:
+            thread[outer_right] = next_right(inner_left)
+            mod[outer_right] += sum_inner_left - sum_outer_right
+        if next_left(inner_right) != -1 and next_left(outer_left) == -1:
+            thread[outer_left] = next_left(inner_right)
+            mod[outer_left] += sum_inner_right - sum_outer_left
+            default_ancestor[parent] = node
+
+    # First walk, children before their parent
+    stack = [(0, False)]
+    while stack:
+        node, visited = stack.pop()
+        if not visited:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(children[node]))
+            continue
+
+        if children[node]:
+            # Spread the shifts of the moved subtrees over their siblings
+            total_shift = total_change = 0.0
+            for child in reversed(children[node]):
+                prelim[child] += total_shift
+                mod[child] += total_shift
+                total_change += change[child]
+                total_shift += shift[child] + total_change
+            midpoint = (prelim[children[node][0]] + prelim[children[node][-1]]) / 2
+        else:
+            midpoint = 0.0
+
+        parent = parents[node]
+        if parent != -1 and numbers[node] > 0:
+            left_sibling = children[parent][numbers[node] - 1]
+            prelim[node] = prelim[left_sibling] + distance(left_sibling, node)
+            mod[node] = prelim[node] - midpoint
+        else:
+            prelim[node] = midpoint
+
+        if parent != -1:
+            apportion(node)
+
+    # Second walk, adding up the modifiers from the root down
+    xs = [0.0] * count
+    depths = [0] * count
+    stack = [(0, -prelim[0], 0)]
+    while stack:
+        node, modifier, depth = stack.pop()
+        xs[node] = prelim[node] + modifier
+        depths[node] = depth
+        stack.extend((child, modifier + mod[node], depth + 1) for child in children[node])
+
+    return xs, depths
+
+
+def split_tree(steps):
+    """Returns the codes and children lists of the tree given by shannon_fano_steps.
+
+    Codes start with the root and each pair of children follows in the
+    order their parents split; children hold indices into them.
+    """
+    codes = [""]
+    children = [[]]
+    index = {"": 0}
+    for step in steps:
+        if isinstance(step, Leaf):
+            continue
+        for digit in "01":
+            index[step.code + digit] = len(codes)
+            codes.append(step.code + digit)
+            children.append([])
+        children[index[step.code]] = [index[step.code + "0"], index[step.code + "1"]]
+    return codes, children
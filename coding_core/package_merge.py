@@ -0,0 +1,55 @@
+"""Optimal prefix code lengths no longer than a limit, by package-merge."""
+import numpy as np
+
+
+def package_merge_lengths(probabilities, max_length, arity=2):
+    """Returns the code length of every symbol of the cheapest code with no word over max_length.
+
+    Larmore and Hirschberg's package-merge in O(n * max_length): every
+    symbol gets a coin per level, packages of arity coins are merged with
+    the coins of the level above, and the lightest coins that make up a
+    full tree are kept; a symbol's length is how many of its coins are.
+    Codes with more than two digits are first padded with weightless
+    symbols so that they fill a full tree. Whenever the limit does not
+    bind, the code is as cheap as a Huffman code.
+    """
+    count = len(probabilities)
+    if arity < 2:
+        raise ValueError("Codes need at least two output symbols")
+    if count == 0:
+        return []
+    if count == 1:
+        return [1]
+    if max_length < 1 or arity ** max_length < count:
+        raise ValueError(f"{count} symbols do not fit in codes of {max_length} digits")
+
+    # Weightless symbols go first, so they take the longest codes
+    padding = -(count - 1) % (arity - 1)
+    weights = np.concatenate((np.zeros(padding), np.asarray(probabilities, dtype=np.float64)))
+    order = np.argsort(weights, kind="stable")
+    coins = weights[order]
+
+    # How many of the coins at each level are packages, from the deepest level up
+    merged = coins
+    packages = []
+    for level in range(max_length - 1):
+        grouped = merged[:len(merged) // arity * arity].reshape(-1, arity).sum(axis=1)
+        # Coins go before packages of the same weight, the stable sort keeps them first
+        merged = np.concatenate((coins, grouped))
+        is_package = np.concatenate((np.zeros(len(coins), dtype=bool), np.ones(len(grouped), dtype=bool)))
+        sort = np.argsort(merged, kind="stable")
+        merged = merged[sort]
+        packages.append(np.cumsum(is_package[sort]))
+
+    # The top level keeps the coins of a full tree; each kept package keeps arity coins below it
+    lengths = np.zeros(len(coins), dtype=np.int64)
+    taken = (len(coins) - 1) * arity // (arity - 1)
+    for level in range(max_length - 1, -1, -1):
+        kept_packages = int(packages[level - 1][taken - 1]) if level and taken else 0
+        # Kept coins are always the lightest ones
+        lengths[:taken - kept_packages] += 1
+        taken = kept_packages * arity
+
+    result = np.empty(len(coins), dtype=np.int64)
+    result[order] = lengths
+    return result[padding:].tolist()
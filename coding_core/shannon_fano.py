@@ -0,0 +1,155 @@
+"""Shannon-Fano splits and codewords."""
+from collections import namedtuple
+
+import numpy as np
+
+# A node split in two: symbols[start:middle] take code + "0" and
+# symbols[middle:end] take code + "1"
+Split = namedtuple(
+    'Split', 'code depth start middle end left_probability right_probability'
+)
+
+# A single symbol reached with its final code
+Leaf = namedtuple('Leaf', 'code index')
+
+
+def find_split_point(probabilities):
+    """Finds the split point to partition the symbols for the Shannon-Fano algorithm."""
+    total = sum(probabilities)
+    if len(probabilities) > 64:
+        return _find_long_split_point(probabilities, total)
+
+    running_sum = 0
+
+    for i, prob in enumerate(probabilities):
+        if running_sum + prob > total / 2:
+            return i if abs(running_sum - total / 2) < abs(running_sum + prob - total / 2) else i + 1
+        running_sum += prob
+    return len(probabilities)
+
+
+def _find_long_split_point(probabilities, total):
+    """Same search with the running sums done by NumPy, which adds left to right too."""
+    running = np.cumsum(probabilities, dtype=np.float64)
+    i = int(np.searchsorted(running, total / 2, side='right'))
+    if i == len(running):
+        return len(probabilities)
+
+    running_sum = running[i - 1] if i else 0
+    return i if abs(running_sum - total / 2) < abs(running[i] - total / 2) else i + 1
+
+
+def split_points(probabilities, cumulative, starts, ends):
+    """Finds the split point of every range [start, end) at once.
+
+    cumulative holds the prefix sums of the probabilities with a leading
+    zero, so the running sum and total of a range are differences of it and
+    the crossing point is a binary search. Prefix sums round differently from
+    a running sum over the range, so ranges whose choice is within that
+    rounding error are decided by find_split_point instead. Both halves keep
+    at least one symbol, even for all-zero probabilities.
+    """
+    base = cumulative[starts]
+    half = (cumulative[ends] - base) / 2
+
+    # First prefix past the half, then step back if the sum before it is closer
+    crossing = np.searchsorted(cumulative, base + half, side='right')
+    crossing = np.minimum(crossing, ends)
+    before = cumulative[crossing - 1] - base - half
+    after = cumulative[crossing] - base - half
+    points = np.where(np.abs(before) < np.abs(after), crossing - 1, crossing)
+
+    # Each addition inside a range rounds by at most eps times the prefix
+    tolerance = 4 * np.finfo(np.float64).eps * (ends - starts + 2) * np.abs(cumulative[ends])
+    close = (
+        (np.abs(before) <= tolerance) | (np.abs(after) <= tolerance) |
+        (np.abs(np.abs(before) - np.abs(after)) <= tolerance)
+    ) & (ends - starts > 2)
+    for index in np.flatnonzero(close).tolist():
+        start, end = int(starts[index]), int(ends[index])
+        points[index] = start + find_split_point(probabilities[start:end])
+
+    return np.clip(points, starts + 1, ends - 1)
+
+
+def _all_split_points(probabilities, cumulative):
+    """Returns {(start, end): middle} for every inner node, splitting each tree level at once."""
+    middles = {}
+    starts = np.array([0])
+    ends = np.array([len(probabilities)])
+    while len(starts):
+        inner = ends - starts > 1
+        starts, ends = starts[inner], ends[inner]
+        if not len(starts):
+            break
+
+        points = split_points(probabilities, cumulative, starts, ends)
+        middles.update(zip(zip(starts.tolist(), ends.tolist()), points.tolist()))
+        starts = np.concatenate((starts, points))
+        ends = np.concatenate((points, ends))
+    return middles
+
+
+def shannon_fano_steps(symbols, probabilities):
+    """Yields the Split and Leaf events of the tree in depth-first order.
+
+    The splits are found a tree level at a time as in shannon_fano_codes,
+    and node labels are differences of the prefix sums.
+    """
+    if len(symbols) == 1:
+        yield Leaf("", 0)
+        return
+
+    probabilities = np.asarray(probabilities, dtype=np.float64).tolist()
+    cumulative = np.concatenate(([0.0], np.cumsum(probabilities, dtype=np.float64)))
+    middles = _all_split_points(probabilities, cumulative)
+    cumulative = cumulative.tolist()
+
+    # Ranges still to visit, the left one on top
+    stack = [(0, len(symbols), 0, "")]
+    while stack:
+        start, end, depth, code = stack.pop()
+        if end - start == 1:
+            yield Leaf(code, start)
+            continue
+
+        middle = middles[start, end]
+        yield Split(
+            code, depth, start, middle, end,
+            cumulative[middle] - cumulative[start], cumulative[end] - cumulative[middle]
+        )
+
+        stack.append((middle, end, depth + 1, code + "1"))
+        stack.append((start, middle, depth + 1, code + "0"))
+
+
+def shannon_fano_codes(symbols, probabilities):
+    """Returns the Shannon-Fano code of every symbol.
+
+    All the ranges of one tree level are split together, so the work per
+    level is a handful of array operations.
+    """
+    probabilities = np.asarray(probabilities, dtype=np.float64).tolist()
+    cumulative = np.concatenate(([0.0], np.cumsum(probabilities, dtype=np.float64)))
+    codes = [""] * len(symbols)
+
+    starts = np.array([0])
+    ends = np.array([len(symbols)])
+    prefixes = [""]
+    while len(starts):
+        inner = ends - starts > 1
+        for index in np.flatnonzero(~inner).tolist():
+            codes[starts[index]] = prefixes[index]
+
+        starts, ends = starts[inner], ends[inner]
+        prefixes = [prefixes[index] for index in np.flatnonzero(inner).tolist()]
+        if not len(starts):
+            break
+
+        middles = split_points(probabilities, cumulative, starts, ends)
+        starts = np.concatenate((starts, middles))
+        ends = np.concatenate((middles, ends))
+        prefixes = [prefix + "0" for prefix in prefixes] + [prefix + "1" for prefix in prefixes]
+
+    # Leaves are met left to right, which is the order of the symbols
+    return {symbol: code for symbol, code in zip(symbols, codes)}
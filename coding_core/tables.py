@@ -0,0 +1,116 @@
+"""Symbol tables read from CSV, JSON and frequency files, and the checks made on them.
+
+Symbols and weights are NumPy arrays, so tables of any size are checked
+and normalized in a few array operations.
+"""
+import csv
+import json
+import os
+
+import numpy as np
+
+
+def symbol_text(symbol):
+    """Returns a symbol as the table shows it, with line breaks and other control characters escaped."""
+    symbol = str(symbol)
+    return symbol if symbol.isprintable() else symbol.encode("unicode_escape").decode("ascii")
+
+
+def parse_weight(text):
+    """Returns text as a weight, or None if it is not a number."""
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def _json_rows(data):
+    """Returns (symbols, weights) of a JSON table in any of the layouts import_symbols reads."""
+    if isinstance(data, dict) and "symbols" in data:
+        return list(data["symbols"]), list(data.get("probabilities", data.get("counts", [])))
+    if isinstance(data, dict):
+        return list(data.keys()), list(data.values())
+    return [row[0] for row in data], [row[1] for row in data]
+
+
+def _text_rows(path, delimiter):
+    """Returns (symbols, weights) of a CSV or TSV file, skipping a header row if there is one."""
+    with open(path, newline="", encoding="utf-8") as table:
+        rows = [row for row in csv.reader(table, delimiter=delimiter) if row]
+    if rows and parse_weight(rows[0][-1]) is None:
+        rows = rows[1:]
+    return [row[0] for row in rows], [row[-1] for row in rows]
+
+
+def _frequency_rows(path):
+    """Returns (symbols, weights) of a file of symbols and counts separated by whitespace.
+
+    Lines are "symbol count" or, as uniq -c writes them, "count symbol".
+    """
+    symbols, weights = [], []
+    with open(path, encoding="utf-8") as table:
+        for line in table:
+            fields = line.split()
+            if len(fields) < 2:
+                continue
+            if parse_weight(fields[0]) is not None and parse_weight(fields[-1]) is None:
+                weights.append(fields[0])
+                symbols.append(" ".join(fields[1:]))
+            else:
+                symbols.append(" ".join(fields[:-1]))
+                weights.append(fields[-1])
+    return symbols, weights
+
+
+def import_symbols(path):
+    """Reads a table of symbols and weights and returns (symbols, probabilities) as arrays.
+
+    .json files hold {"symbols": [...], "probabilities": [...]} (or
+    "counts"), a {symbol: weight} object or a list of [symbol, weight]
+    pairs. .csv and .tsv files have the symbol in the first column and the
+    weight in the last, under an optional header. Anything else is read as
+    symbols and counts separated by whitespace, one pair per line. Weights
+    are counts or probabilities alike, they are normalized to sum up to 1.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        with open(path, encoding="utf-8") as table:
+            symbols, weights = _json_rows(json.load(table))
+    elif extension in (".csv", ".tsv"):
+        symbols, weights = _text_rows(path, "\t" if extension == ".tsv" else ",")
+    else:
+        symbols, weights = _frequency_rows(path)
+
+    if len(symbols) != len(weights):
+        raise ValueError("Every symbol needs exactly one weight")
+    try:
+        weights = np.asarray(weights, dtype=np.float64)
+    except ValueError:
+        raise ValueError(f"{os.path.basename(path)} has weights that are not numbers") from None
+    symbols = np.array([symbol_text(symbol) for symbol in symbols], dtype=object)
+    return symbols, normalized(symbols, weights)
+
+
+def normalized(symbols, weights):
+    """Returns weights scaled to sum up to 1, or raises ValueError naming the first bad row."""
+    check_rows(symbols, weights)
+    total = weights.sum()
+    if total <= 0:
+        raise ValueError("The weights add up to zero")
+    return weights / total
+
+
+def check_rows(symbols, probabilities):
+    """Raises ValueError for the first empty, repeated or negative row, in one pass over the arrays."""
+    bad = np.flatnonzero((symbols == "") | np.isnan(probabilities))
+    if len(bad):
+        raise ValueError(f"Please fill all symbol and probability fields (row {bad[0] + 1}).")
+    bad = np.flatnonzero(~np.isfinite(probabilities) | (probabilities < 0))
+    if len(bad):
+        raise ValueError(f"Invalid probability for symbol {symbols[bad[0]]}")
+
+    # Sorted, a repeated symbol sits next to its twin
+    order = np.argsort(symbols.astype(str), kind="stable")
+    repeated = np.flatnonzero(symbols[order][1:] == symbols[order][:-1])
+    if len(repeated):
+        raise ValueError(f"Symbol {symbols[order][repeated[0]]} appears more than once")
@@ -1,19 +1,14 @@
 import sys
-import numpy as np
-import os
-import platform
-import subprocess
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
-    QPushButton, QTableWidget, QTableWidgetItem, QFileDialog, QMessageBox, QComboBox
+    QPushButton, QMessageBox, QComboBox, QCheckBox
 )
-from PySide6.QtCore import Qt
-from manim import config
-from huffman_visualization import HuffmanTree  # Assuming you modify HuffmanTree accordingly
-from Shannon_pygui_final import ShannonFanoTree
+from rendering import ADAPTIVE_HUFFMAN, HUFFMAN, SHANNON_FANO, RenderJob
+from render_queue import RenderQueueWidget
+from symbol_inputs import SymbolInputsMixin
 
 
-class InputWindow(QWidget):
+class InputWindow(SymbolInputsMixin, QWidget):
     """GUI window for user input to select algorithm and generate the corresponding tree."""
 
     def __init__(self):
@@ -30,25 +25,27 @@ class InputWindow(QWidget):
         self.algorithm_selector = QComboBox()
         self.algorithm_selector.addItem("Shannon-Fano")
         self.algorithm_selector.addItem("Huffman")
+        self.algorithm_selector.addItem("Length-limited Huffman")
+        self.algorithm_selector.addItem("Adaptive Huffman")
         hbox.addWidget(self.algorithm_selector)
         layout.addLayout(hbox)
 
-        # Input for number of symbols
+        # Longest codeword of the length-limited Huffman code
         hbox = QHBoxLayout()
-        hbox.addWidget(QLabel("Number of symbols:"))
-        self.num_symbols_input = QLineEdit()
-        hbox.addWidget(self.num_symbols_input)
+        hbox.addWidget(QLabel("Maximum code length:"))
+        self.max_length_input = QLineEdit()
+        hbox.addWidget(self.max_length_input)
         layout.addLayout(hbox)
 
-        # Button to generate input fields
-        generate_btn = QPushButton("Generate Input Fields")
-        generate_btn.clicked.connect(self.generate_input_fields)
-        layout.addWidget(generate_btn)
+        # Text coded one character at a time by adaptive Huffman, which needs no probabilities
+        hbox = QHBoxLayout()
+        hbox.addWidget(QLabel("Stream (adaptive Huffman):"))
+        self.stream_input = QLineEdit()
+        hbox.addWidget(self.stream_input)
+        layout.addLayout(hbox)
 
-        # Table for symbol inputs (inputSymbols and probabilities)
-        self.table = QTableWidget(0, 2)
-        self.table.setHorizontalHeaderLabels(["Symbol", "Probability"])
-        layout.addWidget(self.table)
+        # Symbols and probabilities, typed in, imported or counted from a file
+        self.add_symbol_inputs(layout)
 
         # Input for output symbols (for Huffman)
         hbox = QHBoxLayout()
@@ -57,98 +54,84 @@ class InputWindow(QWidget):
         hbox.addWidget(self.output_symbols_input)
         layout.addLayout(hbox)
 
+        # Groups the animations of each Huffman step, which renders much faster
+        self.compact_timeline_check = QCheckBox("Compact timeline (Huffman)")
+        self.compact_timeline_check.setChecked(True)
+        layout.addWidget(self.compact_timeline_check)
+
+        # Large trees stay readable with the narrow subtrees drawn as one glyph
+        self.detail_check = QCheckBox("Summarise small subtrees")
+        self.detail_check.setChecked(True)
+        layout.addWidget(self.detail_check)
+
         # Button to generate tree
         generate_tree_btn = QPushButton("Generate Tree")
         generate_tree_btn.clicked.connect(self.generate_tree)
         layout.addWidget(generate_tree_btn)
 
+        # Button to save the finished tree as an image, without rendering a video
+        export_image_btn = QPushButton("Export Image")
+        export_image_btn.clicked.connect(self.export_image)
+        layout.addWidget(export_image_btn)
+
+        # Renders run in the background, several can be queued
+        self.render_queue = RenderQueueWidget()
+        layout.addWidget(self.render_queue)
+
         self.setLayout(layout)
         self.setWindowTitle('Tree Generator')
         self.show()
 
-    def generate_input_fields(self):
-        """Generates input fields in the table based on the number of symbols."""
-        try:
-            num_symbols = int(self.num_symbols_input.text())
-            self.table.setRowCount(num_symbols)
-            for i in range(num_symbols):
-                self.table.setItem(i, 0, QTableWidgetItem(""))  # For input symbols
-                self.table.setItem(i, 1, QTableWidgetItem(""))  # For probabilities
-        except ValueError:
-            QMessageBox.warning(self, "Invalid Input", "Please enter a valid number of symbols.")
-
     def generate_tree(self):
-        """Generates the selected algorithm's tree and renders the animation."""
-        symbols = []
-        probabilities = []
-        output_symbols = self.output_symbols_input.text().split(',')
+        """Generates the selected algorithm's tree and queues its animation."""
+        job = self.read_job()
+        if job is not None:
+            # Queue the render, it plays in its own window when ready
+            self.render_queue.submit(job)
+
+    def read_job(self):
+        """Reads the inputs as a render job, or warns and returns None if they are invalid."""
+        algorithm = self.algorithm_selector.currentText()
+        if algorithm == "Adaptive Huffman":
+            stream = self.stream_input.text()
+            if not stream:
+                QMessageBox.warning(self, "Invalid Input", "Please enter a stream of symbols.")
+                return None
+            return RenderJob(ADAPTIVE_HUFFMAN, list(stream), [], None)
 
-        # Gather inputSymbols and probabilities from the table
-        for row in range(self.table.rowCount()):
-            symbol_item = self.table.item(row, 0)
-            prob_item = self.table.item(row, 1)
-            if symbol_item and prob_item:
-                symbol = symbol_item.text()
-                prob_text = prob_item.text()
-                if symbol and prob_text:
-                    symbols.append(symbol)
-                    try:
-                        probabilities.append(float(prob_text))
-                    except ValueError:
-                        QMessageBox.warning(
-                            self, "Invalid Input", f"Invalid probability for symbol {symbol}"
-                        )
-                        return
-                else:
-                    QMessageBox.warning(
-                        self, "Incomplete Input", "Please fill all symbol and probability fields."
-                    )
-                    return
-            else:
-                QMessageBox.warning(
-                    self, "Incomplete Input", "Please fill all symbol and probability fields."
-                )
-                return
-
-        # Ensure probabilities sum to 1.0
-        if not np.isclose(sum(probabilities), 1.0):
-            QMessageBox.warning(self, "Invalid Input", "Probabilities must sum up to 1.")
-            return
+        try:
+            symbols, probabilities = self.symbol_model.rows()
+        except ValueError as error:
+            QMessageBox.warning(self, "Invalid Input", str(error))
+            return None
+        output_symbols = self.output_symbols_input.text().split(',')
 
         # Select algorithm and generate animation
-        algorithm = self.algorithm_selector.currentText()
-
         if algorithm == "Shannon-Fano":
-            scene = ShannonFanoTree(symbols, probabilities)
-            output_file_name = "ShannonFanoTree.mp4"
+            job = RenderJob(SHANNON_FANO, symbols, probabilities, None, detail=self.detail_check.isChecked())
         else:
             # Use the outputSymbols provided by the user for Huffman encoding
             if not output_symbols or len(output_symbols) < 2:
                 QMessageBox.warning(self, "Invalid Input", "Please provide at least two output symbols.")
-                return
-            scene = HuffmanTree(symbols, output_symbols, probabilities)  # Passing 3 inputs here
-            output_file_name = "HuffmanTree.mp4"
-
-        # Correct file path to save the video
-        file_path = os.path.abspath(
-            f"C:/Users/dmriv/Documents/GitHub/Quickfins/Huffman-animations/media/videos/1080p60/{output_file_name}"
-        )
-
-        # Set the output file path for Manim
-        config.output_file = file_path
-        scene.render()
-
-        # Open the video externally
-        self.open_video_externally(file_path)
-
-    def open_video_externally(self, file_path):
-        """Opens the video file after generation."""
-        if platform.system() == "Windows":
-            os.startfile(file_path)
-        elif platform.system() == "Darwin":  # macOS
-            subprocess.call(["open", file_path])
-        else:  # Linux and others
-            subprocess.call(["xdg-open", file_path])
+                return None
+            max_length = None
+            if algorithm == "Length-limited Huffman":
+                try:
+                    max_length = int(self.max_length_input.text())
+                except ValueError:
+                    QMessageBox.warning(self, "Invalid Input", "Please enter a valid maximum code length.")
+                    return None
+                if len(output_symbols) ** max_length < len(symbols):
+                    QMessageBox.warning(
+                        self, "Invalid Input",
+                        f"{len(symbols)} symbols do not fit in codewords of at most {max_length} output symbols."
+                    )
+                    return None
+            job = RenderJob(
+                HUFFMAN, symbols, probabilities, output_symbols, self.compact_timeline_check.isChecked(),
+                max_length=max_length, detail=self.detail_check.isChecked()
+            )
+        return job
 
 
 if __name__ == '__main__':
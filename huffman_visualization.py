@@ -1,231 +1,59 @@
 from manim import *
-import numpy as np
 import copy
+import numpy as np
 
-class SubTree():
-    def __init__(self, symbol, initialPosition, probability):
-        self.leader = symbol
-        self.probability = probability
-        self.positions = {symbol : initialPosition}
-        self.leftMostPosition = initialPosition[0]
-        self.rightMostPosition = initialPosition[0]
-
-    def __repr__(self):
-        return f'(Leader: {self.leader}, Probability: {self.probability}, Positions: {self.positions})'
-
-    def merge(self, mergeSubTree):
-        self.probability += mergeSubTree.probability
-        self.positions = {**self.positions, **mergeSubTree.positions}
-
-        if mergeSubTree.leftMostPosition < self.leftMostPosition:
-            self.leftMostPosition = mergeSubTree.leftMostPosition
-
-        if mergeSubTree.rightMostPosition > self.rightMostPosition:
-            self.rightMostPosition = mergeSubTree.rightMostPosition
-
-    def move(self, movement):
-        for node in self.positions:
-            self.positions[node][0] += movement
-
-        self.leftMostPosition += movement
-        self.rightMostPosition += movement
-
-class HuffTree():
-    def __init__(self, inputSymbols, outputSymbols, probabilities):
-        self.inputSymbols = inputSymbols  # <-- Store inputSymbols here
-        self.outputSymbols = outputSymbols
-        self.codification = {symbol: "" for symbol in inputSymbols}
-        self.symbolPositions = {}
-        self.tree = {}
-        self.nodeCount = 1
-        self.firstStep = True
-        self.leadership = {symbol : {symbol} for symbol in inputSymbols}
-
-        # Sort the nodes
-        nodes = {}
-        for i in range(0, len(inputSymbols)):
-            symbol = inputSymbols[i]
-            prob = probabilities[i]
-            nodes[symbol] = prob
-
-        nodes = sorted(nodes.items(), key=lambda item: item[1])
-
-        symbolsNum = len(inputSymbols)
-        if symbolsNum % 2 == 0:
-            pos = -1 - 2 * ((symbolsNum - 1) // 2)
-        else:
-            pos = -2 * (symbolsNum // 2)
-
-        # Place the nodes
-        for symbol, prob in nodes:
-            self.tree[symbol] = SubTree(symbol, [pos, -5, 0], prob)
-            self.symbolPositions[symbol] = [pos, -5, 0]
-            pos += 2
-
-
-        #print(self.tree)
-
-    def codificateStep(self):
-        newEdges = []
-        newLeadership = set()
-
-        # Calculates the number of subTrees to group
-        D = len(self.outputSymbols)
-
-        if self.firstStep:
-            self.firstStep = False
-
-            # Use self.inputSymbols instead of just inputSymbols
-            r = (len(self.inputSymbols) - 1) % (D - 1)
-            D = D - r
-
-        # Groups the subtrees
-        count = 0
-        groupSubTrees = {}
-        for leader in self.tree:
-            if count == D: break
-
-            groupSubTrees[leader] = self.tree[leader]
-
-            # Codificate step
-            for node in self.leadership[leader]:
-                newLeadership.add(node)
-                self.codification[node] = self.outputSymbols[count] + self.codification[node]
-
-            # Delete leadership
-            self.leadership.pop(leader)
-
-            count += 1
-
-        # Erase subtrees from tree
-        for leader in groupSubTrees:
-            self.tree.pop(leader)
-
-        # Create new subtree
-        subTrees = [groupSubTrees[leader] for leader in groupSubTrees]
-
-        first = subTrees[0]
-        last = subTrees[-1]
-
-        level = self.calculateLevel(subTrees)
-        firstPosX = first.positions[first.leader][0]
-        lastPosX = last.positions[last.leader][0]
-
-        newNodePos = [(firstPosX + lastPosX) // 2, level + 2, 0]
-
-        newSubTree = SubTree(str(self.nodeCount), newNodePos, 0)
-
-        # Merge subtrees
-        for s in subTrees:
-            newSubTree.merge(s)
-            newEdges.append((newSubTree.leader, s.leader))
-
-        # Update tree
-        newElement = {newSubTree.leader: newSubTree}
-        self.tree = {**newElement, **self.tree}
-
-        # Update leadership
-        self.leadership[newSubTree.leader] = newLeadership
-
-        # Update nodeCount
-        self.nodeCount += 1
-
-        return newEdges, newSubTree.leader
-
-
-    def calculateLevel(self, subTrees):
-        level = - 100
-        for subTree in subTrees:
-            if subTree.positions[subTree.leader][1] > level:
-                level = subTree.positions[subTree.leader][1]
-
-        return level
-
-    def sortTree(self, newLeader):
-        newPositions = {}
-
-        # Store old tree
-        oldTree = copy.deepcopy(self.tree)
-        oldTreeOrder = [leader for leader in oldTree]
-        print(oldTreeOrder)
-
-        # Sort tree
-        self.tree = dict(sorted(self.tree.items(), key=lambda item : item[1].probability))
-
-        # Store overall order
-        oldTreeOrder = [leader for leader in oldTree]
-        print(oldTreeOrder)
-        treeOrder = [leader for leader in self.tree]
-
-        # Get old and new indexes
-        oldIndex = oldTreeOrder.index(newLeader)
-        newIndex = treeOrder.index(newLeader)
-
-        subTreeAtIndex = oldTree[oldTreeOrder[newIndex]]
-
-        newLeaderLeft = oldTree[newLeader].leftMostPosition
-        newLeaderRight = oldTree[newLeader].rightMostPosition
-
-        indexRight = subTreeAtIndex.rightMostPosition
-
-        # Compute movements
-        treeMovement = indexRight - newLeaderRight
-        otherMovement = newLeaderLeft - newLeaderRight - 2
-
-        # Move
-        for leader in oldTreeOrder[0:newIndex+1]:
-
-            if leader == newLeader:
-                movement = treeMovement
-            else:
-                movement = otherMovement
-            
-            subTree = self.tree[leader]
-            subTree.move(movement)
-            
-            # Update new positions
-            for node in subTree.positions:
-                newPositions[node] = subTree.positions[node]
-
-        # Update symbols positions
-        for symbol in self.leadership[newLeader]:
-            self.symbolPositions[symbol] = self.tree[newLeader].positions[symbol]
-
-        print(self.tree)
-        return newPositions
+from coding_core import HuffTree
+from rendering.camera import framing
+from rendering.detail import MIN_SUBTREE_PIXELS, narrow_subtrees, pixels_per_unit, summary_glyph
+from rendering.labels import labels
+from rendering.profiling import ALGORITHM, MOBJECTS
+from rendering.timeline import Signature, TimelineMixin
 
 #inputSymbols = []
 #outputSymbols = []
 #probabilities = []
 
-class HuffmanTree(MovingCameraScene):
-    def __init__(self, inputSymbols, outputSymbols, probabilities, **kwargs):
+class HuffmanTree(TimelineMixin, MovingCameraScene):
+    def __init__(
+        self, inputSymbols, outputSymbols, probabilities, compactTimeline=False, maxLength=None,
+        levelOfDetail=True, **kwargs
+    ):
         # Pass the keyword arguments to the base class MovingCameraScene
         super().__init__(**kwargs)
         # Store inputSymbols, outputSymbols, and probabilities in the instance
         self.inputSymbols = inputSymbols
         self.outputSymbols = outputSymbols
         self.probabilities = probabilities
+        # Longest codeword allowed, None for a plain Huffman code
+        self.maxLength = maxLength
+        # Play the animations of each step as one LaggedStart instead of one by one
+        self.compactTimeline = compactTimeline
+        # Subtrees narrower than this many pixels are drawn as one glyph, None draws everything
+        self.detailThreshold = MIN_SUBTREE_PIXELS if levelOfDetail else None
+        self.glyphs = {}
+        self.hidden = set()
 
     def construct(self):
         # Use the stored inputSymbols, outputSymbols, and probabilities in your HuffmanTree logic
-        huffTree = HuffTree(self.inputSymbols, self.outputSymbols, self.probabilities)
+        with self.profile("HuffTree", ALGORITHM):
+            huffTree = HuffTree(self.inputSymbols, self.outputSymbols, self.probabilities, self.maxLength)
         tree = huffTree.tree
         
         # Rest of your construct logic to build and animate the tree...
         nodes = [sub for sub in tree]
-        layout = {sub: tree[sub].positions[sub] for sub in tree}
+        layout = {sub: tree[sub].position() for sub in tree}
         edges = []       
 
-        animationTree = Graph(
-            vertices=nodes,  # Nodos
-            edges=edges,   # Aristas
-            layout=layout,
-            labels=True      # Mostrar etiquetas en los nodos
-        )
+        with self.profile("Graph", MOBJECTS):
+            animationTree = Graph(
+                vertices=nodes,  # Nodos
+                edges=edges,   # Aristas
+                layout=layout,
+                labels=True      # Mostrar etiquetas en los nodos
+            )
         
-        self.camera.frame.scale(1.5)
-        self.camera.frame.move_to(ORIGIN)
+        width, center = self.cameraFraming(huffTree)
+        self.camera.frame.scale_to_fit_width(width).move_to(center)
 
         self.play(Create(animationTree))
         numbers = self.showProbabilities(tree)       
@@ -233,62 +61,203 @@ class HuffmanTree(MovingCameraScene):
         self.wait(5)
         self.removeNumbers(numbers)
 
+        merges = 0
         while True:
-            # Codificate and update tree
+            with self.profile("merge", index=merges):
+                if self.mergeStep(animationTree, huffTree): break
+            merges += 1
+
+        with self.profile("codes", MOBJECTS):
+            self.showCodes(huffTree.codification, huffTree.symbolPositions)
+        self.wait(10)
+
+    def mergeStep(self, animationTree, huffTree):
+        # Animates one merge and the sort after it; returns True once the tree is complete
+        with self.profile("codificateStep", ALGORITHM):
             newEdges, newNode = huffTree.codificateStep()
-            tree = huffTree.tree
-            newPos = {newNode: tree[newNode].positions[newNode]}
-
-            # Animate new node
-            self.play(animationTree.animate.add_vertices(newNode, positions=newPos, labels=True))
-            for edge in newEdges:
-                self.play(animationTree.animate.add_edges(edge))
-            
-            numbers = self.showProbabilities(tree)       
-            self.wait(3)
-            self.removeNumbers(numbers)
-
-            if(len(tree) == 1): break
+        tree = huffTree.tree
+        newPos = {newNode: tree[newNode].position()}
+
+        # Animate new node, with the camera following the tree upwards
+        width, center = self.cameraFraming(huffTree)
+        self.play(
+            animationTree.animate.add_vertices(newNode, positions=newPos, labels=True),
+            self.camera.frame.animate.scale_to_fit_width(width).move_to(center)
+        )
+        self.playInOrder(animationTree.animate.add_edges(edge) for edge in newEdges)
+        with self.profile("collapseSmallSubTrees", MOBJECTS):
+            self.collapseSmallSubTrees(animationTree, huffTree)
         
-            # Sort new tree
+        numbers = self.showProbabilities(tree)       
+        self.wait(3)
+        self.removeNumbers(numbers)
+
+        if(len(tree) == 1): return True
+    
+        # Sort new tree
+        with self.profile("sortTree", ALGORITHM):
             newPositions = huffTree.sortTree(newNode)
-            tree = huffTree.tree
+        tree = huffTree.tree
 
-            # Animate sorting
-            for node in newPositions:
-                self.play(animationTree.vertices[node].animate.move_to(newPositions[node]))
-            
-            numbers = self.showProbabilities(tree)       
-            self.wait(3)
-            self.removeNumbers(numbers)
+        # Animate sorting
+        self.playInOrder(self.moveAnimations(animationTree, newPositions))
+        
+        numbers = self.showProbabilities(tree)       
+        self.wait(3)
+        self.removeNumbers(numbers)
+        return False
 
-        self.showCodes(huffTree.codification, huffTree.symbolPositions)
-        self.wait(10)
+    def timeline_steps(self):
+        # Replays the tree steps to count the animations construct makes for each merge.
+        # Summarised nodes have no move of their own, so the glyphs are replayed as well
+        huffTree = HuffTree(self.inputSymbols, self.outputSymbols, self.probabilities, self.maxLength)
+        steps = [2 + self.inOrderPlays(len(huffTree.tree))]
+        summarised, hidden = set(), set()
+
+        while True:
+            newEdges, newNode = huffTree.codificateStep()
+            plays = 2 + self.inOrderPlays(len(newEdges)) + self.inOrderPlays(len(huffTree.tree))
+
+            self.cameraFraming(huffTree)
+            for leader, descendants in self.newSummaries(huffTree, summarised):
+                summarised.difference_update(descendants)
+                summarised.add(leader)
+                hidden.update(descendants)
+
+            if(len(huffTree.tree) == 1):
+                steps.append(plays)
+                break
+
+            moved = [node for node in huffTree.sortTree(newNode) if node not in hidden]
+            steps.append(plays + 1 + self.inOrderPlays(len(moved)) + self.inOrderPlays(len(huffTree.tree)))
+
+        # Final wait on the codes
+        steps.append(1)
+        return steps
+
+    def timeline_signatures(self):
+        # What each merge draws, so steps that did not change can be found between renders.
+        # The probabilities fade out before their step ends, so they only key their own step
+        huffTree = HuffTree(self.inputSymbols, self.outputSymbols, self.probabilities, self.maxLength)
+        tree = huffTree.tree
+
+        def numbers():
+            return [(leader, round(tree[leader].probability, 4)) for leader in tree]
+
+        leaves = [(leader, tree[leader].position()) for leader in tree]
+        signatures = [Signature([self.compactTimeline, self.detailThreshold, leaves], numbers())]
+        while True:
+            newEdges, newNode = huffTree.codificateStep()
+            signature = [newNode, tree[newNode].position(), newEdges]
+            merged = numbers()
+
+            if(len(tree) == 1):
+                signatures.append(Signature(signature, merged))
+                break
+
+            newPositions = huffTree.sortTree(newNode)
+            signatures.append(Signature(signature + [list(newPositions.items())], [merged, numbers()]))
+
+        codification = huffTree.codification
+        symbolPositions = huffTree.symbolPositions
+        signatures.append([(symbol, codification[symbol], symbolPositions[symbol]) for symbol in symbolPositions])
+        return signatures
+
+    def cameraFraming(self, huffTree):
+        # Frame around the nodes placed so far, never closer than the old fixed zoom
+        width, center = framing(huffTree.bounds(), minimum_width=1.5 * config.frame_width)
+        self.frameWidth = width
+        return width, center
+
+    def collapseSmallSubTrees(self, animationTree, huffTree):
+        # Draws the subtrees too narrow to read as one glyph under their leader. Only the
+        # leaders of the forest are animated, so nothing summarised is drawn in full again
+        tree = huffTree.tree
+        for leader, descendants in self.newSummaries(huffTree, self.glyphs):
+            for node in descendants:
+                if node in self.glyphs:
+                    self.remove(self.glyphs.pop(node))
+            animationTree.remove_vertices(*[node for node in descendants if node not in self.hidden])
+            self.hidden.update(descendants)
+
+            left, right, bottom = tree[leader].span()
+            apex = tree[leader].position()
+            apex[1] -= 0.3
+            self.glyphs[leader] = summary_glyph(apex, left, right, bottom)
+            self.add(self.glyphs[leader])
+
+    def newSummaries(self, huffTree, summarised):
+        # Leaders whose subtrees turn into a glyph at this framing, with their descendants.
+        # summarised holds the leaders already drawn as one
+        if self.detailThreshold is None:
+            return []
+
+        tree = huffTree.tree
+        found = narrow_subtrees(
+            list(tree),
+            lambda leader: tree[leader].children,
+            lambda leader: tree[leader].span()[1] - tree[leader].span()[0],
+            lambda leader: tree[leader].end - tree[leader].start > 1,
+            pixels_per_unit(self.frameWidth), self.detailThreshold
+        )
+        return [(leader, tree[leader].descendants) for leader in found if leader not in summarised]
+
+    def moveAnimations(self, animationTree, newPositions):
+        # Moves the drawn nodes, each glyph in the same animation as its leader
+        for node in newPositions:
+            if node in self.hidden:
+                continue
+            vertex = animationTree.vertices[node]
+            move = vertex.animate.move_to(newPositions[node])
+            if node in self.glyphs:
+                shift = np.array(newPositions[node]) - vertex.get_center()
+                move = AnimationGroup(self.glyphs[node].animate.shift(shift), move)
+            yield move
+
+    def playInOrder(self, animations):
+        # Plays the animations one after another, in a single play call on a compact timeline.
+        # Animations are built lazily since adding graph edges through animate happens on creation
+        if not self.compactTimeline:
+            for animation in animations:
+                self.play(animation)
+            return
+
+        # lag_ratio=1 starts each one as the previous ends, so timing is the same as separate plays
+        animations = list(animations)
+        if animations:
+            self.play(LaggedStart(*animations, lag_ratio=1))
+
+    def inOrderPlays(self, count):
+        # Play calls playInOrder makes for count animations
+        return min(count, 1) if self.compactTimeline else count
 
     def showCodes(self, codification, symbolPositions):
         codes = {}
         for symbol in symbolPositions:
+            # Leaves inside a glyph are too small for their code to be read
+            if symbol in self.hidden:
+                continue
             symbolPos = copy.deepcopy(symbolPositions[symbol])
             symbolPos[1] -= 0.5
-            codes[symbol] = Text(codification[symbol]).scale(0.5)
+            codes[symbol] = labels.text(codification[symbol]).scale(0.5)
             codes[symbol].move_to(symbolPos)
             self.add(codes[symbol])
         return codes
 
     def showProbabilities(self, tree):
         numbers = {}
-        for leader in tree:
-            leaderPos = copy.deepcopy(tree[leader].positions[leader])
-            leaderPos[1] += 0.5
-            probability = round(tree[leader].probability, 4)
-            numbers[leader] = Text(str(probability)).scale(0.5)
-            numbers[leader].move_to(leaderPos)
-            self.add(numbers[leader])
+        with self.profile("showProbabilities", MOBJECTS):
+            for leader in tree:
+                leaderPos = tree[leader].position()
+                leaderPos[1] += 0.5
+                probability = round(tree[leader].probability, 4)
+                numbers[leader] = labels.text(str(probability)).scale(0.5)
+                numbers[leader].move_to(leaderPos)
+                self.add(numbers[leader])
         return numbers
 
     def removeNumbers(self, numbers):
-        for number in numbers:
-            self.play(FadeOut(numbers[number]))
+        self.playInOrder(FadeOut(numbers[number]) for number in numbers)
 
 
 #inputSymbols = ['A', 'B', 'C', 'D', 'E', 'F']
@@ -0,0 +1,313 @@
+import os
+import platform
+import subprocess
+
+from PySide6.QtWidgets import (
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QListWidget, QListWidgetItem,
+    QPushButton, QMessageBox, QComboBox, QCheckBox
+)
+from PySide6.QtCore import QObject, Qt, QThread, QTimer, QUrl, Signal, Slot
+from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
+from PySide6.QtMultimediaWidgets import QVideoWidget
+
+from rendering.client import RenderClient
+from rendering.jobs import FINAL, PRESETS, PREVIEW
+from rendering.workers import PROGRESS, FINISHED, FAILED, CANCELLED
+
+
+class RenderClientWorker(QObject):
+    """Runs a RenderClient on its own thread, where waiting for the server cannot freeze the window.
+
+    Submissions are numbered by the widget; submitted and rejected report
+    them back with the job id or the error, and events carries what
+    RenderClient.poll returns.
+    """
+
+    submitted = Signal(int, int)
+    rejected = Signal(int, str)
+    events = Signal(list)
+
+    def __init__(self):
+        super().__init__()
+        self.client = RenderClient()
+        self.timer = None
+
+    @Slot()
+    def start(self):
+        """Starts polling, from the worker's thread so the timer lives there too."""
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.poll)
+        self.timer.start(100)
+
+    @Slot(int, object)
+    def submit(self, ticket, job):
+        try:
+            job_id = self.client.submit(job)
+        except OSError as error:
+            self.rejected.emit(ticket, str(error))
+            return
+        self.submitted.emit(ticket, job_id)
+        self.poll()
+
+    @Slot(int)
+    def cancel(self, job_id):
+        self.client.cancel(job_id)
+        self.poll()
+
+    @Slot()
+    def poll(self):
+        events = self.client.poll()
+        if events:
+            self.events.emit(events)
+
+    @Slot()
+    def shutdown(self):
+        if self.timer is not None:
+            self.timer.stop()
+        self.client.shutdown()
+
+
+def open_video_externally(file_path):
+    """Opens a video in the system's default player."""
+    if platform.system() == "Windows":
+        os.startfile(file_path)
+    elif platform.system() == "Darwin":  # macOS
+        subprocess.call(["open", file_path])
+    else:  # Linux and others
+        subprocess.call(["xdg-open", file_path])
+
+
+class VideoPlayer(QWidget):
+    """Window playing the video of one submission, its preview first and then the final in its place."""
+
+    def __init__(self, title):
+        super().__init__()
+        self.path = None
+        self.setWindowTitle(title)
+        self.resize(960, 580)
+
+        self.media_player = QMediaPlayer(self)
+        self.audio_output = QAudioOutput(self)
+        self.media_player.setAudioOutput(self.audio_output)
+        video_widget = QVideoWidget()
+        self.media_player.setVideoOutput(video_widget)
+        self.media_player.playbackStateChanged.connect(self.playback_state_changed)
+
+        layout = QVBoxLayout()
+        layout.addWidget(video_widget)
+        hbox = QHBoxLayout()
+        self.play_button = QPushButton("Pause")
+        self.play_button.clicked.connect(self.play)
+        hbox.addWidget(self.play_button)
+        external_btn = QPushButton("Open Externally")
+        external_btn.clicked.connect(lambda: open_video_externally(self.path))
+        hbox.addWidget(external_btn)
+        layout.addLayout(hbox)
+        self.setLayout(layout)
+
+    def show_video(self, path):
+        """Plays path from the start, in place of whatever video was showing."""
+        self.path = path
+        self.media_player.stop()
+        self.media_player.setSource(QUrl.fromLocalFile(path))
+        self.media_player.play()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+
+    def play(self):
+        """Toggles play and pause for the video."""
+        if self.media_player.playbackState() == QMediaPlayer.PlayingState:
+            self.media_player.pause()
+        else:
+            self.media_player.play()
+
+    def playback_state_changed(self, state):
+        self.play_button.setText("Pause" if state == QMediaPlayer.PlayingState else "Play")
+
+    def closeEvent(self, event):
+        self.media_player.stop()
+        super().closeEvent(event)
+
+
+class RenderQueueWidget(QWidget):
+    """Lists the renders running in the background and lets the user cancel them.
+
+    Renders run on the local render server, which is started with the first
+    one and keeps manim loaded between them. Each submitted job can first be
+    rendered as a quick preview, which plays as soon as it is ready, while
+    the chosen quality renders behind it. Both renders of a submission share
+    its key and one VideoPlayer: the final replaces the preview there, and a
+    preview that ends after its final is dropped. Requests to the server go
+    through a RenderClientWorker on another thread.
+    """
+
+    # Key of the submission and path of every video shown
+    video_ready = Signal(int, str)
+    submit_requested = Signal(int, object)
+    cancel_requested = Signal(int)
+    shutdown_requested = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.items = {}
+        self.labels = {}
+        # Submission key and whether it is the preview, of every job and ticket
+        self.roles = {}
+        # Rows of the submissions the server has not answered yet
+        self.tickets = {}
+        self.next_ticket = 0
+        # Jobs that finished, failed or were cancelled
+        self.ended = set()
+        # Per submission key: the preview's job id once queued, finals done, players
+        self.previews = {}
+        self.finals_done = set()
+        self.players = {}
+        self.next_key = 0
+        self.init_ui()
+
+        self.client_thread = QThread(self)
+        self.worker = RenderClientWorker()
+        self.worker.moveToThread(self.client_thread)
+        self.client_thread.started.connect(self.worker.start)
+        self.submit_requested.connect(self.worker.submit)
+        self.cancel_requested.connect(self.worker.cancel)
+        self.shutdown_requested.connect(self.worker.shutdown, Qt.BlockingQueuedConnection)
+        self.worker.submitted.connect(self.job_submitted)
+        self.worker.rejected.connect(self.job_rejected)
+        self.worker.events.connect(self.show_events)
+        self.client_thread.start()
+        QApplication.instance().aboutToQuit.connect(self.shutdown)
+
+    def init_ui(self):
+        """Initializes the render list and its buttons."""
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        # Output quality
+        hbox = QHBoxLayout()
+        hbox.addWidget(QLabel("Quality:"))
+        self.preset_selector = QComboBox()
+        self.preset_selector.addItems([preset for preset in PRESETS if preset != PREVIEW])
+        self.preset_selector.setCurrentText(FINAL)
+        hbox.addWidget(self.preset_selector)
+        self.preview_check = QCheckBox("Show a preview first")
+        self.preview_check.setChecked(True)
+        hbox.addWidget(self.preview_check)
+        layout.addLayout(hbox)
+
+        layout.addWidget(QLabel("Renders:"))
+
+        self.job_list = QListWidget()
+        self.job_list.setSelectionMode(QListWidget.ExtendedSelection)
+        layout.addWidget(self.job_list)
+
+        hbox = QHBoxLayout()
+        cancel_btn = QPushButton("Cancel Selected")
+        cancel_btn.clicked.connect(self.cancel_selected)
+        hbox.addWidget(cancel_btn)
+        layout.addLayout(hbox)
+
+        self.setLayout(layout)
+
+    def submit(self, job):
+        """Queues a job at the selected quality, after its preview if asked for; returns its key."""
+        key = self.next_key
+        self.next_key += 1
+        if self.preview_check.isChecked():
+            self.submit_job(job.with_preset(PREVIEW), key, True)
+        self.submit_job(job.with_preset(self.preset_selector.currentText()), key)
+        return key
+
+    def submit_job(self, job, key, preview=False):
+        """Queues a render job as it is under the submission key and adds it to the list."""
+        label = f"{job.algorithm} ({len(job.symbols)} symbols, {job.preset})"
+        item = QListWidgetItem(f"{label}: sending")
+        self.job_list.addItem(item)
+
+        ticket = self.next_ticket
+        self.next_ticket += 1
+        self.tickets[ticket] = (item, label, (key, preview))
+        self.submit_requested.emit(ticket, job)
+
+    def job_submitted(self, ticket, job_id):
+        """Ties a row to the id the server gave its job."""
+        item, label, role = self.tickets.pop(ticket)
+        item.setText(f"{label}: queued")
+        item.setData(Qt.UserRole, job_id)
+        self.items[job_id] = item
+        self.labels[job_id] = label
+        self.roles[job_id] = role
+        key, preview = role
+        if preview:
+            self.previews[key] = job_id
+            # A cached final can finish before its preview is even queued
+            if key in self.finals_done:
+                self.cancel_requested.emit(job_id)
+
+    def job_rejected(self, ticket, message):
+        """Marks the row of a job the server could not queue."""
+        item, label, _ = self.tickets.pop(ticket)
+        item.setText(f"{label}: not queued")
+        item.setToolTip(message)
+        QMessageBox.warning(self, "Render Server Unavailable", message)
+
+    def cancel_selected(self):
+        """Cancels the selected renders."""
+        for item in self.job_list.selectedItems():
+            job_id = item.data(Qt.UserRole)
+            if job_id is not None:
+                self.cancel_requested.emit(job_id)
+
+    def show_events(self, events):
+        """Updates the list with the worker events and hands on finished videos."""
+        for event in events:
+            kind, job_id = event[0], event[1]
+            item = self.items[job_id]
+            label = self.labels[job_id]
+            if kind != PROGRESS:
+                self.ended.add(job_id)
+
+            if kind == PROGRESS:
+                done, total = event[2], event[3]
+                item.setText(f"{label}: {done}/{total} animations")
+            elif kind == FINISHED and not os.path.exists(event[2]):
+                # Renders sharing the cache may have evicted it since
+                item.setText(f"{label}: evicted")
+                item.setToolTip("The video was evicted from the render cache; queue it again.")
+            elif kind == FINISHED:
+                self.show_finished(job_id, event[2])
+            elif kind == FAILED:
+                item.setText(f"{label}: failed")
+                item.setToolTip(event[2])
+                QMessageBox.warning(self, "Render Failed", event[2])
+            elif kind == CANCELLED:
+                item.setText(f"{label}: cancelled")
+
+    def show_finished(self, job_id, path):
+        """Plays a finished video in its submission's player, unless it is a preview its final beat."""
+        key, preview = self.roles[job_id]
+        item, label = self.items[job_id], self.labels[job_id]
+        if preview and key in self.finals_done:
+            item.setText(f"{label}: done, final already shown")
+            return
+
+        item.setText(f"{label}: done")
+        if not preview:
+            self.finals_done.add(key)
+            # The preview has nothing left to show
+            preview_id = self.previews.get(key)
+            if preview_id is not None and preview_id not in self.ended:
+                self.cancel_requested.emit(preview_id)
+
+        player = self.players.get(key)
+        if player is None:
+            player = self.players[key] = VideoPlayer(label.rsplit(", ", 1)[0] + ")")
+        player.show_video(path)
+        self.video_ready.emit(key, path)
+
+    def shutdown(self):
+        """Cancels this window's renders and stops the client thread."""
+        self.shutdown_requested.emit()
+        self.client_thread.quit()
+        self.client_thread.wait()
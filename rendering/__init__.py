@@ -0,0 +1,10 @@
+"""Rendering pipeline around the manim scenes."""
+from .cache import RenderCache
+from .jobs import (
+    ADAPTIVE_HUFFMAN, FINAL, HUFFMAN, PRESETS, PREVIEW, SHANNON_FANO, Preset, RenderJob, quality_settings,
+    render_job
+)
+from .workers import CANCELLED, FAILED, FINISHED, PROGRESS, RenderWorkers, WarmRenderWorkers
+from .client import RenderClient, RenderServerError
+from .segments import render_segmented
+from .incremental import render_incremental
@@ -0,0 +1,228 @@
+"""Headless batch rendering of a manifest of jobs.
+
+    python -m rendering.batch jobs.json --output-dir videos
+
+A JSON manifest is a list of jobs (or an object with a "jobs" list), each
+with "algorithm", "symbols", "probabilities" and, for Huffman,
+"output_symbols", plus an optional "name" for the output file and
+"compact" to group each Huffman step into one animation, "max_length" to
+limit the length of the Huffman codewords, "detail" set to false to draw
+every node instead of summarising the subtrees too narrow to read and
+"preset" to pick the output quality. Adaptive Huffman jobs give the stream
+as "symbols", a list or a string of one-character symbols, and no
+probabilities. A CSV manifest has those columns, with the lists written
+comma separated inside quoted cells and compact and detail written as true
+or false.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .cache import DEFAULT_CACHE_DIR, RenderCache
+from .jobs import (
+    ADAPTIVE_HUFFMAN, FINAL, HUFFMAN, PRESETS, SHANNON_FANO, RenderJob, clear_media_videos, quality_settings,
+    render_job, use_private_media_dir
+)
+from .profiling import PROFILE_ENV
+from .segments import render_segmented
+
+
+def _split_cell(cell):
+    return [value.strip() for value in cell.split(",") if value.strip()]
+
+
+def load_manifest(path, preset=FINAL):
+    """Reads a JSON or CSV manifest and returns (name, RenderJob) pairs.
+
+    preset is the quality of the jobs that do not name one.
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, newline="") as manifest:
+            entries = [
+                {
+                    "name": row.get("name") or None,
+                    "algorithm": row["algorithm"],
+                    "symbols": _split_cell(row["symbols"]),
+                    "probabilities": _split_cell(row.get("probabilities") or ""),
+                    "output_symbols": _split_cell(row.get("output_symbols") or ""),
+                    "compact": (row.get("compact") or "").strip().lower() in ("1", "true", "yes"),
+                    "preset": row.get("preset") or None,
+                    "max_length": row.get("max_length") or None,
+                    "detail": (row.get("detail") or "true").strip().lower() in ("1", "true", "yes"),
+                }
+                for row in csv.DictReader(manifest)
+            ]
+    else:
+        with open(path) as manifest:
+            entries = json.load(manifest)
+        if isinstance(entries, dict):
+            entries = entries["jobs"]
+
+    jobs = []
+    for index, entry in enumerate(entries):
+        job = manifest_job(entry, preset)
+        jobs.append((entry.get("name") or f"{index:03d}-{job.algorithm}", job))
+    return jobs
+
+
+def manifest_job(entry, preset=FINAL):
+    """Returns the checked RenderJob of one manifest entry."""
+    job = RenderJob(
+        entry["algorithm"],
+        [str(symbol) for symbol in entry["symbols"]],
+        [float(probability) for probability in entry.get("probabilities") or []],
+        [str(symbol) for symbol in entry.get("output_symbols") or []] or None,
+        bool(entry.get("compact", False)),
+        entry.get("preset") or preset,
+        None if entry.get("max_length") is None else int(entry["max_length"]),
+        bool(entry.get("detail", True)),
+    )
+    check_job(job)
+    return job
+
+
+def check_job(job):
+    """Raises ValueError for the inputs the GUIs refuse."""
+    if job.algorithm not in (HUFFMAN, SHANNON_FANO, ADAPTIVE_HUFFMAN):
+        raise ValueError(f"Unknown algorithm {job.algorithm!r}")
+    if job.algorithm == ADAPTIVE_HUFFMAN:
+        if not job.symbols:
+            raise ValueError("Adaptive Huffman jobs need a stream of symbols")
+    elif not job.symbols or len(job.symbols) != len(job.probabilities):
+        raise ValueError("Every symbol needs exactly one probability")
+    elif abs(sum(job.probabilities) - 1.0) > 1e-8:
+        raise ValueError("Probabilities must sum up to 1")
+    if job.algorithm == HUFFMAN and len(job.output_symbols or ()) < 2:
+        raise ValueError("Huffman jobs need at least two output symbols")
+    if job.algorithm == HUFFMAN and job.max_length is not None:
+        if len(job.output_symbols) ** job.max_length < len(job.symbols):
+            raise ValueError(f"{len(job.symbols)} symbols do not fit in codewords of {job.max_length} digits")
+    if job.preset not in PRESETS:
+        raise ValueError(f"Unknown preset {job.preset!r}, expected one of {', '.join(PRESETS)}")
+
+
+def _init_worker():
+    """Pool initializer: own media directory and no interleaved progress bars."""
+    from manim import config
+    use_private_media_dir()
+    config.progress_bar = "none"
+    config.verbosity = "WARNING"
+
+
+def _render(index, job, cache_dir, segments=None):
+    """Renders one job and returns its summary entry."""
+    start = time.perf_counter()
+    try:
+        if segments:
+            path = render_segmented(job, segments, RenderCache(cache_dir))
+        else:
+            path = render_job(job, RenderCache(cache_dir))
+        error = None
+    except Exception as exception:
+        path, error = None, f"{type(exception).__name__}: {exception}"
+    finally:
+        clear_media_videos()
+    return index, path, error, time.perf_counter() - start
+
+
+def _render_pooled(jobs, order, workers, cache_dir):
+    """Yields the results of jobs rendered side by side in a process pool."""
+    pool = ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    )
+    with pool:
+        futures = [pool.submit(_render, index, jobs[index][1], cache_dir) for index in order]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def _render_segmented(jobs, order, workers, cache_dir):
+    """Yields the results of jobs rendered one at a time, each split across processes."""
+    _init_worker()
+    for index in order:
+        yield _render(index, jobs[index][1], cache_dir, workers or os.cpu_count())
+
+
+def render_batch(jobs, output_dir, workers=None, cache_dir=DEFAULT_CACHE_DIR, segmented=False):
+    """Renders (name, job) pairs and returns the summary entries.
+
+    Jobs run side by side in a process pool, or with segmented one at a time
+    with each video cut into segments rendered in parallel, which suits a
+    few long videos better. Finished videos are copied to output_dir as
+    <name>.mp4. The biggest jobs are started first so one long render does
+    not run alone at the end.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    summary = [None] * len(jobs)
+    order = sorted(range(len(jobs)), key=lambda index: -len(jobs[index][1].symbols))
+
+    render = _render_segmented if segmented else _render_pooled
+    for index, path, error, seconds in render(jobs, order, workers, cache_dir):
+        name, job = jobs[index]
+        output = None
+        if path is not None:
+            output = os.path.join(output_dir, f"{name}.mp4")
+            # Other jobs writing to the cache may have evicted it since
+            cache = RenderCache(cache_dir)
+            if not cache.export(cache.key(job, quality_settings(job)), output):
+                output, error = None, "Evicted from the render cache before it was copied"
+        summary[index] = {
+            "name": name,
+            "algorithm": job.algorithm,
+            "symbols": len(job.symbols),
+            "preset": job.preset,
+            "seconds": round(seconds, 3),
+            "output": output,
+            "error": error,
+        }
+        print(f"{name}: {error or output} ({seconds:.1f}s)", file=sys.stderr)
+
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a manifest of coding tree animations.")
+    parser.add_argument("manifest", help="JSON or CSV file describing the jobs")
+    parser.add_argument("--output-dir", default="videos", help="where the videos are copied")
+    parser.add_argument("--workers", type=int, help="render processes, one per core by default")
+    parser.add_argument(
+        "--preset", default=FINAL, choices=sorted(PRESETS),
+        help="quality of the jobs that do not name one"
+    )
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="render cache directory")
+    parser.add_argument(
+        "--segmented", action="store_true",
+        help="render one video at a time, split into segments across the workers"
+    )
+    parser.add_argument("--summary", help="summary file, <output-dir>/summary.json by default")
+    parser.add_argument("--profile", help="directory for a Chrome trace of every render")
+    args = parser.parse_args(argv)
+
+    # Read by the scenes, in the worker processes too
+    if args.profile:
+        os.environ[PROFILE_ENV] = os.path.abspath(args.profile)
+
+    jobs = load_manifest(args.manifest, args.preset)
+    start = time.perf_counter()
+    summary = render_batch(
+        jobs, args.output_dir, args.workers, args.cache_dir, args.segmented
+    )
+
+    summary_path = args.summary or os.path.join(args.output_dir, "summary.json")
+    with open(summary_path, "w") as summary_file:
+        json.dump({"seconds": round(time.perf_counter() - start, 3), "jobs": summary}, summary_file, indent=2)
+
+    failed = sum(entry["error"] is not None for entry in summary)
+    print(f"{len(summary) - failed} rendered, {failed} failed, summary in {summary_path}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""Content-addressed cache of finished videos."""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+# Files whose changes make every cached video stale
+SOURCE_FILES = (
+    "coding_core/__init__.py",
+    "coding_core/adaptive.py",
+    "coding_core/huffman.py",
+    "coding_core/layout.py",
+    "coding_core/package_merge.py",
+    "coding_core/shannon_fano.py",
+    "adaptive_visualization.py",
+    "huffman_visualization.py",
+    "shannon_visualization.py",
+    "rendering/camera.py",
+    "rendering/detail.py",
+    "rendering/jobs.py",
+    "rendering/labels.py",
+    "rendering/timeline.py",
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.environ.get(
+    "HUFFMAN_RENDER_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "huffman-animations")
+)
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+STALE_SECONDS = 24 * 60 * 60
+
+_code_version = None
+
+
+def code_version():
+    """Returns a hash of the rendering code and the installed manim version."""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        for name in SOURCE_FILES:
+            with open(os.path.join(ROOT, name), "rb") as source:
+                digest.update(name.encode())
+                digest.update(source.read())
+        try:
+            from importlib.metadata import version
+            digest.update(version("manim").encode())
+        except Exception:
+            pass
+        _code_version = digest.hexdigest()
+    return _code_version
+
+
+@contextmanager
+def _locked(path):
+    """Holds an exclusive lock on path, shared by every process using the cache."""
+    with open(path, "a+b") as handle:
+        if os.name == "nt":
+            import msvcrt
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+class RenderCache:
+    """Finished MP4s stored under a hash of everything that affects them.
+
+    Entries are written to a temporary file and moved into place, so readers
+    never see a partial video. Hits refresh the file time and the oldest
+    entries are evicted once the cache grows past max_bytes. Index updates
+    take a lock file, so several GUI or batch processes can share a cache;
+    two processes missing on the same key at once both render it.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.lock_path = os.path.join(directory, ".lock")
+
+    def key(self, job, settings):
+        """Returns the cache key of a job rendered with the given settings."""
+        description = {
+            "job": job.normalized(),
+            "settings": settings,
+            "version": code_version(),
+        }
+        encoded = json.dumps(description, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.mp4")
+
+    def get(self, key):
+        """Returns the cached video for key, or None on a miss.
+
+        Writes from any process sharing the cache may evict the video once
+        the lock is released, least recently used first. Callers that read
+        it later take a copy with export(), or check it still exists.
+        """
+        path = self.path(key)
+        with _locked(self.lock_path):
+            if not os.path.exists(path):
+                return None
+            os.utime(path)
+        return path
+
+    def export(self, key, destination, link=False):
+        """Copies the cached video for key to destination under the lock; returns False on a miss.
+
+        With link, a hard link is tried first: it costs nothing and keeps
+        the video readable after eviction removes it from the cache.
+        """
+        path = self.path(key)
+        with _locked(self.lock_path):
+            if not os.path.exists(path):
+                return False
+            os.utime(path)
+            if link:
+                try:
+                    os.link(path, destination)
+                    return True
+                except OSError:
+                    pass
+            shutil.copyfile(path, destination)
+        return True
+
+    @contextmanager
+    def writing(self, key):
+        """Yields a temporary path to render into and stores it under key on success."""
+        handle, temporary = tempfile.mkstemp(suffix=".mp4", dir=self.directory)
+        os.close(handle)
+        try:
+            yield temporary
+            with _locked(self.lock_path):
+                os.replace(temporary, self.path(key))
+                self._evict()
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    def _evict(self):
+        """Removes the least recently used videos until the cache fits."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".mp4"):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            if len(name) == 68:
+                entries.append((stat.st_mtime, stat.st_size, name))
+            elif time.time() - stat.st_mtime > STALE_SECONDS:
+                # Left behind by a render that was cancelled or crashed
+                os.remove(os.path.join(self.directory, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries)[:-1]:
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
@@ -0,0 +1,21 @@
+"""Camera framing shared by the scenes."""
+
+
+def framing(bounds, margin=1.0, minimum_width=None):
+    """Returns the (width, center) of a camera frame that shows bounds.
+
+    bounds is (left, bottom, right, top) in scene units. The frame keeps
+    manim's aspect ratio, leaves margin around the bounds and is never
+    narrower than minimum_width, manim's frame width by default, so small
+    trees are not blown up.
+    """
+    from manim import config
+
+    left, bottom, right, top = bounds
+    aspect = config.frame_width / config.frame_height
+    width = max(
+        right - left + 2 * margin,
+        (top - bottom + 2 * margin) * aspect,
+        minimum_width or config.frame_width,
+    )
+    return width, [(left + right) / 2, (bottom + top) / 2, 0]
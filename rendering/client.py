@@ -0,0 +1,145 @@
+"""Thin client of the render server, with the interface of RenderWorkers."""
+import http.client
+import json
+import os
+import subprocess
+import sys
+import time
+
+from .cache import ROOT
+from .workers import CANCELLED, FAILED, FINISHED, PROGRESS
+
+# host:port of the render server
+DEFAULT_ADDRESS = os.environ.get("HUFFMAN_RENDER_SERVER", "127.0.0.1:8765")
+
+
+class RenderServerError(ConnectionError):
+    """The render server could not be started or refused a request."""
+
+
+class RenderClient:
+    """Sends render jobs to a render server, starting one if none is listening.
+
+    submit, cancel, poll, busy and shutdown behave like RenderWorkers', so
+    the GUIs use either. A server started here stops itself after
+    idle_timeout seconds without work, so the next render within that time
+    starts warm. shutdown only cancels this client's own jobs.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, idle_timeout=1800):
+        host, port = address.rsplit(":", 1)
+        self.host = host
+        self.port = int(port)
+        self.idle_timeout = idle_timeout
+        self.jobs = {}
+        self.events = []
+
+    def submit(self, job):
+        """Sends job to the server and returns its id; raises OSError if it cannot be queued."""
+        body = job._asdict()
+        try:
+            reply = self._request("POST", "/jobs", body)
+        except RenderServerError:
+            raise
+        except OSError:
+            self._start_server()
+            reply = self._request("POST", "/jobs", body)
+        self.jobs[reply["id"]] = (None, None)
+        return reply["id"]
+
+    def cancel(self, job_id):
+        """Cancels a job; returns False if it already ended."""
+        if job_id not in self.jobs:
+            return False
+        try:
+            return self._request("DELETE", f"/jobs/{job_id}")["cancelled"]
+        except OSError:
+            return False
+
+    def poll(self):
+        """Returns the events of this client's jobs since the last call."""
+        events, self.events = self.events, []
+        if not self.jobs:
+            return events
+
+        try:
+            statuses = self._request("GET", "/jobs?ids=" + ",".join(str(job_id) for job_id in self.jobs))
+        except OSError as error:
+            # Whatever the server was rendering is lost with it
+            for job_id in self.jobs:
+                events.append((FAILED, job_id, f"Render server failed: {error}"))
+            self.jobs.clear()
+            return events
+
+        for key, status in statuses.items():
+            job_id = int(key)
+            state = status["state"]
+            if state == "running":
+                progress = (status["done"], status["total"])
+                if progress != self.jobs[job_id]:
+                    self.jobs[job_id] = progress
+                    events.append((PROGRESS, job_id) + progress)
+                continue
+            if state == FINISHED:
+                events.append((FINISHED, job_id, status["path"]))
+            elif state == FAILED:
+                events.append((FAILED, job_id, status["message"]))
+            elif state == CANCELLED:
+                events.append((CANCELLED, job_id))
+            else:
+                continue
+            del self.jobs[job_id]
+        return events
+
+    def busy(self):
+        return bool(self.jobs)
+
+    def shutdown(self):
+        """Cancels this client's jobs and leaves the server running."""
+        for job_id in list(self.jobs):
+            self.cancel(job_id)
+
+    def _request(self, method, path, body=None, timeout=10):
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+        try:
+            headers = {}
+            data = None
+            if body is not None:
+                data = json.dumps(body).encode()
+                headers["Content-Type"] = "application/json"
+            connection.request(method, path, data, headers)
+            response = connection.getresponse()
+            reply = json.loads(response.read())
+        except ValueError:
+            raise RenderServerError(f"Render server sent an invalid reply to {method} {path}") from None
+        finally:
+            connection.close()
+
+        if response.status != 200:
+            raise RenderServerError(reply.get("error", f"Render server answered {response.status}"))
+        return reply
+
+    def _start_server(self, timeout=15):
+        """Starts a render server in the background and waits until it answers."""
+        command = [
+            sys.executable, "-m", "rendering.server", "--host", self.host, "--port", str(self.port),
+            "--idle-timeout", str(self.idle_timeout),
+        ]
+        # Detached, so the server outlives the GUI that started it
+        if os.name == "nt":
+            options = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS}
+        else:
+            options = {"start_new_session": True}
+        subprocess.Popen(
+            command, cwd=ROOT, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL, **options
+        )
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                self._request("GET", "/health", timeout=1)
+                return
+            except OSError:
+                time.sleep(0.1)
+        raise RenderServerError(f"Could not start a render server on {self.host}:{self.port}")
@@ -0,0 +1,46 @@
+"""Level of detail for trees too big to read.
+
+Finished subtrees narrower on screen than MIN_SUBTREE_PIXELS are drawn as
+one summary glyph in place of their nodes, edges and labels, so the
+mobjects every frame draws stay bounded as the alphabet grows. The scenes
+only expand a summarised subtree while animating inside it.
+"""
+
+# Below this width the labels of a subtree are a few pixels tall
+MIN_SUBTREE_PIXELS = 48
+
+
+def narrow_subtrees(roots, children, span, ready, pixels_per_unit, threshold=MIN_SUBTREE_PIXELS):
+    """Returns the highest ready nodes under roots whose subtrees are narrower than threshold pixels.
+
+    children(node) lists the children of a node, span(node) is the width
+    of its subtree in scene units and ready(node) says whether it may be
+    summarised. The walk stops at the nodes it returns, so its cost follows
+    what is still drawn rather than the size of the tree.
+    """
+    found = []
+    stack = list(roots)
+    while stack:
+        node = stack.pop()
+        if ready(node) and span(node) * pixels_per_unit < threshold:
+            found.append(node)
+        else:
+            stack.extend(children(node))
+    return found
+
+
+def pixels_per_unit(frame_width):
+    """Returns the pixels one scene unit covers with a camera frame frame_width units wide."""
+    from manim import config
+
+    return config.pixel_width / frame_width
+
+
+def summary_glyph(apex, left, right, bottom):
+    """Returns the triangle drawn for a summarised subtree, from apex down to its leaves."""
+    from manim import GRAY, Polygon
+
+    return Polygon(
+        [apex[0], apex[1], 0], [left, bottom, 0], [right, bottom, 0],
+        color=GRAY, fill_opacity=0.5, stroke_width=2
+    )
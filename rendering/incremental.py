@@ -0,0 +1,167 @@
+"""Re-rendering only the steps that changed since an earlier render."""
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import tempfile
+
+from .cache import RenderCache, code_version
+from .jobs import quality_settings, render_job
+from .segments import concat_videos
+from .timeline import Signature
+
+# Partial movies manim keeps after a render, enough for every play of any
+# scene so that the steps can still be cut from them
+KEPT_PARTIAL_MOVIES = 10 ** 9
+
+
+def _plain(value):
+    """JSON fallback for the NumPy arrays and scalars in step signatures."""
+    return value.tolist()
+
+
+def step_keys(job, signatures, settings):
+    """Returns the cache key of every step of a job's timeline.
+
+    Each key hashes the key before it with the step's signature, so a step
+    keeps its key only while every step up to it is unchanged. The passing
+    part of a Signature only goes into its own step's key. The first one
+    also covers the algorithm, the output settings and the code.
+    """
+    header = {"algorithm": job.algorithm, "settings": settings, "version": code_version()}
+    chain = hashlib.sha256(json.dumps(header, sort_keys=True).encode()).hexdigest()
+
+    keys = []
+    for signature in signatures:
+        passing = None
+        if isinstance(signature, Signature):
+            signature, passing = signature
+        encoded = json.dumps([chain, signature], default=_plain, separators=(",", ":"))
+        chain = hashlib.sha256(encoded.encode()).hexdigest()
+        if passing is None:
+            keys.append(chain)
+            continue
+        encoded = json.dumps([chain, passing], default=_plain, separators=(",", ":"))
+        keys.append(hashlib.sha256(encoded.encode()).hexdigest())
+    return keys
+
+
+def missing_runs(cached):
+    """Returns the (first, end) ranges of consecutive steps that are not cached."""
+    runs = []
+    for index, hit in enumerate(cached):
+        if hit:
+            continue
+        if runs and runs[-1][1] == index:
+            runs[-1] = (runs[-1][0], index + 1)
+        else:
+            runs.append((index, index + 1))
+    return runs
+
+
+def render_incremental(job, cache=None, progress=None):
+    """Renders job reusing the steps cached by earlier renders.
+
+    Every run of changed steps is rendered in one pass (manim skips the
+    animations before it and stops after it), then stored one video per
+    step for later edits. The result is the cached steps and the new runs
+    joined by stream copy. Without an ffmpeg binary this is render_job.
+    """
+    from manim import tempconfig
+
+    cache = cache or RenderCache()
+    settings = quality_settings(job)
+    key = cache.key(job, settings)
+    path = cache.get(key)
+    if path is not None:
+        return path
+    if shutil.which("ffmpeg") is None:
+        return render_job(job, cache, progress)
+
+    with tempconfig(job.manim_config()):
+        scene = job.create_scene()
+        steps = scene.timeline_steps()
+        keys = step_keys(job, scene.timeline_signatures(), settings)
+
+    directory = tempfile.mkdtemp(prefix="huffman-steps-")
+    try:
+        # Linked here, so storing the new steps cannot evict the ones reused
+        paths = [os.path.join(directory, f"step-{index:05d}.mp4") for index in range(len(keys))]
+        paths = [
+            step_path if cache.export(step_key, step_path, link=True) else None
+            for step_key, step_path in zip(keys, paths)
+        ]
+        runs = missing_runs([step_path is not None for step_path in paths])
+        ends = list(itertools.accumulate(steps, initial=0))
+        total = sum(ends[end] - ends[first] for first, end in runs)
+
+        parts, done, previous = [], 0, 0
+        for first, end in runs:
+            parts += paths[previous:first]
+            run_file = os.path.join(directory, f"{first:05d}.mp4")
+            run_config = job.manim_config(
+                output_file=run_file, from_animation_number=ends[first], max_files_cached=KEPT_PARTIAL_MOVIES
+            )
+            if end < len(steps):
+                run_config["upto_animation_number"] = ends[end] - 1
+            with tempconfig(run_config):
+                scene = job.create_scene()
+                scene.progress_callback = _run_progress(progress, done, ends[first], ends[end], total)
+                scene.render()
+            _store_steps(cache, scene, steps, keys, first, end)
+            parts.append(run_file)
+            done += ends[end] - ends[first]
+            previous = end
+        parts += paths[previous:]
+
+        with cache.writing(key) as output_file:
+            concat_videos(parts, output_file)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return cache.path(key)
+
+
+def _run_progress(progress, done, first_play, end_play, total):
+    """Reports the plays of one run of changed steps as progress over all the runs."""
+    if progress is None:
+        return None
+
+    def report(plays, _):
+        progress(done + min(max(plays - first_play, 0), end_play - first_play), total)
+    return report
+
+
+def partial_movie_files(file_writer):
+    """Returns the partial movie of every play call so far, None for the plays manim skipped.
+
+    manim 0.18 lists them in file_writer.partial_movie_files and again in
+    each section; releases after it keep only the lists of the sections.
+    """
+    if hasattr(file_writer, "partial_movie_files"):
+        return file_writer.partial_movie_files
+    return [movie for section in file_writer.sections for movie in section.partial_movie_files]
+
+
+def _store_steps(cache, scene, steps, keys, first, end):
+    """Caches a video of each step of first..end from the scene's partial movies, then deletes them.
+
+    manim keeps only max_files_cached partial movies once a render ends,
+    so renders that store steps raise it to KEPT_PARTIAL_MOVIES; the
+    partial movies are removed here instead.
+    """
+    partial_movies = partial_movie_files(scene.renderer.file_writer)
+    stop = sum(steps[:first])
+    for plays, step_key in zip(steps[first:end], keys[first:end]):
+        start, stop = stop, stop + plays
+        movies = [movie for movie in partial_movies[start:stop] if movie]
+        if not movies:
+            continue
+
+        with cache.writing(step_key) as output_file:
+            concat_videos(movies, output_file)
+
+    for movie in set(filter(None, partial_movies)):
+        if os.path.exists(movie):
+            os.remove(movie)
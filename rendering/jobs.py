@@ -0,0 +1,151 @@
+"""Render jobs shared by the GUIs."""
+import atexit
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+
+from .cache import RenderCache
+
+HUFFMAN = "Huffman"
+SHANNON_FANO = "Shannon-Fano"
+ADAPTIVE_HUFFMAN = "Adaptive Huffman"
+
+# Symbols at the start of the stream an adaptive Huffman job animates
+ADAPTIVE_PREFIX = 12
+
+# Output quality of a render, wait_scale shortens the pauses between steps
+Preset = namedtuple("Preset", "pixel_width pixel_height frame_rate wait_scale")
+
+PREVIEW = "preview"
+FINAL = "final"
+PRESETS = {
+    PREVIEW: Preset(854, 480, 15, 0.25),
+    "medium": Preset(1280, 720, 30, 1.0),
+    FINAL: Preset(1920, 1080, 60, 1.0),
+}
+
+
+class RenderJob(namedtuple(
+    "RenderJob", "algorithm symbols probabilities output_symbols compact preset max_length detail",
+    defaults=(False, FINAL, None, True)
+)):
+    """One animation to render, described by plain data.
+
+    compact plays each Huffman step's edges, moves and fades as one grouped
+    animation, which renders far fewer partial movies for the same timeline.
+    preset names the output quality in PRESETS. A Huffman job with a
+    max_length builds the cheapest code with no longer codewords instead.
+    detail draws the Huffman and Shannon-Fano subtrees too narrow to read
+    as one summary glyph; without it every node is drawn.
+    An adaptive Huffman job has the stream in symbols, of which the first
+    ADAPTIVE_PREFIX are animated, and no probabilities.
+    """
+
+    __slots__ = ()
+
+    def normalized(self):
+        """Returns the job as JSON-friendly data with only what changes the video."""
+        output_symbols = None
+        compact = False
+        symbols, probabilities = self.symbols, self.probabilities
+        if self.algorithm == ADAPTIVE_HUFFMAN:
+            symbols, probabilities = self.symbols[:ADAPTIVE_PREFIX], ()
+        elif self.algorithm == HUFFMAN:
+            output_symbols = [str(symbol) for symbol in self.output_symbols]
+            compact = bool(self.compact)
+        normalized = {
+            "algorithm": self.algorithm,
+            "symbols": [str(symbol) for symbol in symbols],
+            "probabilities": [float(probability) for probability in probabilities],
+            "output_symbols": output_symbols,
+            "compact": compact,
+        }
+        # Only there when set, so unlimited jobs keep their cached videos
+        if self.algorithm == HUFFMAN and self.max_length is not None:
+            normalized["max_length"] = int(self.max_length)
+        if self.algorithm != ADAPTIVE_HUFFMAN and not self.detail:
+            normalized["detail"] = False
+        return normalized
+
+    def with_preset(self, preset):
+        """Returns the same job rendered with another quality preset."""
+        return self._replace(preset=preset)
+
+    def manim_config(self, **overrides):
+        """Returns the manim config of this job's preset, for tempconfig."""
+        preset = PRESETS[self.preset]
+        return dict(
+            pixel_width=preset.pixel_width,
+            pixel_height=preset.pixel_height,
+            frame_rate=preset.frame_rate,
+            **overrides
+        )
+
+    def create_scene(self):
+        """Creates the manim scene that animates this job."""
+        if self.algorithm == SHANNON_FANO:
+            from shannon_visualization import ShannonFanoTree
+            scene = ShannonFanoTree(list(self.symbols), list(self.probabilities), detail=bool(self.detail))
+        elif self.algorithm == ADAPTIVE_HUFFMAN:
+            from adaptive_visualization import AdaptiveHuffmanTree
+            scene = AdaptiveHuffmanTree(list(self.symbols[:ADAPTIVE_PREFIX]))
+        else:
+            from huffman_visualization import HuffmanTree
+            scene = HuffmanTree(
+                list(self.symbols), list(self.output_symbols), list(self.probabilities),
+                compactTimeline=bool(self.compact), maxLength=self.max_length, levelOfDetail=bool(self.detail)
+            )
+        scene.wait_scale = PRESETS[self.preset].wait_scale
+        return scene
+
+
+def quality_settings(job):
+    """Returns the output settings of a job that change the rendered video."""
+    return PRESETS[job.preset]._asdict()
+
+
+def use_private_media_dir(directory=None):
+    """Gives this process its own manim media directory for partial movie files.
+
+    manim names them after the scene class and the animation hashes, so
+    concurrent renders in several processes would otherwise write to the
+    same files. Called once at the start of every worker process, with the
+    directory its parent made when the parent removes it, since a worker
+    that is terminated cannot.
+    """
+    from manim import config
+    if directory is None:
+        directory = tempfile.mkdtemp(prefix="huffman-media-")
+        atexit.register(shutil.rmtree, directory, True)
+    config.media_dir = directory
+
+
+def clear_media_videos():
+    """Deletes the videos and partial movies manim left in the media directory, between jobs."""
+    from manim import config
+    shutil.rmtree(os.path.join(config.media_dir, "videos"), ignore_errors=True)
+
+
+def render_job(job, cache=None, progress=None):
+    """Renders job unless the same video is cached and returns the MP4 path.
+
+    progress, if given, is called with (animations done, total) as the
+    scene plays.
+    """
+    from manim import tempconfig
+
+    cache = cache or RenderCache()
+    key = cache.key(job, quality_settings(job))
+    path = cache.get(key)
+    if path is not None:
+        return path
+
+    with cache.writing(key) as output_file:
+        # The scene's file writer reads the output file when it is created
+        with tempconfig(job.manim_config(output_file=output_file)):
+            scene = job.create_scene()
+            scene.progress_callback = progress
+            scene.render()
+
+    return cache.path(key)
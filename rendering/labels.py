@@ -0,0 +1,56 @@
+"""Memoized Text mobjects for the labels the scenes draw over and over."""
+from collections import OrderedDict
+
+
+class LabelFactory:
+    """Hands out copies of cached Text mobjects.
+
+    Building a Text runs Pango layout and parses the resulting SVG, while a
+    copy only duplicates the point arrays. Probabilities, codes and the "0"
+    and "1" edge labels repeat a lot, so each (text, font, size, colour) is
+    built once and the least recently used entries are dropped past maxsize.
+    Arguments left as None keep manim's defaults.
+    """
+
+    def __init__(self, maxsize=2048):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def text(self, text, font=None, font_size=None, color=None):
+        """Returns a new Text mobject, free to be moved, scaled or recoloured."""
+        # Colours are keyed by their string form, which is the hex code for manim colours
+        key = (text, font, font_size, None if color is None else str(color))
+        cached = self.entries.get(key)
+        if cached is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return cached.copy()
+
+        from manim import Text
+        self.misses += 1
+        options = {
+            name: value
+            for name, value in (("font", font), ("font_size", font_size), ("color", color))
+            if value is not None
+        }
+        cached = Text(text, **options)
+        self.entries[key] = cached
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return cached.copy()
+
+    def clear(self):
+        self.entries.clear()
+
+
+# Shared by every scene rendered in this process
+labels = LabelFactory()
+
+
+def symbol_label(symbol):
+    """Returns how a symbol read from a stream is written, with whitespace made visible."""
+    if symbol == " ":
+        return "\u2423"
+    return str(symbol).encode("unicode_escape").decode("ascii")
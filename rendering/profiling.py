@@ -0,0 +1,128 @@
+"""Opt-in timing of where a render spends its time, as a Chrome trace.
+
+Set HUFFMAN_PROFILE to a directory and every scene rendered afterwards
+writes <scene>-<time>-<pid>.json there, which chrome://tracing, Perfetto
+or speedscope open as a timeline. Phases nest: the scene's own steps
+(algorithm, mobject building, every merge or split), each play call and,
+inside it, cairo drawing every frame and the frames written to ffmpeg.
+Every phase records the memory it allocated and its peak, from
+tracemalloc, and each play is followed by counters of the play calls so
+far and the live mobjects.
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+PROFILE_ENV = "HUFFMAN_PROFILE"
+
+# Trace categories, which viewers can colour and filter by
+ALGORITHM = "algorithm"
+MOBJECTS = "mobjects"
+STEP = "step"
+ANIMATION = "animation"
+CAIRO = "cairo"
+FFMPEG = "ffmpeg"
+
+
+def profile_path(name):
+    """Returns where the trace of a scene called name goes, or None when profiling is off."""
+    directory = os.environ.get(PROFILE_ENV)
+    if not directory:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.json")
+
+
+class SceneProfiler:
+    """Records nested phases and counters as Chrome trace events.
+
+    Times are in microseconds from the profiler's creation. With memory,
+    tracemalloc runs from the first phase to write(); it slows Python
+    allocations down, so durations are best compared within one trace.
+    """
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.events = []
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        self.tid = threading.get_ident()
+        # Open phases, innermost last, with their memory at the start and peak so far
+        self.stack = []
+
+    def _now(self):
+        return (time.perf_counter() - self.origin) * 1e6
+
+    @contextmanager
+    def phase(self, name, category=STEP, **args):
+        """Records the block it wraps as one complete event, with args attached."""
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        frame = None
+        if self.memory:
+            # The peak is reset for the new phase, so the open ones keep theirs first
+            current, peak = tracemalloc.get_traced_memory()
+            for outer in self.stack:
+                outer[1] = max(outer[1], peak)
+            tracemalloc.reset_peak()
+            frame = [current, current]
+            self.stack.append(frame)
+
+        start = self._now()
+        try:
+            yield
+        finally:
+            end = self._now()
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                self.stack.pop()
+                frame[1] = max(frame[1], peak)
+                for outer in self.stack:
+                    outer[1] = max(outer[1], frame[1])
+                args = dict(
+                    args, allocated_kib=(current - frame[0]) // 1024, peak_kib=(frame[1] - frame[0]) // 1024
+                )
+            self.events.append({
+                "name": name, "cat": category, "ph": "X", "ts": start, "dur": end - start,
+                "pid": self.pid, "tid": self.tid, "args": args,
+            })
+
+    def counters(self, name, **values):
+        """Records the values of a counter track at this moment."""
+        self.events.append({
+            "name": name, "ph": "C", "ts": self._now(), "pid": self.pid, "tid": self.tid, "args": values,
+        })
+
+    def instrument(self, scene):
+        """Times the frames scene draws with cairo and hands to ffmpeg, and the final movie."""
+        renderer = scene.renderer
+        self._wrap(renderer, "update_frame", "draw frame", CAIRO)
+        writer = getattr(renderer, "file_writer", None)
+        if writer is not None:
+            self._wrap(writer, "write_frame", "write frame", FFMPEG)
+            self._wrap(writer, "end_animation", "close partial movie", FFMPEG)
+            self._wrap(writer, "finish", "combine movie", FFMPEG)
+
+    def _wrap(self, owner, name, phase, category):
+        method = getattr(owner, name, None)
+        if method is None:
+            return
+
+        def timed(*args, **kwargs):
+            with self.phase(phase, category):
+                return method(*args, **kwargs)
+
+        setattr(owner, name, timed)
+
+    def write(self, path):
+        """Writes the trace as JSON and stops tracemalloc."""
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.events.append({
+            "name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": "render"},
+        })
+        with open(path, "w") as trace:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, trace)
@@ -0,0 +1,118 @@
+"""Rendering one long scene as segments in parallel processes."""
+import bisect
+import itertools
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import RenderCache
+from .jobs import quality_settings, render_job, use_private_media_dir
+
+
+def segment_ranges(steps, segments):
+    """Cuts a timeline into at most segments ranges of whole steps.
+
+    steps holds the play calls of each step, as given by the scene's
+    timeline_steps() (see TimelineMixin). Returns inclusive (first, last)
+    play indices, cut at the step ends closest to equal shares of the plays.
+    """
+    ends = list(itertools.accumulate(steps))
+    total = ends.pop()
+    cuts = set()
+    for index in range(1, segments):
+        target = total * index / segments
+        position = bisect.bisect_left(ends, target)
+        nearby = ends[max(position - 1, 0):position + 1]
+        if nearby:
+            cuts.add(min(nearby, key=lambda end: abs(end - target)))
+
+    bounds = [0] + sorted(cuts) + [total]
+    return [(first, last - 1) for first, last in zip(bounds, bounds[1:])]
+
+
+def _render_segment(job, first, last, output_file):
+    """Pool worker: renders the plays first..last of job into output_file.
+
+    manim still runs construct from the start but skips the animations
+    before first, so the segment starts from the same scene state as in a
+    serial render, and it stops after last.
+    """
+    from manim import tempconfig
+
+    use_private_media_dir()
+    settings = job.manim_config(
+        output_file=output_file,
+        from_animation_number=first,
+        upto_animation_number=last,
+        progress_bar="none",
+    )
+    with tempconfig(settings):
+        job.create_scene().render()
+    return output_file
+
+
+def concat_videos(paths, output_file):
+    """Joins videos with the same encoding using ffmpeg's concat demuxer, without re-encoding."""
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as listing:
+        for path in paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            listing.write(f"file '{escaped}'\n")
+    try:
+        subprocess.run(
+            [
+                "ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+                "-i", listing.name, "-c", "copy", "-movflags", "+faststart", output_file,
+            ],
+            check=True,
+        )
+    finally:
+        os.remove(listing.name)
+
+
+def render_segmented(job, segments=None, cache=None):
+    """Renders job split between its steps across processes and returns the MP4 path.
+
+    Every segment is the same sequence of partial movies a serial render
+    would make, so joining them by stream copy gives the same video. Jobs
+    with too few steps, or machines without an ffmpeg binary, render
+    serially through render_job.
+    """
+    from manim import tempconfig
+
+    cache = cache or RenderCache()
+    segments = segments or os.cpu_count() or 1
+    key = cache.key(job, quality_settings(job))
+    path = cache.get(key)
+    if path is not None:
+        return path
+
+    # Scenes read the config as they are built, so the job's settings apply here too
+    with tempconfig(job.manim_config()):
+        steps = job.create_scene().timeline_steps()
+    ranges = segment_ranges(steps, segments)
+    if len(ranges) < 2 or shutil.which("ffmpeg") is None:
+        return render_job(job, cache)
+
+    directory = tempfile.mkdtemp(prefix="huffman-segments-")
+    try:
+        outputs = [os.path.join(directory, f"{index:04d}.mp4") for index in range(len(ranges))]
+        pool = ProcessPoolExecutor(
+            max_workers=len(ranges), mp_context=multiprocessing.get_context("spawn")
+        )
+        with pool:
+            futures = [
+                pool.submit(_render_segment, job, first, last, output)
+                for (first, last), output in zip(ranges, outputs)
+            ]
+            for future in futures:
+                future.result()
+
+        with cache.writing(key) as output_file:
+            concat_videos(outputs, output_file)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return cache.path(key)
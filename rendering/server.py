@@ -0,0 +1,188 @@
+"""Long-lived local render server that keeps manim warm between jobs.
+
+    python -m rendering.server --port 8765
+
+Its worker processes import manim and the scenes and set up the fonts
+once, then render job after job, so a render no longer starts cold. Jobs
+are sent as JSON over HTTP on the loopback interface:
+
+    POST   /jobs           a job, as in a batch manifest  -> {"id": 3}
+    GET    /jobs?ids=3,4   the status of those jobs       -> {"3": {...}, "4": {...}}
+    DELETE /jobs/3         cancels a job                  -> {"cancelled": true}
+    GET    /health                                        -> {"pid": 1234}
+
+A status has a "state" of queued, running, finished, failed or cancelled,
+with "done" and "total" animations while running, the video "path" once
+finished and a "message" if it failed. Ended jobs are forgotten after
+their status has been reported once. RenderClient in rendering.client
+talks to this server and starts it when none is listening.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .batch import manifest_job
+from .cache import DEFAULT_CACHE_DIR
+from .workers import CANCELLED, FAILED, FINISHED, PROGRESS, WarmRenderWorkers
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+QUEUED = "queued"
+RUNNING = "running"
+
+
+class RenderServer(ThreadingHTTPServer):
+    """HTTP front of a WarmRenderWorkers pool.
+
+    Requests are served on their own threads while one more thread polls
+    the workers, so every use of them goes through the lock. With an
+    idle_timeout the server stops itself after that many seconds without
+    requests or jobs.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, max_workers=None, cache_dir=DEFAULT_CACHE_DIR, idle_timeout=None):
+        super().__init__(address, _RequestHandler)
+        self.workers = WarmRenderWorkers(max_workers, cache_dir)
+        self.idle_timeout = idle_timeout
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.last_request = time.monotonic()
+
+    def submit(self, job):
+        with self.lock:
+            job_id = self.workers.submit(job)
+            self.jobs[job_id] = {"state": QUEUED}
+        return job_id
+
+    def cancel(self, job_id):
+        with self.lock:
+            return self.workers.cancel(job_id)
+
+    def status(self, job_ids):
+        """Returns the status of the known jobs among job_ids and forgets those that ended."""
+        statuses = {}
+        with self.lock:
+            for job_id in job_ids:
+                status = self.jobs.get(job_id)
+                if status is None:
+                    continue
+                statuses[str(job_id)] = dict(status)
+                if status["state"] not in (QUEUED, RUNNING):
+                    del self.jobs[job_id]
+        return statuses
+
+    def poll_workers(self, interval=0.1):
+        """Collects worker events until the server shuts down."""
+        while True:
+            time.sleep(interval)
+            with self.lock:
+                for event in self.workers.poll():
+                    self._record(event)
+                idle = not self.workers.busy() and not self.jobs
+
+            if self.idle_timeout and idle and time.monotonic() - self.last_request > self.idle_timeout:
+                self.shutdown()
+                return
+
+    def _record(self, event):
+        kind, job_id = event[0], event[1]
+        status = self.jobs.get(job_id)
+        if status is None:
+            return
+        if kind == PROGRESS:
+            status.update(state=RUNNING, done=event[2], total=event[3])
+        elif kind == FINISHED:
+            status.update(state=FINISHED, path=event[2])
+        elif kind == FAILED:
+            status.update(state=FAILED, message=event[2])
+        elif kind == CANCELLED:
+            status.update(state=CANCELLED)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """JSON requests of RenderServer."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            self._reply(200, {"pid": os.getpid()})
+        elif url.path == "/jobs":
+            ids = ",".join(parse_qs(url.query).get("ids", []))
+            try:
+                job_ids = [int(job_id) for job_id in ids.split(",") if job_id]
+            except ValueError:
+                self._reply(400, {"error": "Job ids must be integers"})
+                return
+            self._reply(200, self.server.status(job_ids))
+        else:
+            self._reply(404, {"error": f"No such resource {url.path}"})
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/jobs":
+            self._reply(404, {"error": f"No such resource {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            job = manifest_job(json.loads(self.rfile.read(length)))
+        except (ValueError, KeyError, TypeError) as error:
+            self._reply(400, {"error": f"Invalid job: {error}"})
+            return
+        self._reply(200, {"id": self.server.submit(job)})
+
+    def do_DELETE(self):
+        path = urlparse(self.path).path
+        prefix = "/jobs/"
+        if not path.startswith(prefix) or not path[len(prefix):].isdigit():
+            self._reply(404, {"error": f"No such resource {path}"})
+            return
+        self._reply(200, {"cancelled": self.server.cancel(int(path[len(prefix):]))})
+
+    def _reply(self, code, body):
+        self.server.last_request = time.monotonic()
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Clients poll several times a second
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve render jobs from warm manim processes.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="interface to listen on, loopback by default")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None, help="render processes kept warm")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="where finished videos are kept")
+    parser.add_argument(
+        "--idle-timeout", type=float, default=None, help="seconds without requests or jobs before stopping"
+    )
+    args = parser.parse_args(argv)
+
+    server = RenderServer((args.host, args.port), args.workers, args.cache_dir, args.idle_timeout)
+    threading.Thread(target=server.poll_workers, daemon=True).start()
+    print(f"Rendering on http://{args.host}:{args.port} with {server.workers.max_workers} workers", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        with server.lock:
+            server.workers.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,348 @@
+"""Finished trees and codes as a single SVG or PNG, without manim.
+
+    python -m rendering.static jobs.json --output-dir images --format png
+
+The layout is the final frame of the animations, taken straight from the
+coding core, so hundreds of symbols export in a fraction of a second.
+"""
+import argparse
+import math
+import os
+import sys
+from xml.sax.saxutils import escape
+
+from coding_core import AdaptiveHuffman, HuffTree, Leaf, shannon_fano_steps, split_tree, tidy_layout
+
+from .jobs import ADAPTIVE_HUFFMAN, ADAPTIVE_PREFIX, SHANNON_FANO
+from .labels import symbol_label
+
+# manim's colours, on manim's black background
+BLACK = "#000000"
+WHITE = "#FFFFFF"
+BLUE = "#58C4DD"
+RED = "#FC6255"
+
+# Width of a character relative to the text height, for sizing boxes
+CHARACTER_WIDTH = 0.6
+# Largest PNG drawn at the full scale; bigger drawings are scaled down to this
+# many pixels, which keeps even hundreds of symbols well under a second
+PNG_MAX_PIXELS = 8_000_000
+
+
+class Drawing:
+    """Lines, circles, boxes and text in scene units with y pointing up."""
+
+    def __init__(self):
+        self.lines = []
+        self.circles = []
+        self.rectangles = []
+        self.texts = []
+
+    def line(self, start, end, color=WHITE, width=0.04):
+        self.lines.append((start, end, color, width))
+
+    def circle(self, center, radius, color=WHITE):
+        self.circles.append((center, radius, color))
+
+    def rectangle(self, center, width, height, color=WHITE):
+        self.rectangles.append((center, width, height, color))
+
+    def text(self, center, text, height, color=WHITE):
+        self.texts.append((center, text, height, color))
+
+    def bounds(self, margin=0.5):
+        """Returns (left, bottom, right, top) around every shape."""
+        boxes = [
+            (min(start[0], end[0]), min(start[1], end[1]), max(start[0], end[0]), max(start[1], end[1]))
+            for start, end, _, _ in self.lines
+        ]
+        boxes += [
+            (x - radius, y - radius, x + radius, y + radius) for (x, y), radius, _ in self.circles
+        ]
+        boxes += [
+            (x - width / 2, y - height / 2, x + width / 2, y + height / 2)
+            for (x, y), width, height, _ in self.rectangles
+        ]
+        for (x, y), text, height, _ in self.texts:
+            width = text_width(text, height)
+            boxes.append((x - width / 2, y - height / 2, x + width / 2, y + height / 2))
+
+        left, bottom, right, top = zip(*boxes)
+        return min(left) - margin, min(bottom) - margin, max(right) + margin, max(top) + margin
+
+    def svg(self, scale=60):
+        """Returns the drawing as an SVG document, scale pixels to a unit."""
+        left, bottom, right, top = self.bounds()
+        width, height = (right - left) * scale, (top - bottom) * scale
+
+        def point(x, y):
+            return (x - left) * scale, (top - y) * scale
+
+        parts = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+            f'viewBox="0 0 {width:.2f} {height:.2f}">',
+            f'<rect width="100%" height="100%" fill="{BLACK}"/>',
+        ]
+        for start, end, color, line_width in self.lines:
+            (x1, y1), (x2, y2) = point(*start), point(*end)
+            parts.append(
+                f'<line x1="{x1:.2f}" y1="{y1:.2f}" x2="{x2:.2f}" y2="{y2:.2f}" '
+                f'stroke="{color}" stroke-width="{line_width * scale:.2f}"/>'
+            )
+        for center, radius, color in self.circles:
+            x, y = point(*center)
+            parts.append(f'<circle cx="{x:.2f}" cy="{y:.2f}" r="{radius * scale:.2f}" fill="{color}"/>')
+        for center, box_width, box_height, color in self.rectangles:
+            x, y = point(*center)
+            parts.append(
+                f'<rect x="{x - box_width * scale / 2:.2f}" y="{y - box_height * scale / 2:.2f}" '
+                f'width="{box_width * scale:.2f}" height="{box_height * scale:.2f}" '
+                f'fill="none" stroke="{color}" stroke-width="{0.04 * scale:.2f}"/>'
+            )
+        for center, text, text_height, color in self.texts:
+            x, y = point(*center)
+            parts.append(
+                f'<text x="{x:.2f}" y="{y:.2f}" fill="{color}" font-family="sans-serif" '
+                f'font-size="{text_height * scale:.2f}" text-anchor="middle" '
+                f'dominant-baseline="central">{escape(text)}</text>'
+            )
+        parts.append("</svg>")
+        return "\n".join(parts)
+
+    def png(self, path, scale=60, max_pixels=PNG_MAX_PIXELS):
+        """Draws the drawing with Pillow and saves it as a PNG of at most max_pixels pixels."""
+        from PIL import Image, ImageDraw
+
+        left, bottom, right, top = self.bounds()
+        scale = min(scale, math.sqrt(max_pixels / ((right - left) * (top - bottom))))
+        image = Image.new("RGB", (round((right - left) * scale), round((top - bottom) * scale)), BLACK)
+        draw = ImageDraw.Draw(image)
+
+        def point(x, y):
+            return (x - left) * scale, (top - y) * scale
+
+        stampers = {}
+
+        def stamper(text_height):
+            size = max(1, round(text_height * scale))
+            if size not in stampers:
+                stampers[size] = _GlyphStamper(size)
+            return stampers[size]
+
+        for start, end, color, line_width in self.lines:
+            draw.line([point(*start), point(*end)], fill=color, width=max(1, round(line_width * scale)))
+        for center, radius, color in self.circles:
+            x, y = point(*center)
+            draw.ellipse([x - radius * scale, y - radius * scale, x + radius * scale, y + radius * scale], fill=color)
+        for center, box_width, box_height, color in self.rectangles:
+            x, y = point(*center)
+            draw.rectangle(
+                [x - box_width * scale / 2, y - box_height * scale / 2,
+                 x + box_width * scale / 2, y + box_height * scale / 2],
+                outline=color, width=max(1, round(0.04 * scale))
+            )
+        for center, text, text_height, color in self.texts:
+            stamper(text_height).stamp(image, point(*center), text, color)
+
+        # Mostly flat black, so the fastest zlib level costs little in size
+        image.save(path, "PNG", compress_level=1)
+
+
+class _GlyphStamper:
+    """Draws centred text by pasting glyphs rendered once per character.
+
+    FreeType layout costs about as much per label as the whole rest of the
+    image, and the labels share a handful of characters. Kerning is lost,
+    which the default sans font hardly uses.
+    """
+
+    def __init__(self, size):
+        from PIL import ImageFont
+        try:
+            self.font = ImageFont.load_default(size=size)
+        except TypeError:
+            # Pillow before 10.1 only has the fixed size bitmap font
+            self.font = ImageFont.load_default()
+        ascent, descent = self.font.getmetrics()
+        self.height = ascent + descent
+        self.glyphs = {}
+
+    def glyph(self, character):
+        if character not in self.glyphs:
+            from PIL import Image, ImageDraw
+            advance = self.font.getlength(character)
+            width = max(1, int(self.font.getbbox(character)[2]), int(advance + 1))
+            mask = Image.new("L", (width, self.height))
+            ImageDraw.Draw(mask).text((0, 0), character, fill=255, font=self.font)
+            self.glyphs[character] = (mask, advance)
+        return self.glyphs[character]
+
+    def stamp(self, image, center, text, color):
+        glyphs = [self.glyph(character) for character in text]
+        x = center[0] - sum(advance for _, advance in glyphs) / 2
+        y = round(center[1] - self.height / 2)
+        for mask, advance in glyphs:
+            image.paste(color, (round(x), y), mask)
+            x += advance
+
+
+def text_width(text, height):
+    return len(text) * height * CHARACTER_WIDTH
+
+
+def huffman_drawing(job):
+    """Draws the final Huffman frame: the tree with every codeword under its symbol."""
+    huffTree = HuffTree(list(job.symbols), list(job.output_symbols), list(job.probabilities), job.max_length)
+    edges = []
+    while True:
+        newEdges, newNode = huffTree.codificateStep()
+        edges += newEdges
+        if len(huffTree.tree) == 1:
+            break
+        huffTree.jumpSubTrees()
+
+    store = huffTree.nodes
+    positions = {
+        name: (x, y)
+        for name, x, y in zip(store.names, store.x[store.slots].tolist(), store.y[store.slots].tolist())
+    }
+
+    drawing = Drawing()
+    for parent, child in edges:
+        drawing.line(positions[parent], positions[child])
+    for name, center in positions.items():
+        drawing.circle(center, 0.3)
+        drawing.text(center, str(name), 0.3, BLACK)
+
+    codification = huffTree.codification
+    for symbol, (x, y, _) in huffTree.symbolPositions.items():
+        drawing.text((x, y - 0.5), codification[symbol], 0.3)
+    return drawing
+
+
+def shannon_fano_drawing(job):
+    """Draws the final Shannon-Fano frame: the boxes, labelled edges and codes."""
+    symbols = list(job.symbols)
+    steps = list(shannon_fano_steps(symbols, list(job.probabilities)))
+    drawing = Drawing()
+    text_height = 0.25
+    box_height = 2 * text_height + 0.3
+
+    def node_lines(node_symbols, probability):
+        return ["{" + ",".join(node_symbols) + "}", f"{probability:.2f}"]
+
+    lines = {"": node_lines(symbols, sum(job.probabilities))}
+    code_labels = {}
+    for step in steps:
+        if isinstance(step, Leaf):
+            code_labels[step.code] = f"{symbols[step.index]}: {step.code}"
+            continue
+        lines[step.code + "0"] = node_lines(symbols[step.start:step.middle], step.left_probability)
+        lines[step.code + "1"] = node_lines(symbols[step.middle:step.end], step.right_probability)
+
+    # Same tidy layout as ShannonFanoTree, with estimated text widths
+    codes, children = split_tree(steps)
+    box_widths = {code: max(text_width(line, text_height) for line in lines[code]) + 0.2 for code in codes}
+    widths = [box_widths[code] for code in codes]
+    for index, code in enumerate(codes):
+        if code in code_labels:
+            widths[index] = max(widths[index], text_width(code_labels[code], text_height))
+    xs, depths = tidy_layout(children, widths, 0.5)
+    centers = {code: (x, 3.0 - 1.5 * depth) for code, x, depth in zip(codes, xs, depths)}
+
+    for code in codes:
+        x, y = centers[code]
+        drawing.rectangle((x, y), box_widths[code], box_height)
+        drawing.text((x, y + (text_height + 0.1) / 2), lines[code][0], text_height)
+        drawing.text((x, y - (text_height + 0.1) / 2), lines[code][1], text_height)
+        if code in code_labels:
+            drawing.text((x, y - box_height / 2 - 0.2 - text_height / 2), code_labels[code], text_height)
+
+    for step in steps:
+        if isinstance(step, Leaf):
+            continue
+        x, y = centers[step.code]
+        bottom = (x, y - box_height / 2)
+        for digit, color, side in (("0", BLUE, -0.2), ("1", RED, 0.2)):
+            child_x, child_y = centers[step.code + digit]
+            top = (child_x, child_y + box_height / 2)
+            drawing.line(bottom, top, color)
+            drawing.text(((bottom[0] + top[0]) / 2 + side, (bottom[1] + top[1]) / 2), digit, text_height)
+    return drawing
+
+
+def adaptive_drawing(job):
+    """Draws the final adaptive Huffman frame: the tree after the animated prefix of the stream."""
+    tree = AdaptiveHuffman()
+    for symbol in job.symbols[:ADAPTIVE_PREFIX]:
+        tree.update(symbol)
+
+    # Same layout as AdaptiveHuffmanTree
+    children = [list(pair or ()) for pair in tree.children]
+    xs, depths = tidy_layout(children, None, 0.4)
+    centers = [(x, 3.0 - 1.2 * depth) for x, depth in zip(xs, depths)]
+    radius, text_height = 0.3, 0.25
+
+    drawing = Drawing()
+    for node, pair in enumerate(children):
+        x, y = centers[node]
+        for child, color in zip(pair, (BLUE, RED)):
+            child_x, child_y = centers[child]
+            drawing.line((x, y - radius), (child_x, child_y + radius), color)
+    for node, (x, y) in enumerate(centers):
+        drawing.circle((x, y), radius)
+        drawing.text((x, y), str(tree.weights[node]), text_height, BLACK)
+        if node == tree.nyt:
+            drawing.text((x, y - radius - 0.3), "NYT", text_height)
+        elif tree.symbols[node] is not None:
+            drawing.text((x, y - radius - 0.3), symbol_label(tree.symbols[node]), text_height)
+    return drawing
+
+
+def static_drawing(job):
+    if job.algorithm == SHANNON_FANO:
+        return shannon_fano_drawing(job)
+    if job.algorithm == ADAPTIVE_HUFFMAN:
+        return adaptive_drawing(job)
+    return huffman_drawing(job)
+
+
+def export_static(job, path, scale=60, max_pixels=PNG_MAX_PIXELS):
+    """Writes the finished tree of job to path, as a PNG if it ends in .png and an SVG otherwise.
+
+    Raises ValueError for a job that cannot be coded and OSError if the
+    file cannot be written.
+    """
+    drawing = static_drawing(job)
+    if path.lower().endswith(".png"):
+        drawing.png(path, scale, max_pixels)
+    else:
+        with open(path, "w", encoding="utf-8") as image:
+            image.write(drawing.svg(scale))
+    return path
+
+
+def main(argv=None):
+    from .batch import load_manifest
+
+    parser = argparse.ArgumentParser(description="Export the finished coding trees of a manifest as images.")
+    parser.add_argument("manifest", help="JSON or CSV file describing the jobs")
+    parser.add_argument("--output-dir", default="images", help="where the images are written")
+    parser.add_argument("--format", default="svg", choices=("svg", "png"))
+    parser.add_argument("--scale", type=float, default=60, help="pixels per scene unit")
+    parser.add_argument(
+        "--max-pixels", type=int, default=PNG_MAX_PIXELS, help="largest PNG, drawn at a smaller scale if needed"
+    )
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for name, job in load_manifest(args.manifest):
+        path = export_static(
+            job, os.path.join(args.output_dir, f"{name}.{args.format}"), args.scale, args.max_pixels
+        )
+        print(path, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Scene hooks shared by the animations."""
+from collections import namedtuple
+from contextlib import nullcontext
+
+from .profiling import ANIMATION, STEP, SceneProfiler, profile_path
+
+# A step signature split into what stays drawn after the step and what the
+# step only shows while it runs, such as numbers faded out before it ends
+Signature = namedtuple("Signature", "lasting passing")
+
+
+class TimelineMixin:
+    """Counts the play calls of a scene and reports them as progress.
+
+    Scenes using it define two methods computed from the coding core,
+    without rendering anything:
+
+        timeline_steps() returns the play calls construct makes for each
+        of its steps (a Huffman merge, a Shannon-Fano split), in order.
+        Progress can then be shown as a fraction before the render ends
+        and long renders can be cut between steps.
+
+        timeline_signatures() returns data for each step that, with the
+        earlier steps, fixes what it shows, so steps whose signature and
+        earlier steps are unchanged can be reused from an earlier render.
+        A step's data is a Signature when part of what it shows is gone by
+        the end of the step, so that part does not change later keys.
+
+    manim's wait goes through play, so waits count as animations too. Waits
+    are scaled by wait_scale, which previews use to shorten the pauses.
+
+    When HUFFMAN_PROFILE is set, the scene keeps a SceneProfiler that
+    construct feeds through profile(), times every play and writes the
+    trace once the render ends; see rendering.profiling.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.progress_callback = None
+        self.plays_done = 0
+        self.plays_total = None
+        self.wait_scale = 1.0
+        self.profile_path = profile_path(type(self).__name__)
+        self.profiler = SceneProfiler() if self.profile_path else None
+
+    def expected_plays(self):
+        """Returns how many play calls construct will make."""
+        return sum(self.timeline_steps())
+
+    def profile(self, name, category=STEP, **args):
+        """Times the block it wraps as a phase of the trace, when profiling."""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.phase(name, category, **args)
+
+    def render(self, *args, **kwargs):
+        if self.profiler is None:
+            return super().render(*args, **kwargs)
+
+        self.profiler.instrument(self)
+        try:
+            with self.profiler.phase("render", type(self).__name__):
+                return super().render(*args, **kwargs)
+        finally:
+            if self.profile_path:
+                self.profiler.write(self.profile_path)
+
+    def wait(self, duration=1.0, *args, **kwargs):
+        super().wait(duration * self.wait_scale, *args, **kwargs)
+
+    def play(self, *args, **kwargs):
+        with self.profile("play", ANIMATION, index=self.plays_done):
+            super().play(*args, **kwargs)
+        self.plays_done += 1
+        if self.profiler is not None:
+            mobjects = sum(len(mobject.get_family()) for mobject in self.mobjects)
+            self.profiler.counters("scene", plays=self.plays_done, mobjects=mobjects)
+        if self.progress_callback is not None:
+            if self.plays_total is None:
+                self.plays_total = self.expected_plays()
+            self.progress_callback(self.plays_done, self.plays_total)
@@ -0,0 +1,221 @@
+"""Render jobs run in worker processes."""
+import multiprocessing
+import os
+import shutil
+import tempfile
+from collections import deque
+
+from .cache import DEFAULT_CACHE_DIR, RenderCache
+from .incremental import render_incremental
+from .jobs import clear_media_videos, use_private_media_dir
+
+PROGRESS = "progress"
+FINISHED = "finished"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+def _run(job_id, job, cache_dir, media_dir, events):
+    """Worker process body: renders one job and reports back through events."""
+    use_private_media_dir(media_dir)
+    _render(job_id, job, cache_dir, events)
+
+
+def _render(job_id, job, cache_dir, events):
+    """Renders one job, reporting its progress and result through events."""
+    def progress(done, total):
+        events.put((PROGRESS, job_id, done, total))
+
+    try:
+        path = render_incremental(job, RenderCache(cache_dir), progress)
+    except Exception as error:
+        events.put((FAILED, job_id, f"{type(error).__name__}: {error}"))
+    else:
+        events.put((FINISHED, job_id, path))
+    finally:
+        clear_media_videos()
+
+
+def _serve(cache_dir, media_dir, tasks, events):
+    """Warm worker process body: renders the jobs sent through tasks one after another."""
+    use_private_media_dir(media_dir)
+
+    # Pay for manim, the scenes and the font setup before the first job
+    import adaptive_visualization  # noqa: F401
+    import huffman_visualization  # noqa: F401
+    import shannon_visualization  # noqa: F401
+    from .labels import labels
+    labels.text("0")
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        job_id, job = task
+        _render(job_id, job, cache_dir, events)
+
+
+class RenderWorkers:
+    """Queue of render jobs, each run in its own process, a few at a time.
+
+    Nothing here blocks: the owner calls poll() regularly (from a Qt timer,
+    for instance) to start queued jobs and collect their events, which are
+    tuples starting with the event kind and the job id:
+
+        (PROGRESS, job_id, done, total)
+        (FINISHED, job_id, path)
+        (FAILED, job_id, message)
+        (CANCELLED, job_id)
+
+    Processes are spawned rather than forked, which is the only safe choice
+    from a Qt application and the only one on Windows. Every job reports
+    through its own queue, so terminating one cannot corrupt another's.
+    Every worker has a media directory made and removed here, the last
+    item of its tuple.
+    """
+
+    def __init__(self, max_workers=None, cache_dir=DEFAULT_CACHE_DIR):
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) // 2)
+        self.cache_dir = cache_dir
+        self.context = multiprocessing.get_context("spawn")
+        self.pending = deque()
+        self.running = {}
+        self.events = []
+        self.next_id = 0
+
+    def submit(self, job):
+        """Queues job and returns its id."""
+        job_id = self.next_id
+        self.next_id += 1
+        self.pending.append((job_id, job))
+        return job_id
+
+    def cancel(self, job_id):
+        """Drops a queued job or stops a running one; returns False if it already ended."""
+        for entry in self.pending:
+            if entry[0] == job_id:
+                self.pending.remove(entry)
+                self.events.append((CANCELLED, job_id))
+                return True
+
+        worker = self.running.pop(job_id, None)
+        if worker is None:
+            return False
+        self._stop(worker)
+        self.events.append((CANCELLED, job_id))
+        return True
+
+    def poll(self):
+        """Starts queued jobs on free workers and returns the events since the last call."""
+        events, self.events = self.events, []
+
+        for job_id, worker in list(self.running.items()):
+            process, queue = worker[:2]
+            # Checked first so that whatever a dead worker sent is drained below
+            alive = process.is_alive()
+            ended = False
+            while not queue.empty():
+                event = queue.get()
+                ended = ended or event[0] in (FINISHED, FAILED)
+                events.append(event)
+
+            if ended or not alive:
+                del self.running[job_id]
+                self._release(worker)
+                # A worker that died without reporting still has to end its job
+                if not ended:
+                    events.append((FAILED, job_id, f"Render process exited with code {process.exitcode}"))
+
+        while self.pending and len(self.running) < self.max_workers:
+            job_id, job = self.pending.popleft()
+            self.running[job_id] = self._launch(job_id, job)
+
+        return events
+
+    def _launch(self, job_id, job):
+        """Starts job and returns its worker, a tuple starting with the process and its event queue."""
+        queue = self.context.Queue()
+        media_dir = tempfile.mkdtemp(prefix="huffman-media-")
+        process = self.context.Process(
+            target=_run, args=(job_id, job, self.cache_dir, media_dir, queue), daemon=True
+        )
+        process.start()
+        return process, queue, media_dir
+
+    def _release(self, worker):
+        """Cleans up after a worker whose job has ended, whether its process is alive or not."""
+        process, queue = worker[:2]
+        process.join()
+        queue.close()
+        shutil.rmtree(worker[-1], ignore_errors=True)
+
+    def _stop(self, worker):
+        """Terminates a worker in the middle of its job."""
+        process, queue = worker[:2]
+        process.terminate()
+        process.join()
+        queue.close()
+        shutil.rmtree(worker[-1], ignore_errors=True)
+
+    def busy(self):
+        return bool(self.pending or self.running)
+
+    def shutdown(self):
+        """Cancels every queued and running job."""
+        for job_id, job in list(self.pending):
+            self.cancel(job_id)
+        for job_id in list(self.running):
+            self.cancel(job_id)
+
+
+class WarmRenderWorkers(RenderWorkers):
+    """RenderWorkers whose processes stay up from one job to the next.
+
+    Every worker imports manim and the scenes and sets up the fonts once,
+    when it starts, then renders the jobs it is handed one after another;
+    tempconfig keeps each job's settings to itself. Cancelling a running
+    job still terminates its process, and a fresh one starts warming up in
+    its place.
+    """
+
+    def __init__(self, max_workers=None, cache_dir=DEFAULT_CACHE_DIR):
+        super().__init__(max_workers, cache_dir)
+        self.closed = False
+        self.idle = [self._start_worker() for _ in range(self.max_workers)]
+
+    def _start_worker(self):
+        queue = self.context.Queue()
+        tasks = self.context.Queue()
+        media_dir = tempfile.mkdtemp(prefix="huffman-media-")
+        process = self.context.Process(
+            target=_serve, args=(self.cache_dir, media_dir, tasks, queue), daemon=True
+        )
+        process.start()
+        return process, queue, tasks, media_dir
+
+    def _launch(self, job_id, job):
+        worker = self.idle.pop()
+        worker[2].put((job_id, job))
+        return worker
+
+    def _release(self, worker):
+        if worker[0].is_alive():
+            self.idle.append(worker)
+        else:
+            super()._release(worker)
+            worker[2].close()
+            self.idle.append(self._start_worker())
+
+    def _stop(self, worker):
+        super()._stop(worker)
+        worker[2].close()
+        if not self.closed:
+            self.idle.append(self._start_worker())
+
+    def shutdown(self):
+        """Cancels every queued and running job and stops the idle workers."""
+        self.closed = True
+        super().shutdown()
+        idle, self.idle = self.idle, []
+        for worker in idle:
+            self._stop(worker)
@@ -0,0 +1,344 @@
+from manim import (
+    MovingCameraScene, VGroup, UP, DOWN, LEFT, RIGHT, ORIGIN, Text, Rectangle, Line,
+    WHITE, BLUE, RED, GREEN, Create, Write, ReplacementTransform
+)
+
+from coding_core import Leaf, find_split_point, shannon_fano_steps, split_tree, tidy_layout
+from rendering.camera import framing
+from rendering.detail import MIN_SUBTREE_PIXELS, narrow_subtrees, pixels_per_unit, summary_glyph
+from rendering.labels import labels
+from rendering.profiling import ALGORITHM, MOBJECTS
+from rendering.timeline import TimelineMixin
+
+
+class ShannonFanoTree(TimelineMixin, MovingCameraScene):
+    """Class to create and animate a Shannon-Fano tree using Manim."""
+
+    def __init__(self, symbols, probabilities, detail=True):
+        super().__init__()
+        self.symbols = symbols
+        self.probabilities = probabilities
+        self.waiting_time = 0.3
+        self.vertical_spacing = 1.5
+        self.horizontal_gap = 0.5
+        # Finished subtrees narrower than this many pixels are drawn as one glyph, None draws everything
+        self.detail_threshold = MIN_SUBTREE_PIXELS if detail else None
+        self.codes = {}
+        self.edges_map = {}
+        self.code_texts = {}
+        self.glyphs = {}
+
+    def construct(self):
+        """Constructs the Manim scene by building and animating the Shannon-Fano tree."""
+        self.tree_group = VGroup()
+        with self.profile("shannon_fano_steps", ALGORITHM):
+            steps = list(shannon_fano_steps(self.symbols, self.probabilities))
+        with self.profile("layout", MOBJECTS):
+            nodes = self._layout_nodes(steps)
+            self.nodes = nodes
+            self._measure_subtrees(steps)
+        self.splits_done = 0
+
+        # The camera follows the tree as it grows instead of the tree shrinking
+        root_node = nodes[""]
+        self.bounds = self._node_bounds(root_node)
+        width, center = framing(self.bounds)
+        self.frame_width = width
+        self.camera.frame.scale_to_fit_width(width).move_to(center)
+
+        self.play(Create(root_node, run_time=2))
+        self.wait(self.waiting_time)
+
+        self._build_tree(steps, nodes)
+        self._show_final_codes()
+
+    def timeline_steps(self):
+        """Counts the play calls construct makes for the root, every split and every code."""
+        steps = [2]
+        codes = {}
+        for step in shannon_fano_steps(self.symbols, self.probabilities):
+            if isinstance(step, Leaf):
+                codes[self.symbols[step.index]] = step.code
+                continue
+
+            # Node creation and both labels
+            steps.append(6)
+
+        # Path highlight, code text and colour restore for every symbol
+        for code in codes.values():
+            steps.append(3 * len(code) + 3)
+        return steps
+
+    def timeline_signatures(self):
+        """Describes what every step draws, so unchanged steps can be found between renders."""
+        steps = list(shannon_fano_steps(self.symbols, self.probabilities))
+
+        # Positions depend on the whole tree, so they are part of every step
+        self.tree_group = VGroup()
+        nodes = self._layout_nodes(steps)
+        signatures = [[
+            self.detail_threshold,
+            self._format_node_text(self.symbols, sum(self.probabilities)), nodes[""].get_center()
+        ]]
+        codes = {}
+        for step in steps:
+            if isinstance(step, Leaf):
+                codes[self.symbols[step.index]] = step.code
+                continue
+
+            signatures.append([
+                step.code,
+                self._format_node_text(self.symbols[step.start:step.middle], step.left_probability),
+                self._format_node_text(self.symbols[step.middle:step.end], step.right_probability),
+                nodes[step.code + "0"].get_center(), nodes[step.code + "1"].get_center(),
+            ])
+
+        signatures.extend([symbol, code] for symbol, code in codes.items())
+        return signatures
+
+    def _layout_nodes(self, steps):
+        """Creates every node up front and places it with the tidy tree layout."""
+        codes, children = split_tree(steps)
+        texts = {"": self._format_node_text(self.symbols, sum(self.probabilities))}
+        code_labels = {}
+        for step in steps:
+            if isinstance(step, Leaf):
+                code_labels[step.code] = f"{self.symbols[step.index]}: {step.code}"
+                continue
+            texts[step.code + "0"] = self._format_node_text(
+                self.symbols[step.start:step.middle], step.left_probability
+            )
+            texts[step.code + "1"] = self._format_node_text(
+                self.symbols[step.middle:step.end], step.right_probability
+            )
+
+        nodes = {code: self._create_node(texts[code], ORIGIN) for code in codes}
+
+        # Leaves also leave room for the code written under them
+        widths = []
+        for code in codes:
+            width = nodes[code].width
+            if code in code_labels:
+                width = max(width, labels.text(code_labels[code], font_size=24).width)
+            widths.append(width)
+
+        xs, depths = tidy_layout(children, widths, self.horizontal_gap)
+        for code, x, depth in zip(codes, xs, depths):
+            nodes[code].move_to(UP * (3 - self.vertical_spacing * depth) + RIGHT * x)
+        return nodes
+
+    def _node_bounds(self, node):
+        """Returns the (left, bottom, right, top) of a node."""
+        return node.get_left()[0], node.get_bottom()[1], node.get_right()[0], node.get_top()[1]
+
+    def _measure_subtrees(self, steps):
+        """Records the extent of every subtree and the index of the last split inside it."""
+        self.split_index = {}
+        for index, step in enumerate(step for step in steps if not isinstance(step, Leaf)):
+            self.split_index[step.code] = index
+        self.last_split = dict(self.split_index)
+
+        # Children come after their parents in the layout order
+        self.extents = {}
+        for code in reversed(list(self.nodes)):
+            left, bottom, right, _ = self._node_bounds(self.nodes[code])
+            bottom -= 0.5
+            for child in self._children(code):
+                child_left, child_bottom, child_right = self.extents[child]
+                left, bottom, right = min(left, child_left), min(bottom, child_bottom), max(right, child_right)
+                self.last_split[code] = max(self.last_split[code], self.last_split.get(child, -1))
+            self.extents[code] = (left, bottom, right)
+
+    def _children(self, code):
+        """Returns the codes of the children of a node."""
+        return [code + "0", code + "1"] if code in self.last_split else []
+
+    def _shown_children(self, code):
+        """Returns the codes of the children of a node once its split has been animated."""
+        if self.split_index.get(code, self.splits_done) < self.splits_done:
+            return self._children(code)
+        return []
+
+    def _build_tree(self, steps, nodes):
+        """Animates the Shannon-Fano tree from the core split steps."""
+        for step in steps:
+            if isinstance(step, Leaf):
+                self.codes[self.symbols[step.index]] = step.code
+            else:
+                with self.profile("split", code=step.code):
+                    self._animate_split(step, nodes)
+
+    def _animate_split(self, split, nodes):
+        """Animates one split, adding both children below their parent node."""
+        current_code = split.code
+        parent_node = nodes[current_code]
+        left_node = nodes[current_code + "0"]
+        right_node = nodes[current_code + "1"]
+
+        left_edge = Line(parent_node.get_bottom(), left_node.get_top(), color=BLUE)
+        right_edge = Line(parent_node.get_bottom(), right_node.get_top(), color=RED)
+
+        self._animate_node_creation(left_edge, right_edge, left_node, right_node)
+
+        left_label = self._create_label("0", left_edge, LEFT)
+        right_label = self._create_label("1", right_edge, RIGHT)
+
+        self._update_edges_map(current_code, left_label, right_label, left_edge, right_edge)
+
+        self.splits_done += 1
+        with self.profile("collapse_small_subtrees", MOBJECTS):
+            self._collapse_small_subtrees()
+
+    def _create_node(self, text, position):
+        """Creates a node in the tree with the given text at the specified position."""
+        symbol_set, prob = text.split('\n')
+        symbol_text = labels.text(symbol_set, font_size=24)
+        prob_text = labels.text(prob, font_size=24)
+
+        text_group = VGroup(symbol_text, prob_text).arrange(DOWN, buff=0.1)
+        rectangle = Rectangle(
+            width=text_group.width + 0.2,
+            height=text_group.height + 0.2,
+            color=WHITE
+        ).move_to(text_group)
+
+        node = VGroup(rectangle, text_group).move_to(position)
+        self.tree_group.add(node)
+        return node
+
+    def _find_split_point(self, probabilities):
+        """Finds the split point to partition the symbols for the Shannon-Fano algorithm."""
+        return find_split_point(probabilities)
+
+    def _animate_node_creation(self, left_edge, right_edge, left_node, right_node):
+        """Animates the creation of nodes and edges in the tree, fitting the camera to them."""
+        self.tree_group.add(left_edge, right_edge)
+        for node in (left_node, right_node):
+            left, bottom, right, top = self._node_bounds(node)
+            self.bounds = (
+                min(self.bounds[0], left), min(self.bounds[1], bottom),
+                max(self.bounds[2], right), max(self.bounds[3], top)
+            )
+        width, center = framing(self.bounds)
+        self.frame_width = width
+
+        self.play(
+            Create(left_edge, run_time=1.5),
+            Create(right_edge, run_time=1.5),
+            Create(left_node, run_time=1.5),
+            Create(right_node, run_time=1.5),
+            self.camera.frame.animate.scale_to_fit_width(width).move_to(center)
+        )
+        self.wait(self.waiting_time)
+
+    def _create_label(self, text, edge, direction):
+        """Creates a label ('0' or '1') next to an edge."""
+        label = labels.text(text, font_size=24).next_to(edge, direction, buff=0.1)
+        self.tree_group.add(label)
+        self.play(Write(label))
+        self.wait(self.waiting_time)
+        return label
+
+    def _update_edges_map(self, current_code, left_label, right_label, left_edge, right_edge):
+        """Updates the mapping of edges and labels for path highlighting."""
+        self.edges_map[current_code + "0"] = (left_edge, left_label)
+        self.edges_map[current_code + "1"] = (right_edge, right_label)
+
+    def _collapse_small_subtrees(self):
+        """Summarises the finished subtrees that have become too narrow to read."""
+        if self.detail_threshold is None:
+            return
+
+        found = narrow_subtrees(
+            [""], self._shown_children,
+            lambda code: self.extents[code][2] - self.extents[code][0],
+            lambda code: self.last_split.get(code, self.splits_done) < self.splits_done,
+            pixels_per_unit(self.frame_width), self.detail_threshold
+        )
+        for code in found:
+            if code not in self.glyphs:
+                self._collapse(code)
+
+    def _collapse(self, code):
+        """Replaces everything below a node with one glyph, including the glyphs already there."""
+        for inner in [inner for inner in self.glyphs if inner.startswith(code)]:
+            self.remove(self.glyphs.pop(inner))
+        self.remove(*self._subtree_mobjects(code))
+
+        left, bottom, right = self.extents[code]
+        self.glyphs[code] = summary_glyph(self.nodes[code].get_bottom(), left, right, bottom)
+        self.add(self.glyphs[code])
+
+    def _expand(self, code):
+        """Draws a summarised subtree in full again."""
+        self.remove(self.glyphs.pop(code))
+        self.add(*self._subtree_mobjects(code))
+
+    def _subtree_mobjects(self, code):
+        """Returns the nodes, edges, edge labels and codes below a node."""
+        mobjects = []
+        stack = self._children(code)
+        while stack:
+            child = stack.pop()
+            mobjects.append(self.nodes[child])
+            mobjects.extend(self.edges_map[child])
+            if child in self.code_texts:
+                mobjects.append(self.code_texts[child])
+            stack.extend(self._children(child))
+        return mobjects
+
+    def _show_final_codes(self):
+        """Highlights the paths and displays the final codes for each symbol."""
+        for symbol, code in self.codes.items():
+            with self.profile("code", symbol=symbol, code=code):
+                self._highlight_path(symbol, code)
+
+    def _highlight_path(self, symbol, code):
+        """Highlights the path corresponding to the code of a symbol."""
+        # A summarised subtree on the path is drawn in full while the path is shown
+        collapsed = next((code[:i] for i in range(len(code)) if code[:i] in self.glyphs), None)
+        if collapsed is not None:
+            self._expand(collapsed)
+
+        original_colors = []
+        for i, bit in enumerate(code):
+            edge, label = self.edges_map[code[:i + 1]]
+            original_colors.append((edge.get_color(), label.get_color()))
+            self.play(edge.animate.set_color(GREEN), label.animate.set_color(GREEN))
+
+        self._show_code(symbol, code)
+
+        for i, (edge, label) in enumerate([self.edges_map[code[:i + 1]] for i in range(len(code))]):
+            original_edge_color, original_label_color = original_colors[i]
+            self.play(edge.animate.set_color(original_edge_color), run_time=0.3)
+            new_label = labels.text(label.text, font_size=24).move_to(label.get_center())
+            self.play(ReplacementTransform(label, new_label), run_time=0.3)
+            self.edges_map[code[:i + 1]] = (edge, new_label)
+
+        if collapsed is not None:
+            self._collapse(collapsed)
+
+    def _show_code(self, symbol, code):
+        """Displays the code next to the leaf node of the symbol."""
+        code_text = labels.text(f"{symbol}: {code}", font_size=24, color=GREEN)
+        leaf_node = self._find_leaf_node(symbol)
+
+        if leaf_node:
+            self.code_texts[code] = code_text
+            self.play(Write(code_text.next_to(leaf_node, DOWN, buff=0.2)))
+            self.wait(1)
+            self.play(code_text.animate.set_color(WHITE))
+
+    def _find_leaf_node(self, symbol):
+        """Finds the leaf node corresponding to the given symbol."""
+        for node in self.tree_group:
+            if isinstance(node, VGroup) and len(node) > 1:
+                text_group = node[1]
+                if len(text_group) > 0 and isinstance(text_group[0], Text):
+                    if text_group[0].text == f"{{{symbol}}}":
+                        return node
+        return None
+
+    def _format_node_text(self, symbols, probability):
+        """Formats the text to be displayed in a node."""
+        return f"{{{','.join(symbols)}}}\n{probability:.2f}"
@@ -0,0 +1,150 @@
+"""Symbol inputs shared by the GUIs: the table, and filling it from files or exporting what it draws."""
+from functools import partial
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (
+    QApplication, QComboBox, QFileDialog, QHBoxLayout, QLabel, QLineEdit, QMessageBox, QPushButton
+)
+
+from coding_core.frequencies import count_bytes, count_tokens, normalize
+from coding_core.tables import import_symbols, symbol_text
+from rendering.static import export_static
+from symbol_table import IMPORT_FILTER, SymbolTableModel, SymbolTableView
+
+# What the symbols of a file are
+COUNTS = {
+    "Bytes": count_bytes,
+    "Byte pairs": partial(count_bytes, width=2),
+    "Words": count_tokens,
+}
+DEFAULT_COUNTED_SYMBOLS = 16
+
+
+class SymbolInputsMixin:
+    """Symbol table of a GUI window, typed in, imported or counted from a file.
+
+    Windows call add_symbol_inputs() while building their layout and define
+    read_job(), which returns the RenderJob of the inputs or None after
+    warning about them; export_image saves that job's finished tree.
+    """
+
+    def add_symbol_inputs(self, layout):
+        """Adds the number of symbols, the table and the buttons that fill it to layout."""
+        # Input for number of symbols
+        hbox = QHBoxLayout()
+        hbox.addWidget(QLabel("Number of symbols:"))
+        self.num_symbols_input = QLineEdit()
+        hbox.addWidget(self.num_symbols_input)
+        layout.addLayout(hbox)
+
+        # Button to generate input fields
+        generate_btn = QPushButton("Generate Input Fields")
+        generate_btn.clicked.connect(self.generate_input_fields)
+        layout.addWidget(generate_btn)
+
+        # Table for symbol inputs, drawn from arrays so thousands of rows stay fast
+        self.symbol_model = SymbolTableModel(self)
+        self.table = SymbolTableView(self.symbol_model)
+        layout.addWidget(self.table)
+
+        # Whole tables read from CSV, JSON or frequency files instead of typed in
+        hbox = QHBoxLayout()
+        import_btn = QPushButton("Import Symbol Table")
+        import_btn.clicked.connect(self.import_table)
+        hbox.addWidget(import_btn)
+        normalize_btn = QPushButton("Normalize Probabilities")
+        normalize_btn.clicked.connect(self.normalize_probabilities)
+        hbox.addWidget(normalize_btn)
+        layout.addLayout(hbox)
+
+        # Probabilities counted from a file, however large, instead of typed in
+        hbox = QHBoxLayout()
+        hbox.addWidget(QLabel("Count:"))
+        self.count_selector = QComboBox()
+        self.count_selector.addItems(list(COUNTS))
+        hbox.addWidget(self.count_selector)
+        count_btn = QPushButton("Count Symbols In File")
+        count_btn.clicked.connect(self.count_file)
+        hbox.addWidget(count_btn)
+        layout.addLayout(hbox)
+
+    def generate_input_fields(self):
+        """Resizes the table to the number of symbols, keeping the rows already filled in."""
+        try:
+            num_symbols = int(self.num_symbols_input.text())
+        except ValueError:
+            QMessageBox.warning(self, "Invalid Input", "Please enter a valid number of symbols.")
+            return
+        self.symbol_model.resize(max(num_symbols, 0))
+
+    def import_table(self):
+        """Fills the table from a file of symbols and probabilities or counts."""
+        file_path, _ = QFileDialog.getOpenFileName(self, "Import Symbol Table", "", IMPORT_FILTER)
+        if not file_path:
+            return
+
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            symbols, probabilities = import_symbols(file_path)
+        except (OSError, ValueError, KeyError, IndexError, TypeError) as error:
+            QMessageBox.warning(self, "Cannot Import Table", str(error))
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        self.symbol_model.load(symbols, probabilities)
+        self.num_symbols_input.setText(str(len(symbols)))
+
+    def normalize_probabilities(self):
+        """Scales the probabilities in the table to sum up to 1."""
+        try:
+            self.symbol_model.normalize()
+        except ValueError as error:
+            QMessageBox.warning(self, "Invalid Input", str(error))
+
+    def count_file(self):
+        """Fills the table with the most frequent symbols of a file and their probabilities."""
+        file_path, _ = QFileDialog.getOpenFileName(self, "Count Symbols In File")
+        if not file_path:
+            return
+
+        # The other symbols are counted together in the last row
+        try:
+            limit = int(self.num_symbols_input.text() or DEFAULT_COUNTED_SYMBOLS)
+        except ValueError:
+            QMessageBox.warning(self, "Invalid Input", "Please enter a valid number of symbols.")
+            return
+
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            counts = COUNTS[self.count_selector.currentText()](file_path)
+            symbols, probabilities = normalize(counts, limit)
+        except (OSError, ValueError) as error:
+            QMessageBox.warning(self, "Cannot Count File", str(error))
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        # Line breaks and other control bytes are shown escaped
+        self.symbol_model.load([symbol_text(symbol) for symbol in symbols], probabilities)
+        self.num_symbols_input.setText(str(len(symbols)))
+
+    def export_image(self):
+        """Saves the finished tree and its codes as an SVG or PNG image."""
+        job = self.read_job()
+        if job is None:
+            return
+
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Image", "tree.svg", "SVG Image (*.svg);;PNG Image (*.png)"
+        )
+        if not file_path:
+            return
+
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            export_static(job, file_path)
+        except (OSError, ValueError) as error:
+            QMessageBox.warning(self, "Cannot Export Image", str(error))
+        finally:
+            QApplication.restoreOverrideCursor()
@@ -0,0 +1,110 @@
+"""Symbol table of the GUIs, backed by NumPy arrays so alphabets of any size stay responsive."""
+import numpy as np
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PySide6.QtWidgets import QHeaderView, QTableView
+
+from coding_core.tables import check_rows, normalized, parse_weight
+
+SYMBOL = 0
+PROBABILITY = 1
+HEADERS = ("Symbol", "Probability")
+
+# Files import_symbols reads, for file dialogs
+IMPORT_FILTER = "Symbol tables (*.csv *.tsv *.json *.txt);;All files (*)"
+
+
+class SymbolTableModel(QAbstractTableModel):
+    """Symbols and probabilities held as two arrays and edited through a table view.
+
+    Views only ask for the cells on screen, so loading or normalizing a
+    table costs array operations rather than one item per cell. Empty
+    probability cells are NaN.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.symbols = np.empty(0, dtype=object)
+        self.probabilities = np.empty(0)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.symbols)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return str(section + 1)
+
+    def flags(self, index):
+        return super().flags(index) | Qt.ItemIsEditable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        if index.column() == SYMBOL:
+            return self.symbols[index.row()]
+        probability = self.probabilities[index.row()]
+        return "" if np.isnan(probability) else repr(float(probability))
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        if index.column() == SYMBOL:
+            self.symbols[index.row()] = str(value).strip()
+        else:
+            text = str(value).strip()
+            probability = parse_weight(text) if text else np.nan
+            if probability is None:
+                return False
+            self.probabilities[index.row()] = probability
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+
+    def load(self, symbols, probabilities):
+        """Replaces every row at once."""
+        self.beginResetModel()
+        self.symbols = np.array(symbols, dtype=object).reshape(-1)
+        self.probabilities = np.asarray(probabilities, dtype=np.float64).reshape(-1).copy()
+        self.endResetModel()
+
+    def resize(self, count):
+        """Keeps the first count rows, adding empty ones if there are fewer."""
+        kept = min(count, len(self.symbols))
+        symbols = np.full(count, "", dtype=object)
+        probabilities = np.full(count, np.nan)
+        symbols[:kept] = self.symbols[:kept]
+        probabilities[:kept] = self.probabilities[:kept]
+        self.load(symbols, probabilities)
+
+    def normalize(self):
+        """Scales the probabilities to sum up to 1; raises ValueError if a row is incomplete or invalid."""
+        self.probabilities = normalized(self.symbols, self.probabilities)
+        if len(self.symbols):
+            self.dataChanged.emit(
+                self.index(0, PROBABILITY), self.index(len(self.symbols) - 1, PROBABILITY), [Qt.DisplayRole]
+            )
+
+    def rows(self):
+        """Returns (symbols, probabilities) as lists; raises ValueError if the table is not a distribution."""
+        if not len(self.symbols):
+            raise ValueError("Please enter at least one symbol.")
+        check_rows(self.symbols, self.probabilities)
+        if not np.isclose(self.probabilities.sum(), 1.0):
+            raise ValueError("Probabilities must sum up to 1.")
+        return self.symbols.tolist(), self.probabilities.tolist()
+
+
+class SymbolTableView(QTableView):
+    """Table view for a SymbolTableModel, with fixed row heights so scrolling never measures rows."""
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        rows = self.verticalHeader()
+        rows.setSectionResizeMode(QHeaderView.Fixed)
+        rows.setDefaultSectionSize(self.fontMetrics().height() + 8)
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
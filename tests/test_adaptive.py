@@ -0,0 +1,101 @@
+import heapq
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from coding_core import AdaptiveEncoder, AdaptiveHuffman, adaptive_decode, adaptive_encode
+
+STREAMS = [
+    b"",
+    b"a",
+    b"aaaaaaaaaa",
+    b"abracadabra",
+    b"The quick brown fox jumps over the lazy dog. " * 20,
+    bytes(range(256)) + bytes(range(255, -1, -1)),
+    np.random.default_rng(0).choice(256, size=20000, p=np.full(256, 1 / 256)).astype(np.uint8).tobytes(),
+    np.random.default_rng(1).geometric(0.2, size=20000).clip(0, 255).astype(np.uint8).tobytes(),
+]
+
+
+@pytest.mark.parametrize("data", STREAMS, ids=range(len(STREAMS)))
+def test_round_trip(data):
+    encoded = b"".join(adaptive_encode([data]))
+    assert adaptive_decode(encoded, len(data)) == data
+
+
+@pytest.mark.parametrize("chunk", [1, 3, 64, 1000])
+def test_chunks_encode_like_the_whole_stream(chunk):
+    data = STREAMS[4] + STREAMS[7]
+    chunks = [data[start:start + chunk] for start in range(0, len(data), chunk)]
+    assert b"".join(adaptive_encode(chunks)) == b"".join(adaptive_encode([data]))
+
+
+def test_encoder_counts_and_pads():
+    encoder = AdaptiveEncoder()
+    encoded = encoder.write(b"ab") + encoder.flush()
+    # a: 8 raw bits; b: NYT code "0" and 8 raw bits, padded to 3 bytes
+    assert encoder.count == 2
+    assert encoded == bytes([0x61, 0x31, 0x00])
+
+
+def test_truncated_data_is_rejected():
+    data = STREAMS[3]
+    encoded = b"".join(adaptive_encode([data]))
+    with pytest.raises(ValueError):
+        adaptive_decode(encoded[:-2], len(data))
+
+
+def _depth(tree, node):
+    return tree.path(node)[1]
+
+
+def _huffman_cost(weights):
+    heap = list(weights)
+    heapq.heapify(heap)
+    cost = 0
+    while len(heap) > 1:
+        merged = heapq.heappop(heap) + heapq.heappop(heap)
+        cost += merged
+        heapq.heappush(heap, merged)
+    return cost
+
+
+def _check_tree(tree, counts):
+    weights = [tree.weights[node] for node in tree.ranked]
+    # Sibling property: weights never increase down the ranks and siblings are next to each other
+    assert weights == sorted(weights, reverse=True)
+    for node, pair in enumerate(tree.children):
+        if pair is not None:
+            assert tree.weights[node] == tree.weights[pair[0]] + tree.weights[pair[1]]
+            assert abs(tree.ranks[pair[0]] - tree.ranks[pair[1]]) == 1
+    for weight, rank in tree.first.items():
+        assert weights.index(weight) == rank
+
+    assert {symbol: tree.weights[leaf] for symbol, leaf in tree.leaves.items()} == counts
+    # Cached codes were dropped whenever a swap moved them
+    for leaf in tree.leaves.values():
+        assert tree.path(leaf) == tree._walk(leaf)
+    cost = sum(count * _depth(tree, tree.leaves[symbol]) for symbol, count in counts.items())
+    assert cost == _huffman_cost(list(counts.values()) + [0])
+
+
+@pytest.mark.parametrize("data", [STREAMS[3], STREAMS[4], STREAMS[7][:3000]], ids=range(3))
+def test_tree_stays_a_huffman_tree(data):
+    tree = AdaptiveHuffman()
+    counts = Counter()
+    for symbol in data:
+        tree.update(symbol)
+        counts[symbol] += 1
+        _check_tree(tree, counts)
+
+
+def test_codes_longer_than_a_word_are_written_in_pieces():
+    encoder = AdaptiveEncoder()
+    code = (1 << 129) | 0b101
+    encoder.tree.path = lambda node: (code, 130)
+    encoded = encoder.write(b"") + encoder.write(b"x") + encoder.flush()
+    # NYT's 130 bits then the 8 bits of x, padded to whole bytes
+    bits = format(code, "b") + format(ord("x"), "08b")
+    bits += "0" * (-len(bits) % 8)
+    assert encoded == int(bits, 2).to_bytes(len(bits) // 8, "big")
@@ -0,0 +1,112 @@
+import os
+
+import pytest
+
+from rendering.cache import RenderCache
+from rendering.jobs import HUFFMAN, PREVIEW, SHANNON_FANO, RenderJob, quality_settings
+
+JOB = RenderJob(HUFFMAN, ["a", "b", "c"], [0.5, 0.25, 0.25], ["0", "1"], True)
+
+
+def _key(cache, job):
+    return cache.key(job, quality_settings(job))
+
+
+def _store(cache, key, size, mtime=None):
+    with cache.writing(key) as output_file:
+        with open(output_file, "wb") as output:
+            output.write(key[:1].encode() * size)
+    if mtime is not None:
+        os.utime(cache.path(key), (mtime, mtime))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return RenderCache(str(tmp_path / "cache"))
+
+
+def test_equal_jobs_share_a_key(cache):
+    same = RenderJob(HUFFMAN, ("a", "b", "c"), (0.5, 0.25, 0.25), ("0", "1"), 1)
+    assert _key(cache, same) == _key(cache, JOB)
+
+
+@pytest.mark.parametrize("changed", [
+    JOB._replace(probabilities=[0.4, 0.35, 0.25]),
+    JOB._replace(symbols=["a", "b", "d"]),
+    JOB._replace(output_symbols=["0", "1", "2"]),
+    JOB._replace(compact=False),
+    JOB._replace(max_length=2),
+    JOB._replace(detail=False),
+    JOB._replace(preset=PREVIEW),
+    JOB._replace(algorithm=SHANNON_FANO),
+    RenderJob(SHANNON_FANO, ["a", "b"], [0.5, 0.5], None, detail=False),
+])
+def test_what_changes_the_video_changes_the_key(cache, changed):
+    assert _key(cache, changed) != _key(cache, JOB)
+
+
+def test_shannon_fano_keys_ignore_huffman_settings(cache):
+    job = RenderJob(SHANNON_FANO, ["a", "b"], [0.5, 0.5], None)
+    assert _key(cache, job._replace(output_symbols=["0", "1"], compact=True)) == _key(cache, job)
+
+
+def test_get_misses_then_hits(cache):
+    key = _key(cache, JOB)
+    assert cache.get(key) is None
+    _store(cache, key, 10)
+    path = cache.get(key)
+    assert path == cache.path(key)
+    with open(path, "rb") as video:
+        assert len(video.read()) == 10
+
+
+def test_failed_writes_store_nothing(cache):
+    key = _key(cache, JOB)
+    with pytest.raises(RuntimeError):
+        with cache.writing(key):
+            raise RuntimeError
+    assert cache.get(key) is None
+    assert [name for name in os.listdir(cache.directory) if name.endswith(".mp4")] == []
+
+
+def test_eviction_removes_the_least_recently_used(tmp_path):
+    cache = RenderCache(str(tmp_path), max_bytes=350)
+    keys = [character * 64 for character in "abcd"]
+    for age, key in enumerate(keys[:3]):
+        _store(cache, key, 100, mtime=1000 + age)
+
+    # Reading the oldest makes it the most recently used
+    assert cache.get(keys[0]) is not None
+    _store(cache, keys[3], 100)
+    assert [cache.get(key) is not None for key in keys] == [True, False, True, True]
+
+
+def test_the_newest_video_stays_even_past_the_limit(tmp_path):
+    cache = RenderCache(str(tmp_path), max_bytes=10)
+    _store(cache, "a" * 64, 100, mtime=1000)
+    _store(cache, "b" * 64, 100)
+    assert cache.get("a" * 64) is None
+    assert cache.get("b" * 64) is not None
+
+
+def test_stale_temporary_files_are_removed(tmp_path):
+    cache = RenderCache(str(tmp_path))
+    stale = tmp_path / "tmpleftover.mp4"
+    stale.write_bytes(b"x")
+    os.utime(stale, (1000, 1000))
+    _store(cache, "a" * 64, 10)
+    assert not stale.exists()
+
+
+@pytest.mark.parametrize("link", [False, True])
+def test_export_survives_eviction(tmp_path, link):
+    cache = RenderCache(str(tmp_path / "cache"), max_bytes=150)
+    destination = str(tmp_path / "video.mp4")
+    assert not cache.export("a" * 64, destination, link)
+
+    _store(cache, "a" * 64, 100)
+    assert cache.export("a" * 64, destination, link)
+    _store(cache, "b" * 64, 100)
+    assert cache.get("a" * 64) is None
+    with open(destination, "rb") as video:
+        assert video.read() == b"a" * 100
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from coding_core import BitWriter, PrefixCodec, canonical_codes, shannon_fano_codes
+
+
+def _skewed_bytes(length, seed=0):
+    generator = np.random.default_rng(seed)
+    weights = 0.7 ** np.arange(256)
+    return generator.choice(256, size=length, p=weights / weights.sum()).astype(np.uint8).tobytes()
+
+
+def test_canonical_codes_are_prefix_free():
+    lengths = [3, 1, 3, 3, 4, 4]
+    codes = [format(code, "b").zfill(length) for code, length in zip(canonical_codes(lengths), lengths)]
+    assert [len(code) for code in codes] == lengths
+    for code in codes:
+        assert not any(other != code and other.startswith(code) for other in codes)
+
+
+@pytest.mark.parametrize("length", [0, 1, 7, 1000, 70001])
+@pytest.mark.parametrize("block_size", [1, 64, 1024])
+def test_bytes_round_trip(length, block_size):
+    data = _skewed_bytes(length)
+    codec = PrefixCodec.from_data(data or b"a", block_size)
+    packed = codec.encode(data)
+    assert packed.count == length
+    assert codec.decode_bytes(packed) == data
+
+
+def test_every_byte_value_round_trips():
+    data = bytes(range(256)) * 40 + _skewed_bytes(20000, seed=1)
+    codec = PrefixCodec.from_data(data)
+    assert codec.decode_bytes(codec.encode(data)) == data
+
+
+@pytest.mark.parametrize("max_length", [8, 12, 20])
+def test_length_limited_codes_round_trip(max_length):
+    data = _skewed_bytes(50000, seed=2)
+    codec = PrefixCodec.from_data(data, max_length=max_length)
+    assert codec.max_length <= max_length
+    assert codec.decode_bytes(codec.encode(data)) == data
+
+
+def test_codes_longer_than_the_table_round_trip():
+    # Halving probabilities give a code 40 bits deep, decoded through the search
+    lengths = list(range(1, 41)) + [40]
+    codec = PrefixCodec(range(len(lengths)), lengths)
+    generator = np.random.default_rng(3)
+    indices = np.concatenate((np.arange(len(lengths)), generator.integers(0, len(lengths), 5000)))
+    assert codec.decode_indices(codec.encode_indices(indices)).tolist() == indices.tolist()
+
+
+def test_single_symbol_round_trips():
+    codec = PrefixCodec(["x"], [0])
+    packed = codec.encode(["x"] * 10)
+    assert packed.bits == 0
+    assert codec.decode(packed) == ["x"] * 10
+
+
+def test_symbol_sequences_round_trip():
+    symbols = ["the", "a", "cat", "sat", "on", "mat"]
+    codes = shannon_fano_codes(symbols, [0.3, 0.25, 0.2, 0.1, 0.1, 0.05])
+    codec = PrefixCodec.from_codebook(codes)
+    generator = np.random.default_rng(4)
+    data = [symbols[index] for index in generator.integers(0, len(symbols), 3000)]
+    packed = codec.encode(data)
+    assert packed.bits == sum(len(codes[symbol]) for symbol in data)
+    assert codec.decode(packed) == data
+
+
+def test_packed_bits_follow_the_canonical_code():
+    codec = PrefixCodec("abc", [1, 2, 2])
+    packed = codec.encode("abcab")
+    # a = 0, b = 10, c = 11
+    assert packed.bits == 8
+    assert np.unpackbits(np.frombuffer(packed.data, dtype=np.uint8))[:8].tolist() == [0, 1, 0, 1, 1, 0, 1, 0]
+
+
+def test_unknown_symbols_are_rejected():
+    codec = PrefixCodec.from_data(b"abc")
+    with pytest.raises(ValueError):
+        codec.encode(b"abd")
+    with pytest.raises(ValueError):
+        codec.encode(["a", "z"])
+
+
+def test_invalid_lengths_are_rejected():
+    with pytest.raises(ValueError):
+        PrefixCodec("abc", [1, 1, 1])
+    with pytest.raises(ValueError):
+        PrefixCodec("ab", [1, 60])
+
+
+def test_bit_writer_packs_batches_of_codes():
+    generator = np.random.default_rng(5)
+    writer = BitWriter()
+    data, bits = b"", ""
+    for count in (0, 1, 7, 300):
+        lengths = generator.integers(1, 65, count)
+        codes = [int(generator.integers(0, 1 << 62)) % (1 << int(length)) for length in lengths]
+        data += writer.write(lengths, [code << 64 - int(length) for code, length in zip(codes, lengths)])
+        bits += "".join(format(code, "b").zfill(int(length)) for code, length in zip(codes, lengths))
+    data += writer.flush()
+    bits += "0" * (-len(bits) % 8)
+    assert data == int(bits, 2).to_bytes(len(bits) // 8, "big")
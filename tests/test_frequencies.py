@@ -0,0 +1,123 @@
+import re
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from coding_core import count_bytes, count_tokens, normalize
+from coding_core import frequencies
+
+TEXT = (
+    "the quick brown fox\njumps over the lazy dog\n\n"
+    "año pequeño  the fox\n   \tindented line\nlast line without a newline"
+)
+
+
+def _data(length, seed=0):
+    return np.random.default_rng(seed).integers(0, 6, length, dtype=np.uint8).tobytes()
+
+
+def _expected_groups(data, width):
+    groups = Counter(data[start:start + width] for start in range(0, len(data), width))
+    return {key.decode("latin-1"): count for key, count in groups.items()}
+
+
+def _expected_tokens(text, pattern=rb"\S+"):
+    return dict(Counter(token.decode() for token in re.findall(pattern, text.encode())))
+
+
+@pytest.fixture
+def write(tmp_path):
+    def write(data):
+        path = tmp_path / "input"
+        path.write_bytes(data)
+        return str(path)
+    return write
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    # Chunks of a few bytes, so every group and token crosses chunk boundaries
+    monkeypatch.setattr(frequencies, "CHUNK_BYTES", 12)
+
+
+@pytest.mark.parametrize("width", [1, 2, 3])
+@pytest.mark.parametrize("length", [1, 2, 3, 100, 1001])
+def test_bytes_in_groups(write, width, length):
+    data = _data(length)
+    assert count_bytes(write(data), width) == _expected_groups(data, width)
+
+
+@pytest.mark.parametrize("width", [1, 2, 3])
+@pytest.mark.parametrize("length", [25, 26, 37, 1001])
+def test_bytes_across_chunks(write, small_chunks, width, length):
+    data = _data(length, seed=length)
+    counts = count_bytes(write(data), width)
+    assert counts == _expected_groups(data, width)
+    assert sum(counts.values()) == -(-length // width)
+
+
+def test_bytes_in_parallel_ranges(write):
+    data = _data(1001)
+    assert count_bytes(write(data), 3, workers=3) == _expected_groups(data, 3)
+
+
+def test_bytes_need_a_width(write):
+    with pytest.raises(ValueError):
+        count_bytes(write(b"abc"), 0)
+
+
+def test_tokens(write):
+    assert count_tokens(write(TEXT.encode())) == _expected_tokens(TEXT)
+
+
+def test_tokens_across_chunks(write, small_chunks):
+    # The chunks end inside lines, and one line is longer than a chunk
+    text = TEXT + "\n" + "averyveryverylongtoken " * 3
+    assert count_tokens(write(text.encode())) == _expected_tokens(text)
+
+
+def test_tokens_in_parallel_ranges(write):
+    assert count_tokens(write(TEXT.encode()), workers=4) == _expected_tokens(TEXT)
+
+
+def test_tokens_with_a_pattern(write):
+    pattern = rb"[a-z]+"
+    assert count_tokens(write(TEXT.encode()), pattern) == _expected_tokens(TEXT, pattern)
+
+
+def test_empty_files(write):
+    path = write(b"")
+    assert count_bytes(path) == {}
+    assert count_bytes(path, 3) == {}
+    assert count_tokens(path) == {}
+
+
+def test_normalize_ranks_by_count():
+    symbols, probabilities = normalize({"b": 2, "a": 2, "c": 4})
+    assert symbols == ["c", "a", "b"]
+    assert probabilities == [0.5, 0.25, 0.25]
+
+
+@pytest.mark.parametrize("limit", [2, 3, 10, 26, 100])
+def test_normalize_with_a_limit(limit):
+    counts = {chr(ord("a") + index): index % 7 + 1 for index in range(26)}
+    symbols, probabilities = normalize(counts, limit)
+    assert len(symbols) == min(limit, 26)
+    assert sum(probabilities) == pytest.approx(1)
+    assert probabilities == sorted(probabilities, reverse=True)
+    if limit < 26:
+        kept = symbols[:]
+        kept.remove("<other>")
+        assert sorted(counts[symbol] for symbol in kept) == sorted(counts.values())[27 - limit:]
+    else:
+        assert "<other>" not in symbols
+
+
+def test_normalize_refuses_what_it_cannot_draw():
+    with pytest.raises(ValueError):
+        normalize({})
+    with pytest.raises(ValueError):
+        normalize({"a": 1, "b": 1, "c": 1}, 1)
+    with pytest.raises(ValueError):
+        normalize({"a": 1, "b": 1, "<other>": 1}, 2)
@@ -0,0 +1,178 @@
+import copy
+
+import numpy as np
+import pytest
+
+from coding_core import Codebook, HuffMergeEngine, HuffTree
+
+
+class _OriginalSubTree():
+    """The original SubTree, positions held in a dict of lists."""
+    def __init__(self, symbol, initialPosition, probability):
+        self.leader = symbol
+        self.probability = probability
+        self.positions = {symbol: initialPosition}
+        self.leftMostPosition = initialPosition[0]
+        self.rightMostPosition = initialPosition[0]
+
+    def merge(self, mergeSubTree):
+        self.probability += mergeSubTree.probability
+        self.positions = {**self.positions, **mergeSubTree.positions}
+        self.leftMostPosition = min(self.leftMostPosition, mergeSubTree.leftMostPosition)
+        self.rightMostPosition = max(self.rightMostPosition, mergeSubTree.rightMostPosition)
+
+    def move(self, movement):
+        for node in self.positions:
+            self.positions[node][0] += movement
+        self.leftMostPosition += movement
+        self.rightMostPosition += movement
+
+
+class _OriginalHuffTree():
+    """The original HuffTree, which re-sorts a dict of deep-copied subtrees after every merge."""
+    def __init__(self, inputSymbols, outputSymbols, probabilities):
+        self.inputSymbols = inputSymbols
+        self.outputSymbols = outputSymbols
+        self.codification = {symbol: "" for symbol in inputSymbols}
+        self.tree = {}
+        self.nodeCount = 1
+        self.firstStep = True
+        self.leadership = {symbol: {symbol} for symbol in inputSymbols}
+
+        nodes = sorted(dict(zip(inputSymbols, probabilities)).items(), key=lambda item: item[1])
+        symbolsNum = len(inputSymbols)
+        pos = -1 - 2 * ((symbolsNum - 1) // 2) if symbolsNum % 2 == 0 else -2 * (symbolsNum // 2)
+        for symbol, prob in nodes:
+            self.tree[symbol] = _OriginalSubTree(symbol, [pos, -5, 0], prob)
+            pos += 2
+
+    def codificateStep(self):
+        newEdges = []
+        newLeadership = set()
+        D = len(self.outputSymbols)
+        if self.firstStep:
+            self.firstStep = False
+            D = D - (len(self.inputSymbols) - 1) % (D - 1)
+
+        count = 0
+        groupSubTrees = {}
+        for leader in self.tree:
+            if count == D:
+                break
+            groupSubTrees[leader] = self.tree[leader]
+            for node in self.leadership[leader]:
+                newLeadership.add(node)
+                self.codification[node] = self.outputSymbols[count] + self.codification[node]
+            self.leadership.pop(leader)
+            count += 1
+
+        for leader in groupSubTrees:
+            self.tree.pop(leader)
+
+        subTrees = list(groupSubTrees.values())
+        level = max(subTree.positions[subTree.leader][1] for subTree in subTrees)
+        firstPosX = subTrees[0].positions[subTrees[0].leader][0]
+        lastPosX = subTrees[-1].positions[subTrees[-1].leader][0]
+        newSubTree = _OriginalSubTree(str(self.nodeCount), [(firstPosX + lastPosX) // 2, level + 2, 0], 0)
+        for subTree in subTrees:
+            newSubTree.merge(subTree)
+            newEdges.append((newSubTree.leader, subTree.leader))
+
+        self.tree = {newSubTree.leader: newSubTree, **self.tree}
+        self.leadership[newSubTree.leader] = newLeadership
+        self.nodeCount += 1
+        return newEdges, newSubTree.leader
+
+    def sortTree(self, newLeader):
+        newPositions = {}
+        oldTree = copy.deepcopy(self.tree)
+        oldTreeOrder = list(oldTree)
+        self.tree = dict(sorted(self.tree.items(), key=lambda item: item[1].probability))
+        treeOrder = list(self.tree)
+
+        newIndex = treeOrder.index(newLeader)
+        subTreeAtIndex = oldTree[oldTreeOrder[newIndex]]
+        newLeaderLeft = oldTree[newLeader].leftMostPosition
+        newLeaderRight = oldTree[newLeader].rightMostPosition
+        treeMovement = subTreeAtIndex.rightMostPosition - newLeaderRight
+        otherMovement = newLeaderLeft - newLeaderRight - 2
+
+        for leader in oldTreeOrder[0:newIndex + 1]:
+            subTree = self.tree[leader]
+            subTree.move(treeMovement if leader == newLeader else otherMovement)
+            for node in subTree.positions:
+                newPositions[node] = subTree.positions[node]
+        return newPositions
+
+
+def _forest(tree):
+    # Copied, the original moves its position lists in place
+    return [
+        (leader, {node: list(position) for node, position in subTree.positions.items()})
+        for leader, subTree in tree.items()
+    ]
+
+
+def _replay(tree):
+    """Steps of a tree as the scene drives them: merge, then sort unless one subtree is left."""
+    steps = []
+    while True:
+        newEdges, newLeader = tree.codificateStep()
+        merged = _forest(tree.tree)
+        if len(tree.tree) == 1:
+            steps.append((newEdges, newLeader, merged, None, None))
+            return steps
+        newPositions = tree.sortTree(newLeader)
+        newPositions = [(node, list(position)) for node, position in newPositions.items()]
+        steps.append((newEdges, newLeader, merged, newPositions, _forest(tree.tree)))
+
+
+def _inputs():
+    generator = np.random.default_rng(0)
+    for D in (2, 3, 4, 5):
+        for count in (2, 3, 4, 5, 6, 7, 9, 16, 31, 40):
+            # Small integers tie all the time, between leaves and merged subtrees alike
+            yield D, count, generator.integers(1, 4, count).astype(float).tolist()
+            yield D, count, generator.random(count).tolist()
+    yield 2, 8, [0.125] * 8
+    yield 3, 10, [1.0] * 10
+
+
+INPUTS = list(_inputs())
+
+
+@pytest.mark.parametrize("D, count, probabilities", INPUTS, ids=range(len(INPUTS)))
+def test_steps_match_the_original(D, count, probabilities):
+    symbols = [f"s{index}" for index in range(count)]
+    outputs = [str(digit) for digit in range(D)]
+    original = _OriginalHuffTree(symbols, outputs, probabilities)
+    tree = HuffTree(symbols, outputs, probabilities)
+
+    expected = _replay(original)
+    steps = _replay(tree)
+    assert len(steps) == len(expected) == tree.engine.mergesNum()
+    for step, old in zip(steps, expected):
+        assert step == old
+    assert dict(tree.codification.items()) == original.codification
+
+
+@pytest.mark.parametrize("D, count, probabilities", INPUTS, ids=range(len(INPUTS)))
+def test_build_gives_the_same_layout(D, count, probabilities):
+    symbols = [f"s{index}" for index in range(count)]
+    outputs = [str(digit) for digit in range(D)]
+    stepped = HuffTree(symbols, outputs, probabilities)
+    _replay(stepped)
+    built = HuffTree(symbols, outputs, probabilities)
+    built.build()
+    assert _forest(built.tree) == _forest(stepped.tree)
+    assert built.symbolPositions == stepped.symbolPositions
+
+
+def test_codebook_reads_like_a_dict():
+    engine = HuffMergeEngine(["a", "b", "c", "d"], [0.4, 0.3, 0.2, 0.1], 2)
+    for _ in engine:
+        pass
+    codebook = Codebook(["a", "b", "c", "d"], ["x", "y"], engine)
+    assert dict(codebook.items()) == {"a": "x", "b": "yx", "c": "yyy", "d": "yyx"}
+    assert list(codebook) == ["a", "b", "c", "d"]
+    assert "a" in codebook and "e" not in codebook
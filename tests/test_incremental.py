@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+
+import pytest
+
+from rendering.incremental import partial_movie_files
+
+MOVIES = ["a.mp4", None, "b.mp4", "c.mp4"]
+
+
+def _section(movies):
+    return SimpleNamespace(partial_movie_files=movies)
+
+
+def test_movies_of_the_file_writer():
+    writer = SimpleNamespace(partial_movie_files=MOVIES, sections=[_section(MOVIES)])
+    assert partial_movie_files(writer) == MOVIES
+
+
+def test_movies_of_the_sections():
+    writer = SimpleNamespace(sections=[_section(MOVIES[:1]), _section(MOVIES[1:])])
+    assert partial_movie_files(writer) == MOVIES
+
+
+def test_manim_keeps_the_partial_movies(monkeypatch):
+    # Steps are cut from these, so a manim that stores them elsewhere has to fail here
+    pytest.importorskip("manim")
+    from manim import tempconfig
+    from manim.scene import scene_file_writer
+
+    monkeypatch.setattr(scene_file_writer, "ensure_executable", lambda path: True)
+    with tempconfig({"dry_run": True}):
+        writer = scene_file_writer.SceneFileWriter(None, "Check")
+    assert partial_movie_files(writer) == []
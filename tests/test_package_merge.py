@@ -0,0 +1,77 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from coding_core import package_merge_lengths
+
+
+def _fits(lengths, max_length, arity):
+    """Kraft's inequality, in integers."""
+    return sum(arity ** (max_length - length) for length in lengths) <= arity ** max_length
+
+
+def _cheapest(probabilities, max_length, arity):
+    """Cost of the cheapest prefix code with no word over max_length, by trying every set of lengths.
+
+    Only the shortest lengths going to the most probable symbols can be
+    cheapest, so every multiset of lengths is tried once.
+    """
+    probabilities = sorted(probabilities, reverse=True)
+    return min(
+        sum(p * length for p, length in zip(probabilities, lengths))
+        for lengths in itertools.combinations_with_replacement(range(1, max_length + 1), len(probabilities))
+        if _fits(lengths, max_length, arity)
+    )
+
+
+def _tables(count, tables=20, seed=0):
+    generator = np.random.default_rng(seed + count)
+    for _ in range(tables):
+        weights = generator.random(count) ** 4
+        yield (weights / weights.sum()).tolist()
+    yield [1 / count] * count
+    yield [2.0 ** -index for index in range(1, count)] + [2.0 ** -(count - 1)]
+
+
+@pytest.mark.parametrize("arity, count, max_length", [
+    (2, 3, 2), (2, 5, 3), (2, 6, 3), (2, 8, 4), (2, 9, 6), (2, 12, 5),
+    (3, 5, 2), (3, 6, 2), (3, 8, 3), (3, 10, 4), (4, 6, 2), (4, 9, 3),
+])
+def test_matches_brute_force(arity, count, max_length):
+    for probabilities in _tables(count):
+        lengths = package_merge_lengths(probabilities, max_length, arity)
+        assert len(lengths) == count
+        assert max(lengths) <= max_length
+        assert _fits(lengths, max_length, arity)
+        cost = sum(p * length for p, length in zip(probabilities, lengths))
+        assert cost == pytest.approx(_cheapest(probabilities, max_length, arity), abs=1e-12)
+
+
+@pytest.mark.parametrize("arity", [2, 3])
+def test_loose_limit_costs_as_much_as_huffman(arity):
+    for probabilities in _tables(12, tables=10):
+        lengths = package_merge_lengths(probabilities, 40, arity)
+        cost = sum(p * length for p, length in zip(probabilities, lengths))
+        assert cost == pytest.approx(_huffman_cost(probabilities, arity), abs=1e-12)
+
+
+def _huffman_cost(probabilities, arity):
+    """Cost of a Huffman code: the sum of the weights of every merged node."""
+    weights = sorted(probabilities + [0.0] * (-(len(probabilities) - 1) % (arity - 1)))
+    cost = 0.0
+    while len(weights) > 1:
+        merged = sum(weights[:arity])
+        cost += merged
+        weights = sorted(weights[arity:] + [merged])
+    return cost
+
+
+def test_edge_cases():
+    assert package_merge_lengths([], 3) == []
+    assert package_merge_lengths([1.0], 3) == [1]
+    assert package_merge_lengths([0.5, 0.5], 1) == [1, 1]
+    with pytest.raises(ValueError):
+        package_merge_lengths([0.25] * 4, 1)
+    with pytest.raises(ValueError):
+        package_merge_lengths([0.5, 0.5], 3, arity=1)
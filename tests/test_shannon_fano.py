@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from coding_core import Leaf, Split, shannon_fano_codes, shannon_fano_steps
+
+
+def _baseline_split(probabilities):
+    """The split point of the original recursive implementation, a running sum over the range."""
+    total = sum(probabilities)
+    running_sum = 0
+    for i, prob in enumerate(probabilities):
+        if running_sum + prob > total / 2:
+            return i if abs(running_sum - total / 2) < abs(running_sum + prob - total / 2) else i + 1
+        running_sum += prob
+    return len(probabilities)
+
+
+def _baseline_steps(probabilities, start=0, depth=0, code=""):
+    """Split and Leaf events of the original recursion, which slices the list at every node."""
+    if len(probabilities) == 1:
+        yield Leaf(code, start)
+        return
+    middle = _baseline_split(probabilities)
+    left, right = probabilities[:middle], probabilities[middle:]
+    yield Split(code, depth, start, start + middle, start + len(probabilities), sum(left), sum(right))
+    yield from _baseline_steps(left, start, depth + 1, code + "0")
+    yield from _baseline_steps(right, start + middle, depth + 1, code + "1")
+
+
+def _tables():
+    generator = np.random.default_rng(0)
+    yield [1.0]
+    yield [0.5, 0.5]
+    yield [0.25] * 4
+    yield [0.1] * 10
+    yield [1 / 3] * 3
+    yield [0.4, 0.2, 0.2, 0.1, 0.1]
+    yield [2.0 ** -index for index in range(1, 20)] + [2.0 ** -19]
+    for count in (3, 7, 20, 65, 300, 2000):
+        for _ in range(20):
+            weights = np.sort(generator.random(count) ** 3)[::-1]
+            yield (weights / weights.sum()).tolist()
+        # Repeated values put many split points within rounding of a tie
+        values = np.sort(generator.integers(1, 5, count))[::-1] / 10
+        yield values.tolist()
+
+
+TABLES = list(_tables())
+
+
+@pytest.mark.parametrize("probabilities", TABLES, ids=range(len(TABLES)))
+def test_steps_match_the_baseline(probabilities):
+    symbols = [f"s{index}" for index in range(len(probabilities))]
+    steps = list(shannon_fano_steps(symbols, probabilities))
+    expected = list(_baseline_steps(probabilities))
+    assert len(steps) == len(expected)
+    for step, old in zip(steps, expected):
+        assert type(step) is type(old)
+        if isinstance(step, Leaf):
+            assert step == old
+        else:
+            assert step[:5] == old[:5]
+            assert step.left_probability == pytest.approx(old.left_probability, rel=1e-9, abs=1e-12)
+            assert step.right_probability == pytest.approx(old.right_probability, rel=1e-9, abs=1e-12)
+
+
+@pytest.mark.parametrize("probabilities", TABLES, ids=range(len(TABLES)))
+def test_codes_match_the_baseline(probabilities):
+    symbols = [f"s{index}" for index in range(len(probabilities))]
+    expected = {symbols[leaf.index]: leaf.code for leaf in _baseline_steps(probabilities) if isinstance(leaf, Leaf)}
+    assert shannon_fano_codes(symbols, probabilities) == expected
+
+
+def test_zero_probabilities_still_split():
+    codes = list(shannon_fano_codes("abcd", [0, 0, 0, 0]).values())
+    assert all(code for code in codes)
+    assert not any(other != code and other.startswith(code) for code in codes for other in codes)
@@ -0,0 +1,88 @@
+import json
+
+import numpy as np
+import pytest
+
+from coding_core import check_rows, import_symbols, normalized
+
+SYMBOLS = ["a", "b", "c d", "\n"]
+COUNTS = [5, 3, 1, 1]
+PROBABILITIES = [0.5, 0.3, 0.1, 0.1]
+SHOWN = ["a", "b", "c d", "\\n"]
+
+
+def _import(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8")
+    symbols, probabilities = import_symbols(str(path))
+    assert isinstance(symbols, np.ndarray) and isinstance(probabilities, np.ndarray)
+    return symbols.tolist(), probabilities.tolist()
+
+
+@pytest.mark.parametrize("data", [
+    {"symbols": SYMBOLS, "probabilities": PROBABILITIES},
+    {"symbols": SYMBOLS, "counts": COUNTS},
+    dict(zip(SYMBOLS, COUNTS)),
+    [[symbol, count] for symbol, count in zip(SYMBOLS, COUNTS)],
+], ids=["probabilities", "counts", "object", "pairs"])
+def test_json_layouts(tmp_path, data):
+    symbols, probabilities = _import(tmp_path, "table.json", json.dumps(data))
+    assert symbols == SHOWN
+    assert probabilities == pytest.approx(PROBABILITIES)
+
+
+@pytest.mark.parametrize("name, delimiter", [("table.csv", ","), ("table.tsv", "\t"), ("TABLE.CSV", ",")])
+@pytest.mark.parametrize("header", [True, False])
+def test_delimited_files(tmp_path, name, delimiter, header):
+    rows = [["symbol", "name", "count"]] if header else []
+    rows += [["a", "first", "5"], ["b", "second", "3"], ["c d", "third", "1"], ["e", "", "1"]]
+    content = "".join(delimiter.join(row) + "\n" for row in rows) + "\n"
+    symbols, probabilities = _import(tmp_path, name, content)
+    assert symbols == ["a", "b", "c d", "e"]
+    assert probabilities == pytest.approx(PROBABILITIES)
+
+
+def test_quoted_csv_cells(tmp_path):
+    symbols, probabilities = _import(tmp_path, "table.csv", '"a,b",1\n"""",3\n')
+    assert symbols == ["a,b", '"']
+    assert probabilities == pytest.approx([0.25, 0.75])
+
+
+@pytest.mark.parametrize("name", ["table.txt", "counts", "table.freq"])
+def test_frequency_files(tmp_path, name):
+    # Both "symbol count" and uniq -c's "count symbol", blank and short lines skipped
+    content = "a 5\n   3 b\n\nlonely\nc d 1\n1 e\n"
+    symbols, probabilities = _import(tmp_path, name, content)
+    assert symbols == ["a", "b", "c d", "e"]
+    assert probabilities == pytest.approx(PROBABILITIES)
+
+
+@pytest.mark.parametrize("name, content", [
+    ("table.json", '{"symbols": ["a", "b"], "probabilities": [1]}'),
+    ("table.json", '{"a": "x", "b": 1}'),
+    ("table.json", '{"a": 0, "b": 0}'),
+    ("table.json", '{"a": -1, "b": 2}'),
+    ("table.json", '[["a", 1], ["a", 2]]'),
+    ("table.csv", "a,1\nb,x\n"),
+    ("table.txt", "a 1\n\n b 2\n a 3\n"),
+])
+def test_invalid_tables(tmp_path, name, content):
+    with pytest.raises(ValueError):
+        _import(tmp_path, name, content)
+
+
+def test_normalized_scales_to_one():
+    symbols = np.array(SYMBOLS, dtype=object)
+    assert normalized(symbols, np.array(COUNTS, dtype=np.float64)).tolist() == pytest.approx(PROBABILITIES)
+
+
+@pytest.mark.parametrize("symbols, weights, row", [
+    (["a", ""], [1, 1], "row 2"),
+    (["a", "b"], [1, np.nan], "row 2"),
+    (["a", "b", "c"], [1, -1, 1], "symbol b"),
+    (["a", "b"], [np.inf, 1], "symbol a"),
+    (["b", "a", "b"], [1, 1, 1], "Symbol b"),
+])
+def test_check_rows_names_the_bad_row(symbols, weights, row):
+    with pytest.raises(ValueError, match=row):
+        check_rows(np.array(symbols, dtype=object), np.array(weights, dtype=np.float64))